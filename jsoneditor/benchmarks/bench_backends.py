@@ -0,0 +1,75 @@
+"""Benchmark of JSON backends of utils.JsonBackends.
+
+Runs every available backend on synthetic wide, deep and string-heavy documents, checks
+that the result is identical to the standard library and prints throughput in MB/s
+of the JSON text.
+
+    Typical usage example:
+    ----------------------
+
+    python3 benchmarks/bench_backends.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.JsonBackends import BACKENDS, StdlibBackend, available_backends
+
+
+def wide_document() -> dict:
+    """Return flat document with 300k keys of numbers, booleans and short strings."""
+    return {"key %06d" % row: (row, row / 7.0, row % 2 == 0, None, "v%d" % row)[row % 5]
+            for row in range(300000)}
+
+
+def deep_document() -> list:
+    """Return list of 2000 objects nested to depth 100."""
+    chains = []
+    for chain in range(2000):
+        document = value = {}
+        for level in range(100):
+            child = {"level": level, "weight": level * 0.25}
+            value["child"] = child
+            value = child
+        chains.append(document)
+    return chains
+
+
+def string_document() -> list:
+    """Return list of records with long ASCII, Cyrillic and escaped strings."""
+    return [{
+        "text": "Lorem ipsum dolor sit amet, consectetur adipiscing elit %d. " % row * 8,
+        "name": "Устройство номер %d" % row,
+        "path": "C:\\devices\\\"%d\"\n\t" % row
+    } for row in range(30000)]
+
+
+def best_of(function, repeat: int=3) -> float:
+    """Return the best time of calling function repeat times."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+if __name__ == '__main__':
+    print("available backends: %s" % ", ".join(available_backends()))
+    print("%-8s %-8s %8s %12s %12s %10s" %
+          ("document", "backend", "size", "loads", "dumps", "identical"))
+    for document_name, document in (("wide", wide_document()),
+                                     ("deep", deep_document()),
+                                     ("strings", string_document())):
+        text = StdlibBackend.dumps(document)
+        data = text.encode("utf-8")
+        size = len(data) / 2 ** 20
+        for name in available_backends():
+            backend = BACKENDS[name]
+            identical = backend.loads(data) == document and backend.dumps(document) == text
+            loads = best_of(lambda: backend.loads(data))
+            dumps = best_of(lambda: backend.dumps(document))
+            print("%-8s %-8s %5.1f MB %7.1f MB/s %7.1f MB/s %10s" %
+                  (document_name, name, size, size / loads, size / dumps, identical))
@@ -0,0 +1,95 @@
+"""Benchmark of loading a document from DocumentCache against parsing the file.
+
+Parsing is measured with json.load and with the streaming JsonEventParser, which is
+used by the editor if streaming is turned on (section [Loading] of config.ini).
+
+The cache is kept in a temporary directory, so the cache of the user is not touched.
+
+    Typical usage example:
+    ----------------------
+
+    python3 benchmarks/bench_cache.py
+    python3 benchmarks/bench_cache.py example.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.DocumentCache import DocumentCache
+from utils.JsonStream import JsonEventParser, JsonValueBuilder
+
+
+def synthetic_file(records: int) -> str:
+    """Writes list of records to a temporary file and return its name."""
+    document = [{
+        "id": row,
+        "name": "record %d" % row,
+        "enabled": row % 2 == 0,
+        "weight": row / 7.0,
+        "tags": ["a", "b"],
+        "owner": {"group": "g%d" % (row % 10), "level": row % 3}
+    } for row in range(records)]
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as opened_file:
+        json.dump(document, opened_file, indent=2)
+    return opened_file.name
+
+
+def best_of(function, repeat: int=3) -> float:
+    """Return the best time of calling function repeat times."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        FILE_NAME = sys.argv[1]
+        IS_TEMPORARY = False
+    else:
+        FILE_NAME = synthetic_file(100000)
+        IS_TEMPORARY = True
+    CACHE = DocumentCache(tempfile.mkdtemp(), 2 ** 40)
+
+    try:
+        with open(FILE_NAME, mode="rb") as opened_file:
+            DOCUMENT = json.load(opened_file)
+        # Content hash is written for the verified hit
+        CACHE.verify_content = True
+        CACHE.put(FILE_NAME, DOCUMENT, os.stat(FILE_NAME))
+        assert CACHE.get(FILE_NAME) == DOCUMENT
+        del DOCUMENT
+
+        def parse():
+            with open(FILE_NAME, mode="rb") as opened_file:
+                json.load(opened_file)
+
+        def parse_streaming():
+            builder = JsonValueBuilder()
+            with open(FILE_NAME, mode="rb") as opened_file:
+                for event, value, _start, _end in JsonEventParser(opened_file).events():
+                    builder.feed(event, value)
+
+        PARSE = best_of(parse)
+        PARSE_STREAMING = best_of(parse_streaming, repeat=1)
+        HIT_VERIFIED = best_of(lambda: CACHE.get(FILE_NAME))
+        CACHE.verify_content = False
+        HIT = best_of(lambda: CACHE.get(FILE_NAME))
+        print("file: %s, %.1f MB, cache entry %.1f MB" %
+              (FILE_NAME, os.path.getsize(FILE_NAME) / 2 ** 20, CACHE.size() / 2 ** 20))
+        print("json.load  %8.3fs" % PARSE)
+        print("streaming  %8.3fs" % PARSE_STREAMING)
+        print("cache hit  %8.3fs  (%.1fx json.load, %.1fx streaming)" %
+              (HIT, PARSE / HIT, PARSE_STREAMING / HIT))
+        print("verified   %8.3fs  (cache hit with verify_content)" % HIT_VERIFIED)
+    finally:
+        shutil.rmtree(CACHE.directory)
+        if IS_TEMPORARY:
+            os.remove(FILE_NAME)
@@ -0,0 +1,92 @@
+"""Benchmark of saving the tree after a single edit against saving it from scratch.
+
+Saving from scratch encodes every item, as the first save after loading does. After
+an edit the texts of unchanged containers are written from QJsonTreeModel.fragment_cache
+and only the edited item and its parents are encoded again. Every saved file is checked
+against json.dumps of get_json_from_tree.
+
+    Typical usage example:
+    ----------------------
+
+    python3 benchmarks/bench_incremental_save.py
+    python3 benchmarks/bench_incremental_save.py example.json
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import Qt
+from treemodel.QJsonTreeModel import QJsonTreeModel
+from utils.JsonParsing import JsonParsing
+from bench_streaming import synthetic_file
+
+
+def edit_value(model: QJsonTreeModel, row: int, step: int) -> None:
+    """Changes the first scalar found under the top-level item of row."""
+    index = model.index(row, 0)
+    while model.rowCount(index) > 0:
+        index = model.index(0, 0, index)
+    model.setData(index.siblingAtColumn(2), "edit %d" % step, Qt.EditRole)
+
+
+def timed_save(model: QJsonTreeModel, file_name: str) -> float:
+    """Return time of saving the whole tree of model to file_name."""
+    start = time.perf_counter()
+    model.write_json_to_file(file_name)
+    return time.perf_counter() - start
+
+
+def is_identical(model: QJsonTreeModel, file_name: str) -> bool:
+    """Return True if file_name contains json.dumps of the tree of model."""
+    with open(file_name, mode="r", encoding="utf-8") as opened_file:
+        return opened_file.read() == json.dumps(
+            model.get_json_from_tree(), indent=2, ensure_ascii=False, sort_keys=True)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        FILE_NAME = sys.argv[1]
+        IS_TEMPORARY = False
+    else:
+        FILE_NAME = synthetic_file(100000)
+        IS_TEMPORARY = True
+    OUTPUT_FILE_NAME = tempfile.mkstemp(suffix=".json")[1]
+    EDITS = 5
+
+    try:
+        MODEL = QJsonTreeModel()
+        MODEL.is_editable = True
+        MODEL.load(JsonParsing().load_json_from_file(FILE_NAME))
+        ROWS = MODEL.rowCount()
+
+        REBUILD = None
+        for _ in range(EDITS):
+            MODEL.fragment_cache.clear()
+            SECONDS = timed_save(MODEL, OUTPUT_FILE_NAME)
+            REBUILD = SECONDS if REBUILD is None else min(REBUILD, SECONDS)
+        assert is_identical(MODEL, OUTPUT_FILE_NAME)
+
+        INCREMENTAL = None
+        for step in range(EDITS):
+            edit_value(MODEL, (step * 7919) % ROWS, step)
+            SECONDS = timed_save(MODEL, OUTPUT_FILE_NAME)
+            INCREMENTAL = SECONDS if INCREMENTAL is None else min(INCREMENTAL, SECONDS)
+            assert is_identical(MODEL, OUTPUT_FILE_NAME)
+
+        MODEL.fragment_cache.max_size = 0
+        UNCACHED = timed_save(MODEL, OUTPUT_FILE_NAME)
+
+        print("file: %s, %.1f MB, %d top-level items, cache %.1f MB in %d fragments" %
+              (FILE_NAME, os.path.getsize(FILE_NAME) / 2 ** 20, ROWS,
+               MODEL.fragment_cache.size / 2 ** 20, len(MODEL.fragment_cache.fragments)))
+        print("without cache   %8.3fs" % UNCACHED)
+        print("full rebuild    %8.3fs" % REBUILD)
+        print("after one edit  %8.3fs  (%.1fx full rebuild)" %
+              (INCREMENTAL, REBUILD / INCREMENTAL))
+    finally:
+        os.remove(OUTPUT_FILE_NAME)
+        if IS_TEMPORARY:
+            os.remove(FILE_NAME)
@@ -0,0 +1,70 @@
+"""Benchmark of opening JSON file memory-mapped against parsing it and building the tree.
+
+Prints time until the first level of the tree is shown and peak memory allocated while
+opening. Memory-mapped opening scans the file once for containers and parses only the
+first level, the mapped file itself is not counted as allocated memory.
+
+    Typical usage example:
+    ----------------------
+
+    python3 benchmarks/bench_mapped.py
+    python3 benchmarks/bench_mapped.py example.json
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.JsonParsing import JsonParsing
+from utils.JsonIndex import JsonIndex
+from treemodel.QJsonTreeItem import QJsonTreeItem
+from bench_streaming import synthetic_file
+
+
+def open_with_json(file_name: str):
+    """Parses file with JsonParsing and builds the whole tree."""
+    document = JsonParsing().load_json_from_file(file_name)
+    return QJsonTreeItem.load_json_to_tree(document)
+
+
+def open_mapped(file_name: str):
+    """Indexes memory-mapped file and creates the first level of the tree."""
+    index = JsonIndex(file_name)
+    index.scan()
+    root_item = QJsonTreeItem.load_span_to_tree(index.root())
+    root_item.fetch_children(1000)
+    return root_item
+
+
+def measure(function, file_name: str) -> tuple:
+    """Return (seconds, peak MB) of opening file_name."""
+    start = time.perf_counter()
+    root_item = function(file_name)
+    seconds = time.perf_counter() - start
+    del root_item
+
+    tracemalloc.start()
+    root_item = function(file_name)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del root_item
+    return seconds, peak / 2 ** 20
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        FILE_NAME = sys.argv[1]
+        IS_TEMPORARY = False
+    else:
+        FILE_NAME = synthetic_file(20000)
+        IS_TEMPORARY = True
+
+    try:
+        print("file: %s, %.1f MB" % (FILE_NAME, os.path.getsize(FILE_NAME) / 2 ** 20))
+        print("%-10s %10s %10s" % ("open", "time", "peak"))
+        for name, function in (("json.load", open_with_json), ("mapped", open_mapped)):
+            print("%-10s %9.2fs %7.1f MB" % ((name,) + measure(function, FILE_NAME)))
+    finally:
+        if IS_TEMPORARY:
+            os.remove(FILE_NAME)
@@ -0,0 +1,93 @@
+"""Benchmark of memory used by the tree of QJsonTreeItem.
+
+Builds the tree for a synthetic document with about 1M nodes and prints bytes per node
+retained after the parsed document is released. LegacyTreeItem repeats the previous item
+layout: __dict__ per item, Python type object as type and item_data holding the subtree,
+which keeps the whole parsed document alive next to the tree.
+
+    Typical usage example:
+    ----------------------
+
+    python3 benchmarks/bench_memory.py
+    python3 benchmarks/bench_memory.py 200000
+"""
+import os
+import sys
+import gc
+import json
+import tracemalloc
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from treemodel.QJsonTreeItem import QJsonTreeItem
+
+
+class LegacyTreeItem(object):
+    """Tree item with the previous layout, for comparison only."""
+    def __init__(self, data, parent=None) -> None:
+        self._parent = parent
+        self._key = ""
+        self._value = ""
+        self._type = None
+        self._children = list()
+        self.item_data = data
+
+    @classmethod
+    def load_json_to_tree(cls, value, parent=None):
+        root_item = LegacyTreeItem(value, parent)
+        root_item._type = type(value)
+        if isinstance(value, dict):
+            for key, child_value in sorted(value.items()):
+                child = cls.load_json_to_tree(child_value, root_item)
+                child._key = key
+                root_item._children.append(child)
+        elif isinstance(value, list):
+            for child_value in value:
+                root_item._children.append(cls.load_json_to_tree(child_value, root_item))
+        else:
+            root_item._value = value
+        return root_item
+
+
+def synthetic_document(nodes: int) -> str:
+    """Return JSON text of a list of records with 10 nodes per record."""
+    records = [{
+        "id": row,
+        "name": "record %d" % row,
+        "enabled": row % 2 == 0,
+        "weight": row / 7.0,
+        "tags": ["a", "b"],
+        "owner": {"group": "g%d" % (row % 10), "level": row % 3}
+    } for row in range(nodes // 10)]
+    return json.dumps(records)
+
+
+def retained_bytes(builder, text: str) -> tuple:
+    """Return (bytes retained by the tree, amount of nodes) for given builder."""
+    gc.collect()
+    tracemalloc.start()
+    document = json.loads(text)
+    tree = builder(document)
+    del document
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = 0
+    stack = [tree]
+    while stack:
+        item = stack.pop()
+        nodes += 1
+        stack.extend(item._children)
+    return size, nodes
+
+
+if __name__ == '__main__':
+    NODES = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    TEXT = synthetic_document(NODES)
+    sys.setrecursionlimit(10000)
+
+    for name, builder in (("legacy", LegacyTreeItem.load_json_to_tree),
+                          ("slotted", QJsonTreeItem.load_json_to_tree)):
+        size, nodes = retained_bytes(builder, TEXT)
+        print("%-8s nodes: %8d  retained: %8.1f MB  bytes/node: %6.1f" %
+              (name, nodes, size / 2 ** 20, size / nodes))
@@ -0,0 +1,57 @@
+"""Benchmark of QTreeView repaints with QJsonTreeModel.
+
+Paints an expanded tree several times and prints time and amount of fonts, brushes and
+icons created by the model per repaint. Role values are created only after the role
+cache is cleared, repaints reuse them.
+
+    Typical usage example:
+    ----------------------
+
+    QT_QPA_PLATFORM=offscreen python3 benchmarks/bench_paint.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtWidgets import QApplication, QTreeView
+from treemodel.QJsonTreeModel import QJsonTreeModel
+
+
+REPAINTS = 5
+
+
+def synthetic_document(records: int) -> dict:
+    """Return document with given amount of records of different types."""
+    return {"record %04d" % row: {
+        "id": row,
+        "enabled": row % 2 == 0,
+        "name": "name %d" % row,
+        "file": "config_%d.json" % row,
+        "tags": ["a", "b", "c"]
+    } for row in range(records)}
+
+
+if __name__ == '__main__':
+    APPLICATION = QApplication(sys.argv)
+    MODEL = QJsonTreeModel()
+    MODEL.load(synthetic_document(200))
+
+    TREE_VIEW = QTreeView()
+    TREE_VIEW.setModel(MODEL)
+    TREE_VIEW.resize(1024, 1440)
+    TREE_VIEW.expandAll()
+    TREE_VIEW.show()
+    APPLICATION.processEvents()
+    MODEL.reset_role_allocations()
+
+    MODEL.clear_role_cache()
+    TREE_VIEW.viewport().grab()
+    print("theme change:         role values created: %d" % MODEL.reset_role_allocations())
+
+    for repaint in range(REPAINTS):
+        start = time.perf_counter()
+        TREE_VIEW.viewport().grab()
+        elapsed = time.perf_counter() - start
+        print("repaint %d: %7.2f ms, role values created: %d" %
+              (repaint + 1, elapsed * 1000, MODEL.reset_role_allocations()))
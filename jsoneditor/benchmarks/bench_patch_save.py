@@ -0,0 +1,86 @@
+"""Benchmark of saving one edit by patching the file against writing the whole file.
+
+The file is patched by JsonTreePatcher: an edit which keeps the size of the value is
+written in place, a longer value makes the tail of the file after it to be written
+again. Time and amount of written bytes are compared with writing the whole tree.
+Patched files are checked against json.load of the tree.
+
+The file is copied to a temporary file first, the given file is not changed.
+
+    Typical usage example:
+    ----------------------
+
+    python3 benchmarks/bench_patch_save.py
+    python3 benchmarks/bench_patch_save.py example.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import Qt, QModelIndex
+from treemodel.QJsonTreeModel import QJsonTreeModel
+from utils.JsonParsing import JsonParsing
+from JsonTreePatcher import file_state
+from bench_streaming import synthetic_file
+
+
+def first_string(model: QJsonTreeModel, parent: QModelIndex):
+    """Return index of value column of the first string under parent, None if not found."""
+    model.fetch_all(parent)
+    for row in range(model.rowCount(parent)):
+        index = model.index(row, 2, parent)
+        if isinstance(model.data(index, Qt.EditRole), str):
+            return index
+        index = first_string(model, index.siblingAtColumn(0))
+        if index is not None:
+            return index
+    return None
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        SOURCE_FILE_NAME = sys.argv[1]
+        IS_TEMPORARY = False
+    else:
+        SOURCE_FILE_NAME = synthetic_file(100000)
+        IS_TEMPORARY = True
+    FILE_NAME = tempfile.mkstemp(suffix=".json")[1]
+    shutil.copyfile(SOURCE_FILE_NAME, FILE_NAME)
+
+    try:
+        MODEL = QJsonTreeModel()
+        MODEL.is_editable = True
+        MODEL.load(JsonParsing().load_json_from_file(FILE_NAME))
+        ROWS = MODEL.rowCount()
+
+        START = time.perf_counter()
+        MODEL.write_json_to_file(FILE_NAME)
+        FULL = time.perf_counter() - START
+        FULL_SIZE = os.path.getsize(FILE_NAME)
+        MODEL.is_modified = False
+
+        print("file: %s, %.1f MB, %d top-level items" %
+              (SOURCE_FILE_NAME, FULL_SIZE / 2 ** 20, ROWS))
+        print("%-22s %8.3fs %12d bytes" % ("whole file", FULL, FULL_SIZE))
+        for name, row, size in (("same size, first row", 0, 0),
+                                ("longer, middle row", ROWS // 2, 100),
+                                ("longer, last row", ROWS - 1, 100)):
+            INDEX = first_string(MODEL, MODEL.index(row, 0))
+            VALUE = MODEL.data(INDEX, Qt.EditRole)
+            MODEL.setData(INDEX, VALUE[::-1] + "x" * size, Qt.EditRole)
+            PATCHER = MODEL.create_patcher(FILE_NAME, file_state(FILE_NAME))
+            START = time.perf_counter()
+            assert PATCHER.patch()
+            SECONDS = time.perf_counter() - START
+            MODEL.is_modified = False
+            with open(FILE_NAME, mode="rb") as opened_file:
+                assert json.load(opened_file) == MODEL.get_json_from_tree()
+            print("%-22s %8.3fs %12d bytes" % (name, SECONDS, PATCHER.bytes_written))
+    finally:
+        os.remove(FILE_NAME)
+        if IS_TEMPORARY:
+            os.remove(SOURCE_FILE_NAME)
@@ -0,0 +1,66 @@
+"""Benchmark of refreshing an expanded tree after a small change of the document.
+
+Compares loading the changed document with a model reset and expanding the tree again
+against patching the tree with QJsonTreeModel.update_from_document, which keeps
+expansion of unchanged items. Changed values are patched with dataChanged only,
+added and removed rows make the view lay out all expanded items again.
+
+    Typical usage example:
+    ----------------------
+
+    QT_QPA_PLATFORM=offscreen python3 benchmarks/bench_refresh.py
+"""
+import os
+import sys
+import copy
+import time
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtWidgets import QApplication, QTreeView
+from treemodel.QJsonTreeModel import QJsonTreeModel
+from bench_paint import synthetic_document
+
+
+def changed_document(document: dict, rows: bool) -> dict:
+    """Return copy of document with one changed record.
+
+    If rows is True one record is also removed and one is added.
+    """
+    document = copy.deepcopy(document)
+    first, second = sorted(document)[:2]
+    document[first]["name"] = "changed"
+    if rows:
+        del document[second]
+        document["record new"] = {"id": -1, "tags": []}
+    return document
+
+
+def refresh(tree_view: QTreeView, model: QJsonTreeModel, document: dict,
+            patch: bool) -> float:
+    """Return seconds of refreshing expanded tree_view to document."""
+    tree_view.expandToDepth(0)
+    start = time.perf_counter()
+    if patch:
+        model.update_from_document(document)
+    else:
+        model.load(document)
+        tree_view.expandToDepth(0)
+    APPLICATION.processEvents()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    APPLICATION = QApplication(sys.argv)
+    DOCUMENT = synthetic_document(20000)
+
+    print("%-8s %-8s %10s" % ("change", "refresh", "time"))
+    for change, rows in (("values", False), ("rows", True)):
+        CHANGED = changed_document(DOCUMENT, rows)
+        for name, patch in (("reset", False), ("patch", True)):
+            MODEL = QJsonTreeModel()
+            MODEL.load(DOCUMENT)
+            TREE_VIEW = QTreeView()
+            TREE_VIEW.setModel(MODEL)
+            TREE_VIEW.show()
+            print("%-8s %-8s %9.2fs" %
+                  (change, name, refresh(TREE_VIEW, MODEL, CHANGED, patch)))
@@ -0,0 +1,49 @@
+"""Benchmark of QJsonTreeModel.parent() for parents with many children.
+
+Emulates scrolling: resolves parent() for a window of 1000 visible rows at the end
+of a parent with growing amount of children. Time per call should stay flat.
+
+    Typical usage example:
+    ----------------------
+
+    python3 benchmarks/bench_row.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import QCoreApplication
+from treemodel.QJsonTreeModel import QJsonTreeModel
+
+
+VISIBLE_ROWS = 1000
+
+
+def bench_parent(siblings: int) -> tuple:
+    """Return seconds per parent() call and per list.index() scan for given siblings."""
+    model = QJsonTreeModel()
+    model.load({"items": [{"id": row} for row in range(siblings)]})
+    items_index = model.index(0, 0)
+    window = [model.index(row, 0, items_index)
+              for row in range(siblings - VISIBLE_ROWS, siblings)]
+    grandchildren = [model.index(0, 0, index) for index in window]
+
+    parent_time = min(timeit.repeat(
+        lambda: [model.parent(index) for index in grandchildren], number=5, repeat=3))
+
+    children = model.getItem(items_index)._children
+    window_items = [index.internalPointer() for index in window]
+    scan_time = min(timeit.repeat(
+        lambda: [children.index(item) for item in window_items], number=1, repeat=3))
+
+    calls = len(grandchildren)
+    return parent_time / (5 * calls), scan_time / calls
+
+
+if __name__ == '__main__':
+    APPLICATION = QCoreApplication(sys.argv)
+    print("%10s %18s %22s" % ("siblings", "parent() us/call", "list.index() us/call"))
+    for amount in (1000, 10000, 100000):
+        per_call, per_scan = bench_parent(amount)
+        print("%10d %18.2f %22.2f" % (amount, per_call * 1e6, per_scan * 1e6))
@@ -0,0 +1,73 @@
+"""Benchmark of parsing JSON file in shards by several processes against parsing it at once.
+
+Parses a synthetic document with many top-level members, or the given file, with
+JSON_BACKEND in one process and with utils.JsonShards by 1, 2, 4, ... worker processes
+up to the amount of CPUs, checks that the results are identical and prints the speedup.
+
+    Typical usage example:
+    ----------------------
+
+    python3 benchmarks/bench_sharded.py
+    python3 benchmarks/bench_sharded.py example.json 1 2 4 8
+"""
+import os
+import sys
+import time
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.JsonBackends import JSON_BACKEND
+from utils.JsonShards import load_json_sharded
+from bench_streaming import synthetic_file
+
+
+def parse_at_once(file_name: str):
+    """Parses the whole file with JSON_BACKEND."""
+    with open(file_name, mode="rb") as opened_file:
+        return JSON_BACKEND.loads(opened_file.read())
+
+
+def worker_counts() -> list:
+    """Return 1, 2, 4, ... up to the amount of CPUs."""
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def best_of(function, repeat: int=3) -> tuple:
+    """Return the best time and the result of calling function repeat times."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        result = None
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        FILE_NAME = sys.argv[1]
+        IS_TEMPORARY = False
+    else:
+        FILE_NAME = synthetic_file(300000)
+        IS_TEMPORARY = True
+    WORKERS = [int(argument) for argument in sys.argv[2:]] or worker_counts()
+
+    try:
+        print("file: %s, %.1f MB, %d CPUs, backend %s" %
+              (FILE_NAME, os.path.getsize(FILE_NAME) / 2 ** 20, os.cpu_count() or 1,
+               JSON_BACKEND.name))
+        single, expected = best_of(lambda: parse_at_once(FILE_NAME))
+        print("%-10s %9s %9s %10s" % ("workers", "time", "speedup", "identical"))
+        print("%-10s %8.2fs %8.2fx %10s" % ("at once", single, 1.0, True))
+        for workers in WORKERS:
+            seconds, document = best_of(lambda: load_json_sharded(FILE_NAME, workers))
+            print("%-10d %8.2fs %8.2fx %10s" %
+                  (workers, seconds, single / seconds, document == expected))
+            del document
+    finally:
+        if IS_TEMPORARY:
+            os.remove(FILE_NAME)
@@ -0,0 +1,99 @@
+"""Benchmark of loading JSON file to the tree with json.load and with the streaming parser.
+
+Prints total time, time until the first top-level item is completed and peak memory
+allocated while loading. json.load needs the whole text and the whole Python object graph
+next to the tree, the streaming parser builds items directly from the file chunks.
+
+    Typical usage example:
+    ----------------------
+
+    python3 benchmarks/bench_streaming.py
+    python3 benchmarks/bench_streaming.py example.json
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.JsonParsing import JsonParsing
+from utils.JsonStream import JsonEventParser
+from treemodel.QJsonTreeItem import QJsonTreeItem
+
+
+def synthetic_file(records: int) -> str:
+    """Writes list of records to a temporary file and return its name."""
+    document = {"record %06d" % row: {
+        "id": row,
+        "name": "record %d" % row,
+        "enabled": row % 2 == 0,
+        "weight": row / 7.0,
+        "tags": ["a", "b"],
+        "owner": {"group": "g%d" % (row % 10), "level": row % 3}
+    } for row in range(records)}
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as opened_file:
+        json.dump(document, opened_file, indent=2)
+    return opened_file.name
+
+
+def load_with_json(file_name: str, first_item: list):
+    """Loads file with json.load and QJsonTreeItem.load_json_to_tree."""
+    document = JsonParsing().load_json_from_file(file_name)
+    root_item = QJsonTreeItem.load_json_to_tree(document)
+    first_item.append(time.perf_counter())
+    return root_item
+
+
+def load_with_stream(file_name: str, first_item: list):
+    """Loads file with JsonEventParser and QJsonTreeItem.load_events_to_tree."""
+    items = []
+    keys = []
+
+    def top_level_item(item, key) -> None:
+        if not first_item:
+            first_item.append(time.perf_counter())
+        items.append(item)
+        keys.append(key)
+
+    with open(file_name, mode="rb") as opened_file:
+        root_item = QJsonTreeItem.load_events_to_tree(
+            JsonEventParser(opened_file).events(), top_level_item=top_level_item)
+    for row in QJsonTreeItem.final_order(keys):
+        root_item.appendChild(items[row])
+    return root_item
+
+
+def measure(function, file_name: str) -> tuple:
+    """Return (seconds, seconds to the first item, peak MB) of loading file_name."""
+    first_item = []
+    start = time.perf_counter()
+    root_item = function(file_name, first_item)
+    seconds = time.perf_counter() - start
+    del root_item
+
+    tracemalloc.start()
+    root_item = function(file_name, [])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del root_item
+    return seconds, first_item[0] - start, peak / 2 ** 20
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        FILE_NAME = sys.argv[1]
+        IS_TEMPORARY = False
+    else:
+        FILE_NAME = synthetic_file(20000)
+        IS_TEMPORARY = True
+
+    try:
+        print("file: %s, %.1f MB" % (FILE_NAME, os.path.getsize(FILE_NAME) / 2 ** 20))
+        print("%-10s %10s %12s %10s" % ("parser", "total", "first item", "peak"))
+        for name, function in (("json.load", load_with_json), ("streaming", load_with_stream)):
+            print("%-10s %9.2fs %11.2fs %7.1f MB" % ((name,) + measure(function, FILE_NAME)))
+    finally:
+        if IS_TEMPORARY:
+            os.remove(FILE_NAME)
@@ -0,0 +1,119 @@
+"""Benchmark of building the tree from a document and generating a document from the tree.
+
+Compares the iterative QJsonTreeItem.load_json_to_tree and
+QJsonTreeModel.generate_json_from_free with the previous recursive versions, which are
+repeated here, on wide, nested and deep documents. Recursive versions are skipped for
+documents deeper than the recursion limit.
+
+    Typical usage example:
+    ----------------------
+
+    python3 benchmarks/bench_tree_build.py
+"""
+import os
+import sys
+import time
+from configparser import ConfigParser
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import QCoreApplication
+from utils.Utils import Utils
+from utils.JsonParsing import JsonParsing
+from treemodel.QJsonTreeModel import QJsonTreeModel
+from treemodel.QJsonTreeItem import QJsonTreeItem
+
+
+CONFIG_OBJECT = ConfigParser()
+CONFIG_OBJECT.read(Utils().get_abs_file_path("utils/config/config.ini"))
+
+
+def recursive_load_json_to_tree(value, parent=None):
+    """Previous recursive version of QJsonTreeItem.load_json_to_tree."""
+    root_item = QJsonTreeItem(parent)
+    root_item.key = "root"
+    if isinstance(value, dict):
+        root_item.type = type(value)
+        for key, child_value in sorted(value.items()):
+            child = recursive_load_json_to_tree(child_value, root_item)
+            child.key = JsonParsing().translate(
+                key, CONFIG_OBJECT.get("Language", "default_tree_language"))
+            child.type = type(child_value)
+            root_item.appendChild(child)
+    elif isinstance(value, list):
+        root_item.type = type(value)
+        for child_value in value:
+            child = recursive_load_json_to_tree(child_value, root_item)
+            child.key = JsonParsing().get_name_from_dict(child_value)
+            child.type = type(child_value)
+            root_item.appendChild(child)
+    else:
+        root_item.value = value
+        root_item.type = type(value)
+    return root_item
+
+
+def recursive_generate_json_from_free(item):
+    """Previous recursive version of QJsonTreeModel.generate_json_from_free."""
+    if item.type is dict:
+        document = {}
+        for row in range(item.childCount()):
+            child = item.child(row)
+            document[JsonParsing().translate(
+                child.key, CONFIG_OBJECT.get("Language", "write_to_json_language"))] = \
+                recursive_generate_json_from_free(child)
+        return document
+    if item.type is list:
+        return [recursive_generate_json_from_free(item.child(row))
+                for row in range(item.childCount())]
+    return item.value
+
+
+def wide_document() -> dict:
+    """Return flat document with 200k keys."""
+    return {"key %06d" % row: row for row in range(200000)}
+
+
+def nested_document() -> list:
+    """Return list of 20k records with nested objects and lists."""
+    return [{"name": "n%d" % row, "group": "g", "values": [row, row + 1, {"x": True}]}
+            for row in range(20000)]
+
+
+def deep_document(depth: int) -> dict:
+    """Return document nested to given depth."""
+    document = value = {}
+    for level in range(depth):
+        child = {"level": level}
+        value["child"] = child
+        value = child
+    return document
+
+
+def measure(function, *args) -> tuple:
+    """Return (seconds, result) of calling function."""
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    APPLICATION = QCoreApplication(sys.argv)
+    MODEL = QJsonTreeModel()
+    RECURSION_LIMIT = sys.getrecursionlimit()
+
+    print("%-14s %14s %14s %14s %14s" %
+          ("document", "load recursive", "load iterative", "gen recursive", "gen iterative"))
+    for name, document, depth in (("wide", wide_document(), 1),
+                                  ("nested", nested_document(), 4),
+                                  ("deep 400", deep_document(400), 400),
+                                  ("deep 100000", deep_document(100000), 200000)):
+        load_iterative, tree = measure(QJsonTreeItem.load_json_to_tree, document)
+        generate_iterative, _ = measure(MODEL.generate_json_from_free, tree)
+        if depth * 2 < RECURSION_LIMIT:
+            load_recursive, recursive_tree = measure(recursive_load_json_to_tree, document)
+            generate_recursive, _ = measure(recursive_generate_json_from_free, recursive_tree)
+            recursive = ("%13.3fs" % load_recursive, "%13.3fs" % generate_recursive)
+        else:
+            recursive = ("RecursionError", "RecursionError")
+        print("%-14s %14s %13.3fs %14s %13.3fs" %
+              (name, recursive[0], load_iterative, recursive[1], generate_iterative))
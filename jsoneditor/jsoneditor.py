@@ -8,7 +8,13 @@ from PyQt5.QtGui import QIcon
 
 from utils.Utils import Utils
 from utils.stylesheets import APPLICATION_STYLESHEET
+from utils.DocumentCache import DOCUMENT_CACHE
+from utils.QuickLook import QuickLook
 from mainwindow.MainWindow import MainWindow
+from mainwindow.FileBatchLoader import FileBatchLoader, expand_file_names
+
+# Offset in pixels between windows of files opened together
+WINDOW_CASCADE_OFFSET = 24
 
 
 if __name__ == '__main__':
@@ -19,22 +25,92 @@ if __name__ == '__main__':
     parser.add_argument(
         "-f", "--file", "--filename", "--file_name",
         dest="filename",
-        help="open a specific File from command line",
+        action="append",
+        default=[],
+        help="open a specific File from command line, could be repeated",
+        metavar="FILE"
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="open Files or glob patterns, each in its own window, parsed in parallel",
         metavar="FILE"
     )
 
+    parser.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        action="store_true",
+        help="do not read or write cache of parsed files"
+    )
+    parser.add_argument(
+        "--clear-cache",
+        dest="clear_cache",
+        action="store_true",
+        help="remove all cached parsed files before opening"
+    )
+    parser.add_argument(
+        "--quick-look",
+        dest="quick_look",
+        action="store_true",
+        help="print summary of the head of the Files parsed within quick_look_mb "
+             "and quick_look_seconds of config.ini and exit"
+    )
+
     args = parser.parse_args()
 
-    file_name = None
-    if args.filename:
-        file_name = args.filename
-    else:
-        file_name = CONFIG_OBJECT.get("Other", "default_json_file_name")
+    if args.clear_cache:
+        print("Removed %d cached files from %s" %
+              (DOCUMENT_CACHE.clear(), DOCUMENT_CACHE.directory))
+    if args.no_cache:
+        DOCUMENT_CACHE.enabled = False
+
+    file_names = expand_file_names(args.filename + args.files)
+    if args.quick_look:
+        for file_name in file_names:
+            QUICK_LOOK = QuickLook(file_name)
+            try:
+                QUICK_LOOK.scan(
+                    max_bytes=int(float(CONFIG_OBJECT.get(
+                        "Loading", "quick_look_mb", fallback="4")) * 1024 * 1024),
+                    max_seconds=float(CONFIG_OBJECT.get(
+                        "Loading", "quick_look_seconds", fallback="0.5")))
+            except OSError as exception:
+                print("%s: %s\n" % (file_name, exception))
+                continue
+            print("%s\n%s\n" % (file_name, QUICK_LOOK.summary()))
+        sys.exit(0)
+
+    show_maximized = Utils().string_to_boolean(CONFIG_OBJECT.get("MainWindow", "show_maximized"))
 
     APPLICATION = QApplication(sys.argv)
-    MAIN_WINDOW = MainWindow(
-        json_file_name=file_name,
-        show_maximized=Utils().string_to_boolean(CONFIG_OBJECT.get("MainWindow", "show_maximized")))
+    if len(file_names) <= 1:
+        if file_names:
+            file_name = file_names[0]
+        else:
+            file_name = CONFIG_OBJECT.get("Other", "default_json_file_name")
+        MAIN_WINDOW = MainWindow(json_file_name=file_name, show_maximized=show_maximized)
+    else:
+        # Every file is opened in its own window as soon as it is parsed. Closing
+        # windows does not quit while other files are still being parsed
+        MAIN_WINDOWS = []
+        APPLICATION.setQuitOnLastWindowClosed(False)
+
+        def open_main_window(file_name: str, document) -> None:
+            """Opens window of the file, cascaded over the previously opened ones."""
+            main_window = MainWindow(
+                json_file_name=file_name, show_maximized=show_maximized, document=document)
+            offset = WINDOW_CASCADE_OFFSET * (len(MAIN_WINDOWS) % 10)
+            main_window.move(main_window.x() + offset, main_window.y() + offset)
+            MAIN_WINDOWS.append(main_window)
+            if len(MAIN_WINDOWS) == len(file_names):
+                APPLICATION.setQuitOnLastWindowClosed(True)
+
+        BATCH_LOADER = FileBatchLoader(
+            workers=int(CONFIG_OBJECT.get("Loading", "parallel_workers", fallback="0")))
+        BATCH_LOADER.ready.connect(open_main_window)
+        APPLICATION.aboutToQuit.connect(BATCH_LOADER.stop)
+        BATCH_LOADER.start(file_names)
 
     APPLICATION.setStyleSheet(APPLICATION_STYLESHEET)
     APPLICATION.setWindowIcon(QIcon("utils/images/treeview/main_window.png"))
@@ -0,0 +1,269 @@
+"""This module loads JSON file to the tree of QJsonTreeItem outside of the GUI thread.
+
+    Typical usage example:
+    ----------------------
+
+    thread = QThread()
+    loader = DocumentLoader("example.json", lazy=False)
+    loader.moveToThread(thread)
+    thread.started.connect(loader.run)
+    loader.loaded.connect(model.set_root_item)
+    loader.items_loaded.connect(model.append_streamed_items)
+    loader.streamed.connect(model.finish_streaming)
+    loader.mapped.connect(model.set_root_item)
+    loader.parsed.connect(model.update_from_document)
+    thread.start()
+"""
+import sys
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+sys.path.insert(1, "..")
+from utils.Utils import Utils
+from utils.JsonParsing import JsonParsing
+from utils.JsonStream import JsonEventParser
+from utils.JsonCompression import decompressing_reader
+from utils.DocumentCache import DOCUMENT_CACHE
+from utils.JsonIndex import JsonIndex
+from utils.JsonLines import JsonLinesIndex
+sys.path.insert(1, Utils().get_abs_file_path("treemodel"))
+from QJsonTreeItem import QJsonTreeItem
+from QJsonTreeModel import FETCH_BATCH_SIZE
+
+# Top-level items of streamed document are sent to the GUI thread after this amount
+# of items or seconds, whichever comes first
+STREAM_BATCH_SIZE = 500
+STREAM_BATCH_INTERVAL = 0.1
+
+
+class DocumentLoader(QObject):
+    """Class to parse JSON file and build the tree in a worker thread.
+
+    Attributes:
+    -----------
+    file_name:
+        File name of JSON file
+    progress:
+        Signal with bytes read, total bytes and amount of created tree items
+    loaded:
+        Signal with root QJsonTreeItem of the built tree
+    items_loaded:
+        Signal with root QJsonTreeItem and list of its completed top-level items,
+        emitted while streamed document is still being read
+    streamed:
+        Signal with root QJsonTreeItem and final order of its top-level items,
+        emitted instead of loaded when the document was streamed
+    mapped:
+        Signal with root QJsonTreeItem and JsonIndex of memory-mapped document,
+        emitted instead of loaded when the document was opened memory-mapped
+        or as JSON Lines
+    parsed:
+        Signal with parsed document, emitted instead of loaded if the tree
+        is not built by the loader
+    failed:
+        Signal with error message
+    canceled:
+        Signal emitted if loading was canceled
+
+    Methods:
+    --------
+    run(self) -> None:
+        Parses file and builds the tree
+    cancel(self) -> None:
+        Cancels loading, could be called from any thread
+    """
+    progress = pyqtSignal("qint64", "qint64", "qint64")
+    loaded = pyqtSignal(object)
+    items_loaded = pyqtSignal(object, object)
+    streamed = pyqtSignal(object, object)
+    mapped = pyqtSignal(object, object)
+    parsed = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    canceled = pyqtSignal()
+
+    def __init__(self, file_name: str, lazy: bool=False, streaming: bool=False,
+                 mapped: bool=False, build_tree: bool=True, json_lines: bool=False,
+                 workers: int=1, document=None) -> None:
+        """Constructs all necessary attributes for the DocumentLoader object.
+
+        Args:
+        -----
+            file_name: str
+                File name of JSON file
+            lazy: bool
+                Build only first level of the tree, see QJsonTreeModel.lazy.
+                Ignored if streaming is True
+            streaming: bool
+                Build the tree from events of JsonEventParser while the file is read
+                and send completed top-level items with items_loaded signal
+            mapped: bool
+                Memory-map the file and only index its containers, see utils.JsonIndex.
+                Containers are parsed when they are expanded. Overrides lazy and streaming
+            build_tree: bool
+                Build the tree of the document. If False only the document is parsed
+                and emitted with parsed signal, for QJsonTreeModel.update_from_document.
+                Ignored if mapped is True
+            json_lines: bool
+                The file is JSON Lines. It is memory-mapped and indexed by lines, see
+                utils.JsonLines, records are parsed when they are expanded.
+                Overrides all other options
+            workers: int
+                Parse the file in shards by this amount of processes, see
+                utils.JsonShards. Overrides streaming if greater than 1
+            document: dict or list
+                Document of the file which was already parsed, the file is not read
+                and only the tree is built. Overrides all other options except build_tree
+        """
+        super().__init__()
+        self._file_name = file_name
+        self._lazy = lazy
+        self._streaming = streaming
+        self._mapped = mapped
+        self._build_tree = build_tree
+        self._json_lines = json_lines
+        self._workers = workers
+        self._document = document
+        self._is_canceled = False
+        self._bytes_read = 0
+        self._total_bytes = 0
+        self._batch = []
+        self._batch_time = 0.0
+        self._keys = []
+
+    @property
+    def file_name(self):
+        """Get current file_name."""
+        return self._file_name
+
+    def cancel(self) -> None:
+        """Cancels loading. Loading stops on the next chunk or batch of tree items."""
+        self._is_canceled = True
+
+    def run(self) -> None:
+        """Parses file and builds the tree.
+
+        Emits exactly one of loaded, streamed, mapped, parsed, failed or canceled signals.
+        Documents found in DOCUMENT_CACHE are never streamed.
+        Streamed documents are not written to DOCUMENT_CACHE, see _run_streaming.
+        """
+        try:
+            if self._document is not None:
+                document = self._document
+                self._document = None
+            elif self._mapped or self._json_lines:
+                self._run_mapped()
+                return
+            elif self._streaming and self._build_tree and self._workers <= 1:
+                document = DOCUMENT_CACHE.get(self._file_name)
+                if document is None:
+                    self._run_streaming()
+                    return
+            else:
+                document = JsonParsing().load_json_from_file(
+                    self._file_name, self._read_progress, self._workers)
+            if self._is_canceled:
+                self.canceled.emit()
+                return
+            if not isinstance(document, (dict, list)):
+                self.failed.emit(
+                    "`document` must be of dict, list or tuple, not %s" % type(document))
+                return
+            if not self._build_tree:
+                self.parsed.emit(document)
+                return
+
+            root_item = QJsonTreeItem.load_json_to_tree(
+                document, lazy=self._lazy, progress=self._build_progress)
+            del document
+            if root_item is None or self._is_canceled:
+                self.canceled.emit()
+                return
+
+            self.loaded.emit(root_item)
+        except (OSError, ValueError) as exception:
+            self.failed.emit(str(exception))
+        except BaseException as exception:
+            self.failed.emit("%s: %s" % (type(exception).__name__, exception))
+
+    def _run_streaming(self) -> None:
+        """Builds the tree from parser events and emits its top-level items in batches.
+
+        The document is not written to DOCUMENT_CACHE: its Python value would have to be
+        built next to the tree, which takes as much memory as json.load. Streamed files
+        are read again the next time they are opened.
+        """
+        self._batch_time = time.monotonic()
+        try:
+            with open(self._file_name, mode="rb") as raw_file:
+                # Progress of compressed files is their compressed bytes read
+                events = JsonEventParser(
+                    decompressing_reader(self._file_name, raw_file),
+                    progress=lambda _bytes_read, total_bytes: self._read_progress(
+                        raw_file.tell(), total_bytes)).events()
+                root_item = QJsonTreeItem.load_events_to_tree(
+                    events, progress=self._build_progress,
+                    top_level_item=self._streamed_item)
+            if root_item is None or self._is_canceled:
+                self.canceled.emit()
+                return
+            if root_item.type not in (dict, list):
+                self.failed.emit(
+                    "`document` must be of dict, list or tuple, not %s" % root_item.type)
+                return
+
+            self._emit_batch()
+            self.streamed.emit(root_item, QJsonTreeItem.final_order(self._keys))
+        except (OSError, ValueError) as exception:
+            self.failed.emit(str(exception))
+        except BaseException as exception:
+            self.failed.emit("%s: %s" % (type(exception).__name__, exception))
+
+    def _run_mapped(self) -> None:
+        """Indexes memory-mapped file and creates the root item of its tree.
+
+        Only the first level of the document is parsed, deeper levels are parsed
+        from the mapping when they are expanded. JSON Lines files are indexed by
+        lines, the first records are parsed here to report invalid files.
+        """
+        try:
+            if self._json_lines:
+                index = JsonLinesIndex(self._file_name)
+            else:
+                index = JsonIndex(self._file_name)
+            if not index.scan(self._read_progress) or self._is_canceled:
+                index.close()
+                self.canceled.emit()
+                return
+
+            root_item = QJsonTreeItem.load_span_to_tree(index.root())
+            # Parses the first level, and the records which are shown first
+            root_item.pending_items(FETCH_BATCH_SIZE)
+            self.mapped.emit(root_item, index)
+        except (OSError, ValueError) as exception:
+            self.failed.emit(str(exception))
+        except BaseException as exception:
+            self.failed.emit("%s: %s" % (type(exception).__name__, exception))
+
+    def _streamed_item(self, item: QJsonTreeItem, key) -> None:
+        self._batch.append(item)
+        self._keys.append(key)
+        if (len(self._batch) >= STREAM_BATCH_SIZE or
+                time.monotonic() - self._batch_time >= STREAM_BATCH_INTERVAL):
+            self._emit_batch()
+
+    def _emit_batch(self) -> None:
+        if self._batch and not self._is_canceled:
+            self.items_loaded.emit(self._batch[0].parent(), self._batch)
+        self._batch = []
+        self._batch_time = time.monotonic()
+
+    def _read_progress(self, bytes_read: int, total_bytes: int) -> bool:
+        self._bytes_read = bytes_read
+        self._total_bytes = total_bytes
+        self.progress.emit(bytes_read, total_bytes, 0)
+        return not self._is_canceled
+
+    def _build_progress(self, nodes: int) -> bool:
+        self.progress.emit(self._bytes_read, self._total_bytes, nodes)
+        return not self._is_canceled
@@ -0,0 +1,108 @@
+"""This module writes the tree of QJsonTreeItem to JSON file outside of the GUI thread.
+
+The text is written straight from the tree to a temporary file which replaces the file
+when it is complete, see treemodel.JsonTreeWriter. The tree must not change while it is
+written, QJsonTreeModel.is_frozen keeps it as it was when saving started. Unchanged
+containers are written from QJsonTreeModel.fragment_cache of the previous save. With a
+patcher only the edited values are written into the file, keeping its formatting, see
+treemodel.JsonTreePatcher; the whole file is written if the file can not be patched.
+
+    Typical usage example:
+    ----------------------
+
+    thread = QThread()
+    saver = DocumentSaver("example.json", model.root_item, cache=model.fragment_cache)
+    saver.moveToThread(thread)
+    thread.started.connect(saver.run)
+    saver.saved.connect(lambda file_name: print("Saved", file_name))
+    saver.failed.connect(print)
+    thread.start()
+"""
+import os
+import sys
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+sys.path.insert(1, "..")
+from utils.Utils import Utils
+sys.path.insert(1, Utils().get_abs_file_path("treemodel"))
+from JsonTreeWriter import write_tree_to_file
+
+
+class DocumentSaver(QObject):
+    """Class to write JSON file from the tree in a worker thread.
+
+    Attributes:
+    -----------
+    file_name:
+        File name of JSON file
+    error:
+        Error message if saving failed, None while saving and after it succeeded
+    progress:
+        Signal with bytes written and size of the file before saving, 0 for new files
+    saved:
+        Signal with file name, emitted when the file was replaced
+    failed:
+        Signal with error message, the file is not changed
+
+    Methods:
+    --------
+    run(self) -> None:
+        Writes the file
+    """
+    progress = pyqtSignal("qint64", "qint64")
+    saved = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, file_name: str, root_item, compact: bool=False, cache=None,
+                 patcher=None) -> None:
+        """Constructs all necessary attributes for the DocumentSaver object.
+
+        Args:
+        -----
+            file_name: str
+                File name of JSON file
+            root_item: QJsonTreeItem
+                Item whose value is written
+            compact: bool
+                Write JSON without indents and spaces instead of indent of 2 spaces
+            cache: FragmentCache
+                Texts of unchanged containers of root_item, updated after saving.
+                Default is None
+            patcher: JsonTreePatcher
+                Patcher of file_name tried before writing the whole file.
+                Default is None
+        """
+        super().__init__()
+        self._file_name = file_name
+        self._root_item = root_item
+        self._compact = compact
+        self._cache = cache
+        self._patcher = patcher
+        self._total_bytes = 0
+        self.error = None
+
+    @property
+    def file_name(self):
+        """Get current file_name."""
+        return self._file_name
+
+    def run(self) -> None:
+        """Writes the file and emits saved or failed."""
+        try:
+            self._total_bytes = os.path.getsize(self._file_name)
+        except OSError:
+            self._total_bytes = 0
+
+        try:
+            if self._patcher is None or not self._patcher.patch(progress=self._write_progress):
+                write_tree_to_file(self._file_name, self._root_item, compact=self._compact,
+                                   progress=self._write_progress, cache=self._cache)
+        except BaseException as exception:
+            self.error = str(exception) or type(exception).__name__
+            self.failed.emit(self.error)
+            return
+        self.saved.emit(self._file_name)
+
+    def _write_progress(self, bytes_written: int) -> None:
+        self.progress.emit(bytes_written, self._total_bytes)
@@ -0,0 +1,172 @@
+"""This module parses many JSON files in parallel worker processes.
+
+Every file is parsed in its own task of a process pool and reported as soon as it is
+parsed, so a slow or broken file does not hold up the others and opening all of them
+takes about as long as the slowest one. Parsed documents are sent back as marshal,
+which loads faster than pickle.
+
+Files which are opened memory-mapped, parsed in shards or are JSON Lines are not parsed
+by the pool, they are reported at once and loaded by their window as usual.
+
+    Typical usage example:
+    ----------------------
+
+    batch_loader = FileBatchLoader(workers=4)
+    batch_loader.ready.connect(
+        lambda file_name, document: MainWindow(file_name, document=document))
+    batch_loader.start(expand_file_names(["a.json", "configs/**/*.json"]))
+    ...
+    batch_loader.stop()
+"""
+import os
+import sys
+import glob
+import marshal
+import multiprocessing
+from functools import partial
+from configparser import ConfigParser
+from concurrent.futures import ProcessPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+sys.path.insert(1, "..")
+from utils.Utils import Utils
+from utils.JsonParsing import JsonParsing
+from utils.JsonLines import is_json_lines_file
+from utils.JsonCompression import is_compressed_file
+from utils.DocumentCache import DOCUMENT_CACHE
+
+
+CONFIG_OBJECT = ConfigParser()
+CONFIG_OBJECT.read(Utils().get_abs_file_path("utils/config/config.ini"))
+
+
+def expand_file_names(patterns: list) -> list:
+    """Return file names matched by patterns.
+
+    Patterns with wildcards are expanded with glob, "**" matches any subdirectories.
+    Other patterns are kept as they are, so missing files are reported when they
+    are opened. Every file is returned once, in the order of the patterns.
+    """
+    file_names = []
+    known = set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                print("No files match %s" % pattern)
+        else:
+            matches = [pattern]
+        for file_name in matches:
+            if os.path.isdir(file_name):
+                continue
+            abs_file_name = os.path.abspath(file_name)
+            if abs_file_name not in known:
+                known.add(abs_file_name)
+                file_names.append(file_name)
+    return file_names
+
+
+def parse_file(file_name: str, use_cache: bool) -> bytes:
+    """Return marshal dump of the document of file_name.
+
+    Called in worker processes. Documents are taken from and written to
+    DOCUMENT_CACHE like in the main process.
+    """
+    DOCUMENT_CACHE.enabled = use_cache
+    return marshal.dumps(JsonParsing().load_json_from_file(file_name))
+
+
+class FileBatchLoader(QObject):
+    """Class to parse many JSON files in a pool of worker processes.
+
+    Attributes:
+    -----------
+    ready:
+        Signal with file name and its parsed document, or None if the file has to be
+        loaded by its window: it could not be parsed or it is not parsed by the pool
+
+    Methods:
+    --------
+    start(self, file_names: list) -> None:
+        Starts parsing the files
+    stop(self) -> None:
+        Cancels parsing of files which were not started yet
+    """
+    ready = pyqtSignal(str, object)
+
+    def __init__(self, workers: int=0, parent=None) -> None:
+        """Constructs all necessary attributes for the FileBatchLoader object.
+
+        Args:
+        -----
+            workers: int
+                Amount of worker processes, 0 for the amount of CPUs
+            parent:
+                Parent of the loader. Default is None
+        """
+        super().__init__(parent)
+        self._workers = workers if workers > 0 else os.cpu_count() or 1
+        self._executor = None
+        self._futures = []
+
+    def start(self, file_names: list) -> None:
+        """Starts parsing the files, ready is emitted for every one of them.
+
+        Files which are not parsed by the pool are reported first.
+        """
+        pooled = []
+        for file_name in file_names:
+            if self._is_pooled(file_name):
+                pooled.append(file_name)
+            else:
+                self.ready.emit(file_name, None)
+        if not pooled:
+            return
+
+        # Worker processes are spawned, forking a process with running threads is not safe
+        self._executor = ProcessPoolExecutor(
+            max_workers=min(self._workers, len(pooled)),
+            mp_context=multiprocessing.get_context("spawn"))
+        for file_name in pooled:
+            future = self._executor.submit(parse_file, file_name, DOCUMENT_CACHE.enabled)
+            future.add_done_callback(partial(self._parsed, file_name))
+            self._futures.append(future)
+
+    def stop(self) -> None:
+        """Cancels parsing of files which were not started yet."""
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _parsed(self, file_name: str, future) -> None:
+        # Called in a thread of the executor, the signal is queued to the GUI thread
+        if future.cancelled():
+            return
+        try:
+            document = marshal.loads(future.result())
+        except BaseException as exception:
+            print("Could not parse %s in worker process: %s" % (file_name, exception))
+            document = None
+        self.ready.emit(file_name, document)
+
+    @classmethod
+    def _is_pooled(cls, file_name: str) -> bool:
+        """Return True if the file is parsed as a whole, so it could be parsed by the pool."""
+        if is_json_lines_file(file_name):
+            return False
+        # Compressed files are always parsed as a whole
+        if is_compressed_file(file_name):
+            return True
+        try:
+            size = os.path.getsize(file_name)
+        except OSError:
+            return False
+        for option in ("mapped_threshold_mb", "parallel_threshold_mb"):
+            threshold = float(CONFIG_OBJECT.get("Loading", option, fallback="0")) * 1024 * 1024
+            if 0 < threshold <= size:
+                return False
+        return True
@@ -0,0 +1,349 @@
+"""This module watches JSON file for changes made by other programs.
+
+Bursts of writes are debounced, then size and mtime of the file are compared with the
+last known ones and only if they differ the content is hashed. The changed signal is
+emitted only if the content really changed. Files are stat'ed and hashed in a worker
+thread, so the GUI thread is never blocked by large files.
+
+FileFollower follows a growing JSON Lines file instead: only the lines appended after
+the last read offset are read and parsed, in a worker thread too.
+
+    Typical usage example:
+    ----------------------
+
+    watcher = FileWatcher(debounce_ms=500)
+    watcher.changed.connect(main_window.json_file_changed)
+    watcher.watch("example.json")
+    ...
+    watcher.watch("example.json")  # after the file was saved by the editor itself
+    watcher.stop()
+
+    follower = FileFollower(debounce_ms=500)
+    follower.records_read.connect(model.append_records)
+    follower.follow("example.jsonl", offset=index.size)
+"""
+import os
+import sys
+
+from PyQt5.QtCore import QObject, QThread, QTimer, QFileSystemWatcher, pyqtSignal
+
+sys.path.insert(1, "..")
+from utils.Utils import Utils
+from utils.JsonLines import read_appended_records
+
+
+class FileChecker(QObject):
+    """Class to compare content of files with their last known state in a worker thread.
+
+    Slots are called through queued signals, so checks are done in the order
+    they were requested.
+
+    Attributes:
+    -----------
+    changed:
+        Signal with file name of the file whose content changed
+
+    Methods:
+    --------
+    rebase(self, file_name: str) -> None:
+        Remembers current state of the file as the known one
+    check(self, file_name: str) -> None:
+        Emits changed if content of the file differs from the known one
+    """
+    changed = pyqtSignal(str)
+
+    def __init__(self) -> None:
+        """Constructs all necessary attributes for the FileChecker object."""
+        super().__init__()
+        self._states = {}
+
+    def rebase(self, file_name: str) -> None:
+        """Remembers (size, mtime, hash) of the file as its known state."""
+        try:
+            self._states[file_name] = self._state(file_name, None)
+        except OSError:
+            self._states.pop(file_name, None)
+
+    def check(self, file_name: str) -> None:
+        """Emits changed if content of the file differs from its known state.
+
+        The file is hashed only if its size or mtime differ from the known ones.
+        Missing files are not reported, they are checked again on the next change.
+        """
+        known = self._states.get(file_name)
+        try:
+            state = self._state(file_name, known)
+        except OSError:
+            return
+
+        self._states[file_name] = state
+        if known is not None and state[2] != known[2]:
+            self.changed.emit(file_name)
+
+    @classmethod
+    def _state(cls, file_name: str, known: tuple) -> tuple:
+        """Return (size, mtime, hash) of the file, hash is reused if stat is the known one."""
+        file_stat = os.stat(file_name)
+        if (known is not None and
+                known[0] == file_stat.st_size and known[1] == file_stat.st_mtime_ns):
+            return known
+        return (file_stat.st_size, file_stat.st_mtime_ns, Utils().file_hash(file_name))
+
+
+class FileWatcher(QObject):
+    """Class to watch one file with QFileSystemWatcher and report changes of its content.
+
+    Attributes:
+    -----------
+    file_name:
+        Absolute file name of the watched file or None
+    changed:
+        Signal with file name of the watched file, emitted when its content changed
+
+    Methods:
+    --------
+    watch(self, file_name: str) -> None:
+        Starts watching the file, its current content is the known one
+    unwatch(self) -> None:
+        Stops watching the file
+    stop(self) -> None:
+        Stops watching and the worker thread
+    """
+    changed = pyqtSignal(str)
+
+    _rebase_requested = pyqtSignal(str)
+    _check_requested = pyqtSignal(str)
+
+    def __init__(self, debounce_ms: int=500, parent=None) -> None:
+        """Constructs all necessary attributes for the FileWatcher object.
+
+        Args:
+        -----
+            debounce_ms: int
+                The file is checked after there were no writes for this time
+            parent:
+                Parent of the watcher. Default is None
+        """
+        super().__init__(parent)
+        self.file_name = None
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._file_changed)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._check)
+
+        self._thread = QThread(self)
+        self._checker = FileChecker()
+        self._checker.moveToThread(self._thread)
+        self._rebase_requested.connect(self._checker.rebase)
+        self._check_requested.connect(self._checker.check)
+        self._checker.changed.connect(self._content_changed)
+        self._thread.start()
+
+    def watch(self, file_name: str) -> None:
+        """Starts watching the file. Its content at this moment is the known one.
+
+        Called again after the file was written by the editor itself, so its own
+        writes are not reported.
+        """
+        self.unwatch()
+        self.file_name = os.path.abspath(file_name)
+        self._watcher.addPath(self.file_name)
+        self._rebase_requested.emit(self.file_name)
+
+    def unwatch(self) -> None:
+        """Stops watching the file."""
+        self._timer.stop()
+        files = self._watcher.files()
+        if files:
+            self._watcher.removePaths(files)
+        self.file_name = None
+
+    def stop(self) -> None:
+        """Stops watching and waits for the worker thread."""
+        self.unwatch()
+        self._thread.quit()
+        self._thread.wait()
+
+    def _file_changed(self, path: str) -> None:
+        if path == self.file_name:
+            self._timer.start()
+
+    def _check(self) -> None:
+        if self.file_name is None:
+            return
+        # Files replaced by rename are dropped by QFileSystemWatcher, they are
+        # watched again when the new file appears
+        if self.file_name not in self._watcher.files():
+            if not os.path.exists(self.file_name):
+                self._timer.start()
+                return
+            self._watcher.addPath(self.file_name)
+        self._check_requested.emit(self.file_name)
+
+    def _content_changed(self, file_name: str) -> None:
+        if file_name == self.file_name:
+            self.changed.emit(file_name)
+
+
+class TailReader(QObject):
+    """Class to read lines appended to JSON Lines file in a worker thread.
+
+    Attributes:
+    -----------
+    read_done:
+        Signal with generation, parsed records and offset after the last read line
+    truncated:
+        Signal with generation, emitted if the file became shorter than offset
+
+    Methods:
+    --------
+    read(self, generation: int, file_name: str, offset: int) -> None:
+        Reads and parses lines appended after offset
+    """
+    read_done = pyqtSignal(int, object, "qint64")
+    truncated = pyqtSignal(int)
+
+    def read(self, generation: int, file_name: str, offset: int) -> None:
+        """Reads and parses lines appended after offset, errors are printed."""
+        try:
+            records, offset = read_appended_records(file_name, offset)
+        except ValueError:
+            self.truncated.emit(generation)
+            return
+        except OSError as exception:
+            print("Could not read appended lines of %s: %s" % (file_name, exception))
+            records = []
+        self.read_done.emit(generation, records, offset)
+
+
+class FileFollower(QObject):
+    """Class to follow a growing JSON Lines file and report its appended records.
+
+    Only one read is done at a time. Changes which come during a read start the next
+    read when it is finished. Results of reads of a previously followed file are ignored.
+
+    Attributes:
+    -----------
+    file_name:
+        Absolute file name of the followed file or None
+    offset:
+        Byte offset after the last read line
+    records_read:
+        Signal with list of records appended to the file
+    truncated:
+        Signal emitted if the file became shorter, it was truncated or replaced
+
+    Methods:
+    --------
+    follow(self, file_name: str, offset: int) -> None:
+        Starts following the file from offset
+    unfollow(self) -> None:
+        Stops following the file
+    stop(self) -> None:
+        Stops following and the worker thread
+    """
+    records_read = pyqtSignal(object)
+    truncated = pyqtSignal()
+
+    _read_requested = pyqtSignal(int, str, "qint64")
+
+    def __init__(self, debounce_ms: int=500, parent=None) -> None:
+        """Constructs all necessary attributes for the FileFollower object.
+
+        Args:
+        -----
+            debounce_ms: int
+                Appended lines are read after there were no writes for this time
+            parent:
+                Parent of the follower. Default is None
+        """
+        super().__init__(parent)
+        self.file_name = None
+        self.offset = 0
+        self._generation = 0
+        self._is_reading = False
+        self._is_changed = False
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._file_changed)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._read)
+
+        self._thread = QThread(self)
+        self._reader = TailReader()
+        self._reader.moveToThread(self._thread)
+        self._read_requested.connect(self._reader.read)
+        self._reader.read_done.connect(self._read_done)
+        self._reader.truncated.connect(self._truncated)
+        self._thread.start()
+
+    def follow(self, file_name: str, offset: int) -> None:
+        """Starts following the file, lines appended after offset are reported.
+
+        Lines appended between offset and this call are read at once.
+        """
+        self.unfollow()
+        self.file_name = os.path.abspath(file_name)
+        self.offset = offset
+        self._watcher.addPath(self.file_name)
+        self._read()
+
+    def unfollow(self) -> None:
+        """Stops following the file."""
+        self._timer.stop()
+        files = self._watcher.files()
+        if files:
+            self._watcher.removePaths(files)
+        self.file_name = None
+        self._generation += 1
+        self._is_reading = False
+        self._is_changed = False
+
+    def stop(self) -> None:
+        """Stops following and waits for the worker thread."""
+        self.unfollow()
+        self._thread.quit()
+        self._thread.wait()
+
+    def _file_changed(self, path: str) -> None:
+        if path == self.file_name:
+            self._timer.start()
+
+    def _read(self) -> None:
+        if self.file_name is None:
+            return
+        if self._is_reading:
+            self._is_changed = True
+            return
+        # Files replaced by rename are dropped by QFileSystemWatcher
+        if self.file_name not in self._watcher.files():
+            if not os.path.exists(self.file_name):
+                self._timer.start()
+                return
+            self._watcher.addPath(self.file_name)
+        self._is_reading = True
+        self._is_changed = False
+        self._read_requested.emit(self._generation, self.file_name, self.offset)
+
+    def _read_done(self, generation: int, records: list, offset: int) -> None:
+        if generation != self._generation:
+            return
+        self._is_reading = False
+        # Reads are limited in size, the file is read again until nothing is left
+        is_advanced = offset != self.offset
+        self.offset = offset
+        if records:
+            self.records_read.emit(records)
+        if self._is_changed or is_advanced:
+            self._read()
+
+    def _truncated(self, generation: int) -> None:
+        if generation != self._generation:
+            return
+        self.unfollow()
+        self.truncated.emit()
@@ -12,6 +12,7 @@ MainWindow inherited from QMainWindow.
                 "MainWindow", "showmaximized")))
 """
 import os
+import re
 import sys
 import gettext
 from functools import partial
@@ -20,16 +21,24 @@ from configparser import ConfigParser
 from PyQt5.QtWidgets import (
     QApplication, QFileDialog, QMainWindow, QMenu, QMessageBox,
     QTreeView, QVBoxLayout, QHBoxLayout, QWidget, QLineEdit,
-    QCheckBox, QFrame, QAbstractItemView
+    QCheckBox, QFrame, QAbstractItemView, QProgressBar, QPushButton, QLabel,
+    QInputDialog, QActionGroup
 )
-from PyQt5.QtGui import QKeySequence
-from PyQt5.QtCore import Qt, QSortFilterProxyModel
+from PyQt5.QtGui import QKeySequence, QFontDatabase
+from PyQt5.QtCore import Qt, QSortFilterProxyModel, QThread
 from PyQt5 import uic
 
 from utils.JsonParsing import JsonParsing
 from utils.Utils import Utils
 from utils.stylesheets import QTREEVIEW_STYLESHEET
-from treemodel.QJsonTreeModel import QJsonTreeModel
+from utils.JsonLines import JsonLinesIndex, is_json_lines_file
+from utils.QuickLook import QuickLook
+from utils.JsonCompression import is_compressed_file
+from treemodel.QJsonTreeModel import QJsonTreeModel, SEARCH_RECORD_LIMIT
+from treemodel.JsonTreePatcher import file_state
+from mainwindow.DocumentLoader import DocumentLoader
+from mainwindow.DocumentSaver import DocumentSaver
+from mainwindow.FileWatcher import FileWatcher, FileFollower
 
 
 CONFIG_OBJECT = ConfigParser()
@@ -43,6 +52,15 @@ TRANSLATE_MAINWINDOW.install()
 
 MAIN_WINDOW_FILE_NAME = Utils().get_abs_file_path("mainwindow/mainwindow.ui")
 
+# Load profiles, see MainWindow.choose_load_profile
+PROFILE_AUTO = "auto"
+PROFILE_SMALL = "small"
+PROFILE_LARGE = "large"
+
+# Budget of parsing the head of the file to estimate its node count
+PROFILE_SAMPLE_BYTES = 256 * 1024
+PROFILE_SAMPLE_SECONDS = 0.1
+
 class MainWindow(QMainWindow):
     """Class to create main window.
 
@@ -67,6 +85,15 @@ class MainWindow(QMainWindow):
         Check boxes for searching properties
     filter_proxy_model:
         QSortFilterProxyModel for filtering and searching in QTreeView model
+    progress_bar:
+    button_cancel_loading:
+        Status bar widgets showing progress of loading file in background
+    label_source_position:
+        Status bar label with line and column of the current item in memory-mapped file
+    file_watcher:
+        FileWatcher which reports changes of JSON-file made by other programs
+    file_follower:
+        FileFollower which reports records appended to followed JSON Lines file
 
     Methods:
     --------
@@ -92,14 +119,79 @@ class MainWindow(QMainWindow):
         Action to create new an empty JSON file on the main window
     action_open_file_dialog(self) -> None:
         Action for opening file dialog
+    action_open_file_mapped_dialog(self) -> None:
+        Action for opening file dialog for memory-mapped file
+    choose_json_file(self) -> str:
+        Opens file dialog with quick look of the current file
+    show_quick_look(self, label: QLabel, file_name: str) -> None:
+        Shows summary of the head of the file in the label
     action_save_json_file(self) -> None:
         Action for saving data to file
     action_save_json_file_as(self) -> None:
         Action for saving file as new file or an existing one
+    start_saving(self, file_name: str) -> None:
+        Starts writing the tree to JSON file in a worker thread
+    is_saving(self) -> bool:
+        Return True if JSON file is being saved
+    wait_for_saving(self) -> None:
+        Waits until the file being saved is written
+    saving_progress(self, bytes_written: int, total_bytes: int) -> None:
+        Shows saving progress in the status bar
+    saving_finished(self) -> None:
+        Shows result of saving in background
+    json_file_saved(self, file_name: str) -> None:
+        Shows the written file in the window
+    action_save_json_selection_as(self) -> None:
+        Action for saving the current item with its children to a new file
     action_refresh_json_file(self) -> None:
         Action for loading JSON from file to the main window. "Refreshing"
+    action_change_watch_file(self) -> None:
+        Turns reloading JSON file on its changes on or off
+    action_change_compact_output(self) -> None:
+        Turns writing JSON files without indents and line breaks on or off
+    action_change_preserve_formatting(self) -> None:
+        Turns saving edits into the file keeping its layout on or off
+    action_change_follow_file(self) -> None:
+        Turns following JSON Lines file on or off
+    json_file_synced(self) -> None:
+        Marks the tree as matching JSON file after it was loaded or saved
+    watch_json_file(self) -> None:
+        Starts watching JSON file for changes made by other programs or following it
+    json_file_changed(self, file_name: str) -> None:
+        Reloads JSON file which was changed by other program
+    json_records_appended(self, records: list) -> None:
+        Appends records of followed JSON Lines file to the tree
+    json_file_truncated(self) -> None:
+        Reloads followed JSON Lines file which was truncated
+    load_json_file(self, file_name: str, expand: bool, mapped: bool, patch: bool,
+                   json_lines: bool, document) -> None:
+        Starts loading JSON file in a worker thread
+    choose_load_profile(self, file_name: str) -> str:
+        Return small or large load profile of the file
+    apply_load_profile(self, profile: str) -> None:
+        Sets up the model and QTreeView for the load profile
+    action_change_load_profile(self, setting: str) -> None:
+        Sets load profile manually or back to automatic
+    cancel_loading(self) -> None:
+        Cancels loading JSON file
+    is_loading(self) -> bool:
+        Return True if JSON file is being loaded
+    clear_partial_document(self) -> None:
+        Clears the model if streamed loading was not finished
+    expand_tree_from_settings(self) -> None:
+        Expands QTreeView as it is set in config.ini file
     action_find_visible(self) -> None:
         Changing QLineEdit visible
+    search_text_changed(self, text: str) -> None:
+        Applies search text, for large documents only when it is cleared
+    apply_search(self) -> None:
+        Filters QTreeView by the search text
+    fetch_search_records(self, text: str) -> None:
+        Parses records of JSON Lines document which match search text
+    action_go_to_line_dialog(self) -> None:
+        Selects item at line and column of memory-mapped file
+    show_source_position(self, current, previous) -> None:
+        Shows line and column of the current item in the status bar
     action_expand_tree(self, expand_lvl: str) -> None:
         Expanding QTreeView
     action_tree_color(self, color: str) -> None:
@@ -118,10 +210,13 @@ class MainWindow(QMainWindow):
         Action for centering main window
     create_message_box(self, message: str, type: str) -> None:
         Create message box with some predefined settings
+    set_window_title(self, file_name: str) -> None:
+        Shows file name and modified marker in the window title
     check_saved_before_exit(self):
         Check if model was saved before exiting appication
     """
-    def __init__(self, json_file_name: str, show_maximized: bool=False) -> None:
+    def __init__(self, json_file_name: str, show_maximized: bool=False,
+                 document=None) -> None:
         """Constructs all necessary attributes for the QJsonTreeModel object.
 
         Args:
@@ -130,6 +225,9 @@ class MainWindow(QMainWindow):
                 File name of file to open it in QTreeView. Could be "".
             show_maximized: bool
                 Show maximized or minimized MainWindow
+            document: dict or list
+                Document of json_file_name which was already parsed, for example
+                by FileBatchLoader. None to parse the file
         """
         super().__init__()
 
@@ -137,15 +235,36 @@ class MainWindow(QMainWindow):
 
         self._json_file_name = json_file_name
         self._model = None
+        self._loader = None
+        self._loader_thread = None
+        self._loader_expand = True
+        self._loader_root = None
+        self._canceled_loaders = []
+        self._saver = None
+        self._saver_thread = None
+        self._file_state = None
+        self._profile = PROFILE_SMALL
+        self._profile_setting = CONFIG_OBJECT.get("Loading", "load_profile", fallback=PROFILE_AUTO)
         self.new_window = None
 
+        self.file_watcher = FileWatcher(
+            debounce_ms=int(CONFIG_OBJECT.get("Other", "watch_debounce_ms", fallback="500")),
+            parent=self)
+        self.file_watcher.changed.connect(self.json_file_changed)
+        self.file_follower = FileFollower(
+            debounce_ms=int(CONFIG_OBJECT.get("Other", "follow_debounce_ms", fallback="200")),
+            parent=self)
+        self.file_follower.records_read.connect(self.json_records_appended)
+        self.file_follower.truncated.connect(self.json_file_truncated)
+
         if len(json_file_name) == 0:
             self._json_text = {TRANSLATE_MAINWINDOW.gettext("New string"):
                                TRANSLATE_MAINWINDOW.gettext("New string")}
-            self.setWindowTitle(TRANSLATE_MAINWINDOW.gettext("untilted"))
+            self.set_window_title(TRANSLATE_MAINWINDOW.gettext("untilted"))
         else:
-            self._json_text = JsonParsing().get_json_from_file(json_file_name) # dict
-            self.setWindowTitle(Utils().get_abs_file_path(self.json_file_name))
+            # File is loaded in background after the window is shown
+            self._json_text = {}
+            self.set_window_title(Utils().get_abs_file_path(self.json_file_name))
 
         #self.setGeometry(0, 0, 640, 480)
         self.resize(1024, 720)
@@ -158,6 +277,9 @@ class MainWindow(QMainWindow):
         else:
             self.show()
 
+        if len(json_file_name) != 0:
+            self.load_json_file(json_file_name, document=document)
+
     @property
     def model(self):
         """Get or set current model."""
@@ -200,7 +322,10 @@ class MainWindow(QMainWindow):
         self.check_box_case_sensitive = QCheckBox()
         self.check_box_column = QCheckBox()
 
-        self.model = QJsonTreeModel()
+        self.model = QJsonTreeModel(
+            lazy=Utils().string_to_boolean(
+                CONFIG_OBJECT.get("QTreeView", "lazy_loading", fallback="False")))
+        self.model.modified_changed.connect(self.setWindowModified)
         self.tree_view.setContextMenuPolicy(Qt.CustomContextMenu)
         self.tree_view.customContextMenuRequested.connect(self.open_right_click_menu)
         self.tree_view.setStyleSheet(QTREEVIEW_STYLESHEET)
@@ -218,7 +343,8 @@ class MainWindow(QMainWindow):
         self.tree_view.setColumnWidth(0, 512)
         self.tree_view.setColumnWidth(1, 64)
 
-        self.line_edit.textChanged.connect(self.filter_proxy_model.setFilterRegExp)
+        self.line_edit.textChanged.connect(self.search_text_changed)
+        self.line_edit.returnPressed.connect(self.apply_search)
 
         horizontal_layout_bottom.addWidget(self.check_box_case_sensitive)
         horizontal_layout_bottom.addWidget(self.check_box_column)
@@ -229,11 +355,50 @@ class MainWindow(QMainWindow):
 
         widget.setLayout(mainwindow_layout)
         self.setCentralWidget(widget)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(256)
+        self.progress_bar.hide()
+        self.button_cancel_loading = QPushButton(TRANSLATE_MAINWINDOW.gettext("Cancel"))
+        self.button_cancel_loading.clicked.connect(self.cancel_loading)
+        self.button_cancel_loading.hide()
+        self.button_load_profile = QPushButton()
+        self.button_load_profile.setFlat(True)
+        menu_load_profile = QMenu(self.button_load_profile)
+        action_group_load_profile = QActionGroup(menu_load_profile)
+        for setting, text in (
+                (PROFILE_AUTO, TRANSLATE_MAINWINDOW.gettext("Automatic")),
+                (PROFILE_SMALL, TRANSLATE_MAINWINDOW.gettext("Small document")),
+                (PROFILE_LARGE, TRANSLATE_MAINWINDOW.gettext("Large document"))):
+            action = menu_load_profile.addAction(text)
+            action.setCheckable(True)
+            action.setChecked(setting == self._profile_setting)
+            action.triggered.connect(partial(self.action_change_load_profile, setting))
+            action_group_load_profile.addAction(action)
+        self.button_load_profile.setMenu(menu_load_profile)
+        self.label_source_position = QLabel()
+        self.statusbar.addPermanentWidget(self.label_source_position)
+        self.statusbar.addPermanentWidget(self.button_load_profile)
+        self.tree_view.selectionModel().currentChanged.connect(self.show_source_position)
+        self.model.modelReset.connect(self.label_source_position.clear)
+        self.statusbar.addPermanentWidget(self.progress_bar)
+        self.statusbar.addPermanentWidget(self.button_cancel_loading)
+        self.apply_load_profile(self.choose_load_profile(""))
+
         self.preload_user_settings()
 
     def closeEvent(self, event):
         """Close event for QMainWindow."""
-        self.check_saved_before_exit()
+        self.wait_for_saving()
+        if self.is_loading():
+            self.cancel_loading()
+        else:
+            self.check_saved_before_exit()
+            self.wait_for_saving()
+        for loader, thread in self._canceled_loaders:
+            thread.wait()
+        self.file_watcher.stop()
+        self.file_follower.stop()
 
         show_maximized = False
         if int(self.windowState()) == 2:
@@ -284,6 +449,11 @@ class MainWindow(QMainWindow):
         self.action_open_file.setText(TRANSLATE_MAINWINDOW.gettext("Open"))
         self.action_open_file.setShortcut(QKeySequence("Ctrl+O"))
 
+        self.action_open_file_mapped.triggered.connect(self.action_open_file_mapped_dialog)
+        self.action_open_file_mapped.setText(
+            TRANSLATE_MAINWINDOW.gettext("Open Memory-Mapped..."))
+        self.action_open_file_mapped.setShortcut(QKeySequence("Ctrl+Shift+O"))
+
         self.action_save_file.triggered.connect(self.action_save_json_file)
         self.action_save_file.setText(TRANSLATE_MAINWINDOW.gettext("Save"))
         self.action_save_file.setShortcut(QKeySequence("Ctrl+S"))
@@ -292,10 +462,33 @@ class MainWindow(QMainWindow):
         self.action_save_file_as.setText(TRANSLATE_MAINWINDOW.gettext("Save As..."))
         self.action_save_file_as.setShortcut(QKeySequence("Ctrl+Shift+S"))
 
+        self.action_save_selection_as.triggered.connect(self.action_save_json_selection_as)
+        self.action_save_selection_as.setText(
+            TRANSLATE_MAINWINDOW.gettext("Save Selection As..."))
+
         self.action_refresh_file.triggered.connect(self.action_refresh_json_file)
         self.action_refresh_file.setText(TRANSLATE_MAINWINDOW.gettext("Refresh"))
         self.action_refresh_file.setShortcut(QKeySequence(Qt.Key_F5))
 
+        self.action_watch_file.setChecked(Utils().string_to_boolean(
+            CONFIG_OBJECT.get("Other", "watch_file", fallback="False")))
+        self.action_watch_file.triggered.connect(self.action_change_watch_file)
+        self.action_watch_file.setText(TRANSLATE_MAINWINDOW.gettext("Reload on Change"))
+
+        self.action_compact_output.setChecked(Utils().string_to_boolean(
+            CONFIG_OBJECT.get("Other", "compact_output", fallback="False")))
+        self.action_compact_output.triggered.connect(self.action_change_compact_output)
+        self.action_compact_output.setText(TRANSLATE_MAINWINDOW.gettext("Compact Output"))
+
+        self.action_preserve_formatting.setChecked(Utils().string_to_boolean(
+            CONFIG_OBJECT.get("Other", "preserve_formatting", fallback="False")))
+        self.action_preserve_formatting.triggered.connect(self.action_change_preserve_formatting)
+        self.action_preserve_formatting.setText(
+            TRANSLATE_MAINWINDOW.gettext("Preserve Formatting"))
+
+        self.action_follow_file.triggered.connect(self.action_change_follow_file)
+        self.action_follow_file.setText(TRANSLATE_MAINWINDOW.gettext("Follow"))
+
         self.action_close_app.triggered.connect(self.close)
         self.action_close_app.setText(TRANSLATE_MAINWINDOW.gettext("Quit"))
         self.action_close_app.setShortcut("Ctrl+Q")
@@ -317,6 +510,10 @@ class MainWindow(QMainWindow):
         self.action_find.setText(TRANSLATE_MAINWINDOW.gettext("Find"))
         self.action_find.setShortcut(QKeySequence("Ctrl+F"))
 
+        self.action_go_to_line.triggered.connect(self.action_go_to_line_dialog)
+        self.action_go_to_line.setText(TRANSLATE_MAINWINDOW.gettext("Go to Line..."))
+        self.action_go_to_line.setShortcut(QKeySequence("Ctrl+G"))
+
         self.menu_expand.setTitle(TRANSLATE_MAINWINDOW.gettext("Expand"))
 
         self.action_collapse.triggered.connect(partial(self.action_expand_tree, "Collapse"))
@@ -388,41 +585,92 @@ class MainWindow(QMainWindow):
 
         Changes window title to "untilted" and loads to QTreeView model an empty dictionary
         """
+        self.wait_for_saving()
         self.json_file_name = TRANSLATE_MAINWINDOW.gettext("untilted")
-        self.setWindowTitle(self.json_file_name)
+        self.set_window_title(self.json_file_name)
+        self.file_watcher.unwatch()
+        self.file_follower.unfollow()
         self.model.clear()
         self.model.load({TRANSLATE_MAINWINDOW.gettext("New string"):
                          TRANSLATE_MAINWINDOW.gettext("New string")})
 
     def action_open_file_dialog(self) -> None:
         """Opens file dialog to for opening new JSON-file."""
-        options = QFileDialog.Options()
-        options |= QFileDialog.DontUseNativeDialog
-        file_name, _ = QFileDialog.getOpenFileName(
+        file_name = self.choose_json_file()
+        if file_name:
+            self.json_file_name = file_name
+            self.set_window_title(file_name)
+            self.load_json_file(file_name)
+
+    def action_open_file_mapped_dialog(self) -> None:
+        """Opens file dialog for opening JSON-file memory-mapped.
+
+        Only containers of the file are indexed on opening, they are parsed from the
+        file when they are expanded, see utils.JsonIndex.
+        """
+        file_name = self.choose_json_file()
+        if file_name:
+            self.json_file_name = file_name
+            self.set_window_title(file_name)
+            self.load_json_file(file_name, mapped=True)
+
+    def choose_json_file(self) -> str:
+        """Opens file dialog for choosing JSON-file with quick look of the current file.
+
+        Quick look shows a summary of the head of the file, parsed within the budget of
+        quick_look_mb and quick_look_seconds of config.ini, see utils.QuickLook.
+
+        Returns:
+        --------
+            Chosen file name or "" if the dialog was canceled
+        """
+        dialog = QFileDialog(
             self,
             TRANSLATE_MAINWINDOW.gettext("Choose JSON File"),
             "",
-            "JSON Files (*.json)",
-            options=options)
-        if file_name:
-            self.json_file_name = file_name
-            self.model.load(JsonParsing().get_json_from_file(file_name))
-            self.setWindowTitle(file_name)
-
-            # Expand recently openeded file
-            expand_all = Utils().string_to_boolean(
-                CONFIG_OBJECT.get("QTreeView-expand", "expand_all"))
-            expand_to_depth = int(CONFIG_OBJECT.get("QTreeView-expand", "expand_to_depth"))
-            if expand_all and expand_to_depth == -1:
-                self.tree_view.expandAll()
-            elif not expand_all and expand_to_depth == -2:
-                self.tree_view.collapseAll()
-            elif expand_to_depth > -1:
-                self.tree_view.expandToDepth(expand_to_depth)
+            "JSON Files (*.json *.json.gz *.json.bz2 *.json.xz);;"
+            "JSON Lines Files (*.jsonl *.ndjson)")
+        dialog.setOption(QFileDialog.DontUseNativeDialog)
+        dialog.setFileMode(QFileDialog.ExistingFile)
+
+        label_quick_look = QLabel()
+        label_quick_look.setMinimumWidth(256)
+        label_quick_look.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        label_quick_look.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        label_quick_look.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout = dialog.layout()
+        layout.addWidget(label_quick_look, 0, layout.columnCount(), layout.rowCount(), 1)
+        dialog.currentChanged.connect(partial(self.show_quick_look, label_quick_look))
+
+        if dialog.exec() and dialog.selectedFiles():
+            return dialog.selectedFiles()[0]
+        return ""
+
+    def show_quick_look(self, label: QLabel, file_name: str) -> None:
+        """Shows quick look of the file in the label, clears it for directories."""
+        if not os.path.isfile(file_name):
+            label.clear()
+            return
+
+        quick_look = QuickLook(file_name)
+        try:
+            quick_look.scan(
+                max_bytes=int(float(CONFIG_OBJECT.get(
+                    "Loading", "quick_look_mb", fallback="4")) * 1024 * 1024),
+                max_seconds=float(CONFIG_OBJECT.get(
+                    "Loading", "quick_look_seconds", fallback="0.5")))
+        except OSError as exception:
+            label.setText(str(exception))
+            return
+        label.setText("%s\n\n%s" % (TRANSLATE_MAINWINDOW.gettext("Quick Look"),
+                                    quick_look.summary(TRANSLATE_MAINWINDOW.gettext)))
 
     def action_save_json_file(self) -> None:
         """Saves JSON to file.
 
+        JSON documents are written in background, see start_saving. JSON Lines
+        documents are written at once.
+
         Raises:
         -------
             FileNotFoundError:
@@ -440,13 +688,13 @@ class MainWindow(QMainWindow):
                     message=message,
                     type="Critical")
             else:
-                JsonParsing().write_json_to_file(
-                    self.json_file_name, self.model.get_json_from_tree())
-
-                # Update config default_json_file_name
-                CONFIG_OBJECT["Other"]["default_json_file_name"] = str(self.json_file_name)
-                with open(Utils().get_abs_file_path("utils/config/config.ini"), "w") as config_file:
-                    CONFIG_OBJECT.write(config_file)
+                self.wait_for_saving()
+                if isinstance(self.model.source_index, JsonLinesIndex):
+                    JsonParsing().write_json_lines_to_file(
+                        self.json_file_name, self.model.get_json_lines_from_tree())
+                    self.json_file_saved(self.json_file_name)
+                else:
+                    self.start_saving(self.json_file_name)
         except FileNotFoundError as exception:
             message = TRANSLATE_MAINWINDOW.gettext(
                 "FileNotFoundError exception in action_save_json_file() function: %s") % \
@@ -471,6 +719,9 @@ class MainWindow(QMainWindow):
     def action_save_json_file_as(self) -> None:
         """Saves JSON to file as new file.
 
+        JSON documents are written in background, see start_saving, the tree is kept
+        and shows the new file.
+
         Raises:
         -------
             FileNotFoundError:
@@ -485,7 +736,10 @@ class MainWindow(QMainWindow):
                 self,
                 TRANSLATE_MAINWINDOW.gettext("Save File"),
                 "",
-                "JSON Files (*.json);;Text Files (*.txt);;All Files (*)")
+                "JSON Files (*.json);;"
+                "Compressed JSON Files (*.json.gz *.json.bz2 *.json.xz);;"
+                "JSON Lines Files (*.jsonl *.ndjson);;"
+                "Text Files (*.txt);;All Files (*)")
             if file_name:
                 if file_name[0] == "" and file_name[1] == "":
                     return
@@ -497,24 +751,38 @@ class MainWindow(QMainWindow):
                     else:
                         new_file_name = file_name[0] + ".txt"
                 elif file_name[1] == "JSON Files (*.json)":
-                    if Utils().file_name_match(file_name[0], "json"):
+                    if (Utils().file_name_match(file_name[0], "json") or
+                            is_compressed_file(file_name[0])):
                         new_file_name = file_name[0]
                     else:
                         new_file_name = file_name[0] + ".json"
+                elif file_name[1] == "Compressed JSON Files (*.json.gz *.json.bz2 *.json.xz)":
+                    if is_compressed_file(file_name[0]):
+                        new_file_name = file_name[0]
+                    else:
+                        new_file_name = file_name[0] + ".json.gz"
+                elif file_name[1] == "JSON Lines Files (*.jsonl *.ndjson)":
+                    if is_json_lines_file(file_name[0]):
+                        new_file_name = file_name[0]
+                    else:
+                        new_file_name = file_name[0] + ".jsonl"
                 else:
                     new_file_name = file_name[0]
 
-                JsonParsing().write_json_to_file(new_file_name, self.model.get_json_from_tree())
-
-                # load just added file to QTreeView
-                self.json_file_name = new_file_name
-                self.model.load(JsonParsing().get_json_from_file(new_file_name))
-                self.setWindowTitle(new_file_name)
-
-                # Update config default_json_file_name
-                CONFIG_OBJECT["Other"]["default_json_file_name"] = str(self.json_file_name)
-                with open(Utils().get_abs_file_path("utils/config/config.ini"), "w") as config_file:
-                    CONFIG_OBJECT.write(config_file)
+                self.wait_for_saving()
+                if is_json_lines_file(new_file_name):
+                    # Records of JSON Lines document, other documents are one record
+                    # or a list of records
+                    if isinstance(self.model.source_index, JsonLinesIndex):
+                        records = self.model.get_json_lines_from_tree()
+                    else:
+                        records = self.model.get_json_from_tree()
+                        if not isinstance(records, list):
+                            records = [records]
+                    JsonParsing().write_json_lines_to_file(new_file_name, records)
+                    self.json_file_saved(new_file_name)
+                else:
+                    self.start_saving(new_file_name)
         except FileNotFoundError as exception:
             message = TRANSLATE_MAINWINDOW.gettext(
                 "FileNotFoundError exception in action_save_json_file_as() function: %s") % \
@@ -536,9 +804,190 @@ class MainWindow(QMainWindow):
                 message=message,
                 type="Critical")
 
+    def action_save_json_selection_as(self) -> None:
+        """Saves value of the current item with its children to a new JSON file.
+
+        The value is written straight from the tree, the open file is not changed.
+        """
+        index = self.tree_view.selectionModel().currentIndex()
+        if not index.isValid():
+            self.create_message_box(
+                message=TRANSLATE_MAINWINDOW.gettext("Select an item to save."),
+                type="Information")
+            return
+
+        file_name = QFileDialog.getSaveFileName(
+            self,
+            TRANSLATE_MAINWINDOW.gettext("Save Selection"),
+            "",
+            "JSON Files (*.json);;"
+            "Compressed JSON Files (*.json.gz *.json.bz2 *.json.xz);;All Files (*)")
+        if not file_name[0]:
+            return
+
+        new_file_name = file_name[0]
+        if file_name[1] == "JSON Files (*.json)":
+            if not (Utils().file_name_match(new_file_name, "json") or
+                    is_compressed_file(new_file_name)):
+                new_file_name += ".json"
+        elif file_name[1] == "Compressed JSON Files (*.json.gz *.json.bz2 *.json.xz)":
+            if not is_compressed_file(new_file_name):
+                new_file_name += ".json.gz"
+
+        try:
+            self.model.write_json_to_file(
+                new_file_name,
+                root=self.model.getItem(self.filter_proxy_model.mapToSource(index)),
+                compact=self.action_compact_output.isChecked())
+            self.statusbar.showMessage(
+                TRANSLATE_MAINWINDOW.gettext("Saved %s") % new_file_name)
+        except OSError as exception:
+            message = TRANSLATE_MAINWINDOW.gettext(
+                "OSError exception in action_save_json_selection_as() function: %s") % \
+                str(exception)
+            self.create_message_box(
+                message=message,
+                type="Critical")
+        except BaseException as exception:
+            message = TRANSLATE_MAINWINDOW.gettext(
+                "BaseException in action_save_json_selection_as() function: %s") % str(exception)
+            self.create_message_box(
+                message=message,
+                type="Critical")
+
+    def start_saving(self, file_name: str) -> None:
+        """Starts writing the tree to JSON file in a worker thread.
+
+        The tree is frozen until the file is written, see QJsonTreeModel.is_frozen,
+        so the file gets the document as it was when saving started. The file is
+        replaced only when it is complete. Progress is shown in the status bar,
+        json_file_saved is called when the file is written.
+
+        If Preserve Formatting is on and the file is the opened JSON document, not changed
+        since it was loaded or saved, only the edited values are written into it, see
+        treemodel.JsonTreePatcher. Otherwise the whole file is written.
+
+        Args:
+        -----
+            file_name: str
+                File name of JSON file
+        """
+        self.wait_for_saving()
+        self.model.is_frozen = True
+        patcher = None
+        if (self.action_preserve_formatting.isChecked() and self._file_state is not None and
+                file_name == self.json_file_name and not is_compressed_file(file_name) and
+                not isinstance(self.model.source_index, JsonLinesIndex)):
+            patcher = self.model.create_patcher(
+                file_name, self._file_state, compact=self.action_compact_output.isChecked())
+        self._saver_thread = QThread(self)
+        self._saver = DocumentSaver(
+            file_name, self.model.root_item, compact=self.action_compact_output.isChecked(),
+            cache=self.model.fragment_cache, patcher=patcher)
+        self._saver.moveToThread(self._saver_thread)
+
+        self._saver_thread.started.connect(self._saver.run)
+        self._saver.progress.connect(self.saving_progress)
+        self._saver.saved.connect(self.saving_finished)
+        self._saver.failed.connect(self.saving_finished)
+        self._saver.saved.connect(self._saver_thread.quit)
+        self._saver.failed.connect(self._saver_thread.quit)
+
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.show()
+        self.statusbar.showMessage(TRANSLATE_MAINWINDOW.gettext("Saving %s") % file_name)
+
+        self._saver_thread.start()
+
+    def is_saving(self) -> bool:
+        """Return True if JSON file is being saved."""
+        return self._saver is not None
+
+    def wait_for_saving(self) -> None:
+        """Waits until the file being saved is written, so the tree could be changed."""
+        if self._saver is not None:
+            self._finish_saving()
+
+    def saving_progress(self, bytes_written: int, total_bytes: int) -> None:
+        """Shows saving progress in the status bar.
+
+        Size of the file before saving is taken as the expected size.
+        """
+        if self.sender() is not self._saver:
+            return
+
+        if 0 < bytes_written < total_bytes:
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(int(bytes_written * 1000 / total_bytes))
+        else:
+            self.progress_bar.setRange(0, 0)
+        self.statusbar.showMessage(
+            TRANSLATE_MAINWINDOW.gettext("Written %.1f MB") % (bytes_written / 2 ** 20))
+
+    def saving_finished(self) -> None:
+        """Shows result of saving in background."""
+        if self.sender() is not self._saver:
+            return
+        self._finish_saving()
+
+    def _finish_saving(self) -> None:
+        saver = self._saver
+        self._saver_thread.quit()
+        self._saver_thread.wait()
+        self._saver = None
+        self._saver_thread = None
+        self.model.is_frozen = False
+        if not self.is_loading():
+            self.hide_loading_progress()
+
+        if saver.error is not None:
+            self.statusbar.clearMessage()
+            self.create_message_box(
+                message=TRANSLATE_MAINWINDOW.gettext("Failed to save file %s: %s") %
+                (saver.file_name, saver.error),
+                type="Critical")
+            return
+        self.statusbar.showMessage(TRANSLATE_MAINWINDOW.gettext("Saved %s") % saver.file_name)
+        try:
+            self.json_file_saved(saver.file_name)
+        except OSError as exception:
+            self.create_message_box(
+                message=TRANSLATE_MAINWINDOW.gettext(
+                    "OSError exception in json_file_saved() function: %s") % str(exception),
+                type="Critical")
+
+    def json_file_saved(self, file_name: str) -> None:
+        """Shows the written file in the window.
+
+        The tree is kept as it is, only memory-mapped and JSON Lines documents are
+        loaded again as their items refer to the content of the file.
+
+        Raises:
+        -------
+            OSError:
+                An error occured during writing config.ini
+        """
+        source_index = self.model.source_index
+        self.json_file_name = file_name
+        self.set_window_title(file_name)
+        self.json_file_synced()
+
+        if is_json_lines_file(file_name) or isinstance(source_index, JsonLinesIndex):
+            self.load_json_file(file_name, expand=False)
+        elif source_index is not None:
+            self.load_json_file(file_name, expand=False, mapped=True)
+
+        # Update config default_json_file_name
+        CONFIG_OBJECT["Other"]["default_json_file_name"] = str(file_name)
+        with open(Utils().get_abs_file_path("utils/config/config.ini"), "w") as config_file:
+            CONFIG_OBJECT.write(config_file)
+
     def action_refresh_json_file(self) -> None:
         """Loads JSON from file to QTreeView.
 
+        The current tree is patched to the file, see QJsonTreeModel.update_from_document,
+        memory-mapped documents are indexed again.
+
         Raises:
         -------
             FileNotFoundError:
@@ -556,8 +1005,9 @@ class MainWindow(QMainWindow):
                     message=message,
                     type="Critical")
             else:
-                self.model.load(
-                    JsonParsing().get_json_from_file(self.json_file_name))
+                mapped = self.model.source_index is not None
+                self.load_json_file(
+                    self.json_file_name, expand=False, mapped=mapped, patch=not mapped)
         except FileNotFoundError as exception:
             message = TRANSLATE_MAINWINDOW.gettext(
                 "FileNotFoundError exception in action_refresh_json_file() function: %s") % \
@@ -579,6 +1029,452 @@ class MainWindow(QMainWindow):
                 message=message,
                 type="Critical")
 
+    def action_change_watch_file(self) -> None:
+        """Turns reloading JSON file on its changes made by other programs on or off."""
+        CONFIG_OBJECT["Other"]["watch_file"] = str(self.action_watch_file.isChecked())
+        self.watch_json_file()
+
+    def action_change_compact_output(self) -> None:
+        """Turns writing JSON files without indents and line breaks on or off."""
+        CONFIG_OBJECT["Other"]["compact_output"] = str(self.action_compact_output.isChecked())
+
+    def action_change_preserve_formatting(self) -> None:
+        """Turns saving edits into the file keeping its layout on or off."""
+        CONFIG_OBJECT["Other"]["preserve_formatting"] = str(
+            self.action_preserve_formatting.isChecked())
+
+    def action_change_follow_file(self) -> None:
+        """Turns following JSON Lines file on or off.
+
+        Followed file is not reloaded on changes, records appended to it are added
+        to the end of the tree.
+        """
+        if (self.action_follow_file.isChecked() and
+                not isinstance(self.model.source_index, JsonLinesIndex)):
+            self.action_follow_file.setChecked(False)
+            self.create_message_box(
+                message=TRANSLATE_MAINWINDOW.gettext(
+                    "Follow mode is available only for JSON Lines files."),
+                type="Information")
+            return
+        self.watch_json_file()
+
+    def json_file_synced(self) -> None:
+        """Marks the tree as matching JSON file after it was loaded or written by the editor.
+
+        The tree is marked as not modified and the size and mtime of the file are kept
+        for saving with Preserve Formatting, then the file is watched again, so only
+        changes made by other programs are reported.
+        """
+        self.model.is_modified = False
+        try:
+            self._file_state = file_state(self.json_file_name)
+        except OSError:
+            self._file_state = None
+        self.watch_json_file()
+
+    def watch_json_file(self) -> None:
+        """Starts watching JSON file if it is turned on, its current content is the known one.
+
+        Unsaved edits of the tree are kept, turning watching on or off does not change
+        the file. Followed JSON Lines file is read from the end of its indexed records
+        instead.
+        """
+        source_index = self.model.source_index
+        if self.action_follow_file.isChecked() and isinstance(source_index, JsonLinesIndex):
+            self.file_watcher.unwatch()
+            source_index.follow = True
+            self.file_follower.follow(self.json_file_name, source_index.size)
+            return
+        self.action_follow_file.setChecked(False)
+        self.file_follower.unfollow()
+
+        if (not self.action_watch_file.isChecked() or
+                self.json_file_name == "untilted" or self.json_file_name == "без названия"):
+            self.file_watcher.unwatch()
+            return
+        self.file_watcher.watch(self.json_file_name)
+
+    def json_file_changed(self, file_name: str) -> None:
+        """Reloads JSON file which content was changed by other program.
+
+        The tree is patched to the file as by Refresh. If the tree was edited the user
+        is asked first, so local changes are not overwritten silently.
+        """
+        if self.is_loading() or self.is_saving():
+            return
+
+        if self.model.is_modified:
+            message = QMessageBox()
+            message.setIcon(QMessageBox.Warning)
+            message.setText(TRANSLATE_MAINWINDOW.gettext(
+                "File %s was changed on disk. Reload it and discard your changes?") % file_name)
+            message.setWindowTitle(TRANSLATE_MAINWINDOW.gettext("Warning"))
+            message.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+            if message.exec() != QMessageBox.Yes:
+                return
+
+        self.action_refresh_json_file()
+
+    def json_records_appended(self, records: list) -> None:
+        """Appends records of followed JSON Lines file to the end of the tree.
+
+        At most follow_max_records of config.ini records are kept, the oldest ones
+        are removed. The view is scrolled to the new records if it showed the end.
+        """
+        if self.is_loading():
+            return
+
+        scroll_bar = self.tree_view.verticalScrollBar()
+        at_end = scroll_bar.value() == scroll_bar.maximum()
+        self.model.append_records(
+            records,
+            limit=int(CONFIG_OBJECT.get("Other", "follow_max_records", fallback="0")))
+        if at_end:
+            self.tree_view.scrollToBottom()
+        self.statusbar.showMessage(
+            TRANSLATE_MAINWINDOW.gettext("Appended %d records") % len(records))
+
+    def json_file_truncated(self) -> None:
+        """Loads followed JSON Lines file again after it was truncated or replaced."""
+        if self.is_loading():
+            return
+        self.load_json_file(self.json_file_name, expand=False)
+
+    def load_json_file(self, file_name: str, expand: bool=True, mapped: bool=None,
+                       patch: bool=False, json_lines: bool=None, document=None) -> None:
+        """Starts loading JSON file in a worker thread.
+
+        The window stays responsive while the file is parsed and the tree is built.
+        Progress is shown in the status bar. If streaming is enabled in config.ini
+        top-level items are shown while the file is read, otherwise the built tree
+        is swapped into the model with one reset. Files of the large profile are not
+        streamed, so their children are created only when they are expanded.
+
+        Args:
+        -----
+            file_name: str
+                File name of JSON file
+            expand: bool
+                Expand loaded tree as it is set in config.ini file
+            mapped: bool
+                Open the file memory-mapped, see DocumentLoader. None to open files
+                larger than mapped_threshold_mb of config.ini memory-mapped
+            patch: bool
+                Patch the current tree to the document instead of replacing it,
+                so unchanged items keep their expansion and selection
+            json_lines: bool
+                Open the file as JSON Lines, see DocumentLoader. None to open files
+                with .jsonl and .ndjson extensions as JSON Lines
+            document: dict or list
+                Already parsed document of the file, only its tree is built
+        """
+        self.wait_for_saving()
+        self.cancel_loading()
+
+        # Refreshed trees keep their profile
+        if not patch:
+            self.apply_load_profile(self.choose_load_profile(file_name))
+
+        if document is not None:
+            json_lines = False
+            mapped = False
+
+        # Compressed files are decompressed and parsed as a whole
+        is_compressed = is_compressed_file(file_name)
+        if is_compressed:
+            mapped = False
+
+        if json_lines is None:
+            json_lines = is_json_lines_file(file_name)
+
+        if mapped is None:
+            threshold = float(CONFIG_OBJECT.get(
+                "Loading", "mapped_threshold_mb", fallback="0")) * 1024 * 1024
+            try:
+                mapped = threshold > 0 and os.path.getsize(file_name) >= threshold
+            except OSError:
+                mapped = False
+
+        # Files larger than parallel_threshold_mb are parsed in shards by several processes
+        workers = int(CONFIG_OBJECT.get("Loading", "parallel_workers", fallback="0"))
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        threshold = float(CONFIG_OBJECT.get(
+            "Loading", "parallel_threshold_mb", fallback="0")) * 1024 * 1024
+        try:
+            if (threshold <= 0 or is_compressed or
+                    os.path.getsize(file_name) < threshold):
+                workers = 1
+        except OSError:
+            workers = 1
+
+        # Streaming builds the whole tree, large profile creates children when expanded
+        streaming = self._profile != PROFILE_LARGE and Utils().string_to_boolean(
+            CONFIG_OBJECT.get("Loading", "streaming", fallback="False"))
+
+        self._loader_expand = expand and self._profile != PROFILE_LARGE
+        self._loader_thread = QThread(self)
+        self._loader = DocumentLoader(
+            file_name, lazy=self.model.lazy, streaming=streaming,
+            mapped=mapped, build_tree=not patch, json_lines=json_lines, workers=workers,
+            document=document)
+        self._loader_root = None
+        self._loader.moveToThread(self._loader_thread)
+
+        self._loader_thread.started.connect(self._loader.run)
+        self._loader.progress.connect(self.loading_progress)
+        self._loader.loaded.connect(self.loading_finished)
+        self._loader.items_loaded.connect(self.loading_items)
+        self._loader.streamed.connect(self.loading_streamed)
+        self._loader.mapped.connect(self.loading_mapped)
+        self._loader.parsed.connect(self.loading_parsed)
+        self._loader.failed.connect(self.loading_failed)
+        self._loader.canceled.connect(self.loading_canceled)
+        self._loader.loaded.connect(self._loader_thread.quit)
+        self._loader.streamed.connect(self._loader_thread.quit)
+        self._loader.mapped.connect(self._loader_thread.quit)
+        self._loader.parsed.connect(self._loader_thread.quit)
+        self._loader.failed.connect(self._loader_thread.quit)
+        self._loader.canceled.connect(self._loader_thread.quit)
+
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.show()
+        self.button_cancel_loading.show()
+        self.statusbar.showMessage(TRANSLATE_MAINWINDOW.gettext("Loading %s") % file_name)
+
+        self._loader_thread.start()
+
+    def choose_load_profile(self, file_name: str) -> str:
+        """Return load profile of the file, PROFILE_SMALL or PROFILE_LARGE.
+
+        Unless the profile is set manually, files larger than large_file_mb of config.ini
+        or with an estimated node count over large_node_count are large. Node count is
+        estimated from the head of the file, see utils.QuickLook.
+        """
+        if self._profile_setting in (PROFILE_SMALL, PROFILE_LARGE):
+            return self._profile_setting
+        try:
+            size = os.path.getsize(file_name)
+        except OSError:
+            return PROFILE_SMALL
+
+        size_threshold = float(CONFIG_OBJECT.get(
+            "Loading", "large_file_mb", fallback="0")) * 1024 * 1024
+        if 0 < size_threshold <= size:
+            return PROFILE_LARGE
+        # Every value with its separator takes at least two bytes of uncompressed content
+        node_threshold = int(CONFIG_OBJECT.get("Loading", "large_node_count", fallback="0"))
+        if node_threshold <= 0 or (size < node_threshold * 2 and
+                                   not is_compressed_file(file_name)):
+            return PROFILE_SMALL
+
+        quick_look = QuickLook(file_name)
+        try:
+            quick_look.scan(PROFILE_SAMPLE_BYTES, PROFILE_SAMPLE_SECONDS)
+        except OSError:
+            return PROFILE_SMALL
+        if quick_look.estimated_nodes() >= node_threshold:
+            return PROFILE_LARGE
+        return PROFILE_SMALL
+
+    def apply_load_profile(self, profile: str) -> None:
+        """Sets up the model and QTreeView for the load profile.
+
+        Large profile creates children only when they are expanded, uses uniform row
+        heights, does not show fonts and icons of items, does not re-filter the tree on
+        every change and search is applied only when Enter is pressed, and the loaded
+        tree is not expanded. Lazy children are applied on the next load.
+        """
+        self._profile = profile
+        is_large = profile == PROFILE_LARGE
+        self.model.lazy = is_large or Utils().string_to_boolean(
+            CONFIG_OBJECT.get("QTreeView", "lazy_loading", fallback="False"))
+        self.model.is_plain = is_large
+        self.tree_view.setUniformRowHeights(is_large)
+        self.filter_proxy_model.setDynamicSortFilter(not is_large)
+
+        if is_large:
+            text = TRANSLATE_MAINWINDOW.gettext("Large document")
+        else:
+            text = TRANSLATE_MAINWINDOW.gettext("Small document")
+        if self._profile_setting not in (PROFILE_SMALL, PROFILE_LARGE):
+            text = TRANSLATE_MAINWINDOW.gettext("%s (auto)") % text
+        self.button_load_profile.setText(text)
+
+    def action_change_load_profile(self, setting: str) -> None:
+        """Sets load profile manually or back to automatic.
+
+        The file is loaded again with the profile unless the tree has unsaved changes,
+        then the profile is applied to the current tree.
+        """
+        self._profile_setting = setting
+        file_name = self.json_file_name
+        if (file_name and os.path.isfile(file_name) and not self.model.is_modified and
+                not self.is_loading()):
+            self.load_json_file(file_name)
+        else:
+            self.apply_load_profile(self.choose_load_profile(file_name))
+
+    def cancel_loading(self) -> None:
+        """Cancels loading JSON file.
+
+        The worker thread stops on its next progress check, it is kept referenced
+        until it is finished.
+        """
+        if self._loader is None:
+            return
+
+        loader = self._loader
+        thread = self._loader_thread
+        self._loader = None
+        self._loader_thread = None
+
+        self._canceled_loaders.append((loader, thread))
+        thread.finished.connect(partial(self._forget_loader, loader))
+        loader.cancel()
+        thread.quit()
+        self.clear_partial_document()
+        self.hide_loading_progress()
+        self.statusbar.showMessage(TRANSLATE_MAINWINDOW.gettext("Loading canceled"))
+
+    def _forget_loader(self, loader) -> None:
+        self._canceled_loaders = [
+            (canceled_loader, thread) for canceled_loader, thread in self._canceled_loaders
+            if canceled_loader is not loader]
+
+    def is_loading(self) -> bool:
+        """Return True if JSON file is being loaded."""
+        return self._loader is not None
+
+    def loading_progress(self, bytes_read: int, total_bytes: int, nodes: int) -> None:
+        """Shows loading progress in the status bar."""
+        if self.sender() is not self._loader:
+            return
+
+        if total_bytes > 0 and (nodes == 0 or bytes_read < total_bytes):
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(int(bytes_read * 1000 / total_bytes))
+        else:
+            self.progress_bar.setRange(0, 0)
+        self.statusbar.showMessage(
+            TRANSLATE_MAINWINDOW.gettext("Read %.1f of %.1f MB, %d nodes") %
+            (bytes_read / 2 ** 20, total_bytes / 2 ** 20, nodes))
+
+    def loading_finished(self, root_item) -> None:
+        """Swaps loaded tree into the model."""
+        if self.sender() is not self._loader:
+            return
+
+        self._finish_loading()
+        self.model.set_root_item(root_item)
+        self.json_file_synced()
+        self.statusbar.clearMessage()
+        if self._loader_expand:
+            self.expand_tree_from_settings()
+
+    def loading_items(self, root_item, items: list) -> None:
+        """Shows top-level items of the document which is still being read."""
+        if self.sender() is not self._loader:
+            return
+
+        self._loader_root = root_item
+        self.model.append_streamed_items(root_item, items)
+
+    def loading_streamed(self, root_item, order: list) -> None:
+        """Puts streamed top-level items in their final order."""
+        if self.sender() is not self._loader:
+            return
+
+        self._finish_loading()
+        self.model.finish_streaming(root_item, order)
+        self.json_file_synced()
+        self.statusbar.clearMessage()
+        if self._loader_expand:
+            self.expand_tree_from_settings()
+
+    def loading_mapped(self, root_item, source_index) -> None:
+        """Swaps tree of memory-mapped document into the model."""
+        if self.sender() is not self._loader:
+            return
+
+        self._finish_loading()
+        self.model.set_root_item(root_item, source_index)
+        self.json_file_synced()
+        if isinstance(source_index, JsonLinesIndex):
+            self.statusbar.showMessage(
+                TRANSLATE_MAINWINDOW.gettext("Indexed %d records") %
+                source_index.container_count())
+        else:
+            self.statusbar.showMessage(
+                TRANSLATE_MAINWINDOW.gettext("Indexed %d containers") %
+                source_index.container_count())
+        if self._loader_expand:
+            self.expand_tree_from_settings()
+
+    def loading_parsed(self, document) -> None:
+        """Patches the tree to the refreshed document."""
+        if self.sender() is not self._loader:
+            return
+
+        self._finish_loading()
+        changes = self.model.update_from_document(document)
+        self.json_file_synced()
+        self.statusbar.showMessage(
+            TRANSLATE_MAINWINDOW.gettext("Refreshed, %d items changed") % changes)
+
+    def loading_failed(self, message: str) -> None:
+        """Shows error message of loading."""
+        if self.sender() is not self._loader:
+            return
+
+        self.clear_partial_document()
+        self._finish_loading()
+        self.statusbar.clearMessage()
+        self.create_message_box(
+            message=TRANSLATE_MAINWINDOW.gettext("Failed to load file: %s") % message,
+            type="Critical")
+
+    def loading_canceled(self) -> None:
+        """Shows message that loading was canceled."""
+        if self.sender() is not self._loader:
+            return
+
+        self.clear_partial_document()
+        self._finish_loading()
+        self.statusbar.showMessage(TRANSLATE_MAINWINDOW.gettext("Loading canceled"))
+
+    def _finish_loading(self) -> None:
+        self._loader_thread.quit()
+        self._loader_thread.wait()
+        self._loader = None
+        self._loader_thread = None
+        self._loader_root = None
+        self.hide_loading_progress()
+
+    def clear_partial_document(self) -> None:
+        """Clears the model if it shows a part of the document which was not loaded."""
+        if self._loader_root is not None and self._loader_root is self.model.root_item:
+            self.model.clear()
+        self._loader_root = None
+
+    def hide_loading_progress(self) -> None:
+        """Hides loading progress widgets of the status bar."""
+        self.progress_bar.hide()
+        self.button_cancel_loading.hide()
+
+    def expand_tree_from_settings(self) -> None:
+        """Expands QTreeView as it is set in utils/config/config.ini."""
+        expand_all = Utils().string_to_boolean(
+            CONFIG_OBJECT.get("QTreeView-expand", "expand_all"))
+        expand_to_depth = int(CONFIG_OBJECT.get("QTreeView-expand", "expand_to_depth"))
+        if expand_all and expand_to_depth == -1:
+            self.tree_view.expandAll()
+        elif not expand_all and expand_to_depth == -2:
+            self.tree_view.collapseAll()
+        elif expand_to_depth > -1:
+            self.tree_view.expandToDepth(expand_to_depth)
+
     def action_find_visible(self) -> None:
         """Change find QLineEdit visible."""
         if self.action_find.isChecked():
@@ -588,6 +1484,95 @@ class MainWindow(QMainWindow):
             self.frame.hide()
             self.line_edit.setText("")
 
+    def search_text_changed(self, text: str) -> None:
+        """Applies search text, for large documents only when it is cleared."""
+        if self._profile != PROFILE_LARGE or text == "":
+            self.apply_search()
+
+    def apply_search(self) -> None:
+        """Filters QTreeView by the search text."""
+        text = self.line_edit.text()
+        # Records are parsed before the filter is applied to them
+        self.fetch_search_records(text)
+        self.filter_proxy_model.setFilterRegExp(text)
+
+    def fetch_search_records(self, text: str) -> None:
+        """Parses records of JSON Lines document which match search text.
+
+        Only parsed items are filtered by the view, so the text is searched in the raw
+        records first, see QJsonTreeModel.fetch_matching_records.
+        """
+        if not text or not isinstance(self.model.source_index, JsonLinesIndex):
+            return
+
+        flags = 0
+        if not self.check_box_case_sensitive.isChecked():
+            flags = re.IGNORECASE
+        try:
+            pattern = re.compile(text.encode("utf-8"), flags)
+        except re.error:
+            pattern = re.compile(re.escape(text.encode("utf-8")), flags)
+
+        try:
+            found = self.model.fetch_matching_records(pattern)
+        except ValueError as exception:
+            self.statusbar.showMessage(str(exception))
+            return
+        if found > SEARCH_RECORD_LIMIT:
+            self.statusbar.showMessage(
+                TRANSLATE_MAINWINDOW.gettext("Parsed %d of %d matching records") %
+                (SEARCH_RECORD_LIMIT, found))
+
+    def action_go_to_line_dialog(self) -> None:
+        """Asks for line and column and selects the item at them.
+
+        Available for memory-mapped documents only, their items know their byte
+        offsets in the file.
+        """
+        if self.model.source_index is None:
+            self.create_message_box(
+                message=TRANSLATE_MAINWINDOW.gettext(
+                    "Go to line is available only for memory-mapped documents."),
+                type="Information")
+            return
+
+        text, is_accepted = QInputDialog.getText(
+            self,
+            TRANSLATE_MAINWINDOW.gettext("Go to Line"),
+            TRANSLATE_MAINWINDOW.gettext("Line[:column]:"))
+        if not is_accepted or not text.strip():
+            return
+
+        try:
+            position = [int(part) for part in text.strip().split(":", 1)]
+            index = self.model.index_from_source_position(*position)
+        except (TypeError, ValueError):
+            self.create_message_box(
+                message=TRANSLATE_MAINWINDOW.gettext("Invalid line: %s") % text,
+                type="Warning")
+            return
+
+        self.line_edit.setText("")
+        index = self.filter_proxy_model.mapFromSource(index)
+        self.tree_view.setCurrentIndex(index)
+        self.tree_view.scrollTo(index, QAbstractItemView.PositionAtCenter)
+
+    def show_source_position(self, current, previous) -> None:
+        """Shows line and column of the current item of memory-mapped document."""
+        position = None
+        if current.isValid() and self.model.source_index is not None:
+            try:
+                position = self.model.source_position(
+                    self.filter_proxy_model.mapToSource(current))
+            except ValueError:
+                position = None
+
+        if position is None:
+            self.label_source_position.clear()
+        else:
+            self.label_source_position.setText(
+                TRANSLATE_MAINWINDOW.gettext("Line %d, column %d") % position)
+
     def action_expand_tree(self, expand_lvl: str) -> None:
         """Expands QTreeView depending on input expand_lvl."""
         if expand_lvl == "Collapse":
@@ -1046,13 +2031,18 @@ class MainWindow(QMainWindow):
         message_box.setStandardButtons(QMessageBox.Ok)
         message_box.exec()
 
+    def set_window_title(self, file_name: str) -> None:
+        """Shows file name in the window title, marked with "*" while the tree is modified."""
+        self.setWindowTitle(file_name + "[*]")
+
     def check_saved_before_exit(self):
         """Shows QMessageBox if data was not saved.
 
-        Checks if data from model does not match to json_file data and throws an QMessageBox
-        with the offer to save information
+        Checks if the tree was edited after it was loaded or saved, see
+        QJsonTreeModel.is_modified, and throws an QMessageBox with the offer
+        to save information
         """
-        if self.model.get_json_from_tree() != JsonParsing().get_json_from_file(self.json_file_name):
+        if self.model.is_modified:
             message = QMessageBox()
             message.setIcon(QMessageBox.Warning)
             message.setText(TRANSLATE_MAINWINDOW.gettext("Save changes to file before closing?"))
@@ -0,0 +1,115 @@
+"""Tests of keeping parsed documents in DocumentCache.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import json
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.DocumentCache import DocumentCache
+from utils.JsonParsing import JsonParsing
+
+DOCUMENT = {"list": [1, 2.5, "three", None, True], "nested": {"key": "value"}}
+
+
+def write_file(file_name: str, document, mtime_ns: int) -> os.stat_result:
+    """Write document with the given mtime and return stat of the file."""
+    with open(file_name, mode="w", encoding="utf-8") as opened_file:
+        json.dump(document, opened_file)
+    os.utime(file_name, ns=(mtime_ns, mtime_ns))
+    return os.stat(file_name)
+
+
+def test_hit_and_miss(tmp_path) -> None:
+    """Written document is returned for the same file, other files are misses."""
+    cache = DocumentCache(str(tmp_path / "cache"), 2 ** 20)
+    file_name = str(tmp_path / "example.json")
+    file_stat = write_file(file_name, DOCUMENT, 10 ** 18)
+
+    assert cache.get(file_name) is None
+    assert cache.put(file_name, DOCUMENT, file_stat)
+    assert cache.get(file_name) == DOCUMENT
+    assert cache.get(str(tmp_path / "other.json")) is None
+    assert (cache.hits, cache.misses, cache.stores) == (1, 2, 1)
+
+    cache.enabled = False
+    assert cache.get(file_name) is None
+    assert not cache.put(file_name, DOCUMENT, file_stat)
+
+
+def test_stale_entry(tmp_path) -> None:
+    """Entry is not used after size or mtime of the file changed."""
+    cache = DocumentCache(str(tmp_path / "cache"), 2 ** 20)
+    file_name = str(tmp_path / "example.json")
+    assert cache.put(file_name, DOCUMENT, write_file(file_name, DOCUMENT, 10 ** 18))
+    write_file(file_name, DOCUMENT, 2 * 10 ** 18)
+    assert cache.get(file_name) is None
+
+    assert cache.put(file_name, DOCUMENT, os.stat(file_name))
+    write_file(file_name, dict(DOCUMENT, extra=1), 2 * 10 ** 18)
+    assert cache.get(file_name) is None
+
+
+def test_file_changed_while_parsed(tmp_path) -> None:
+    """Document is not written if the file was changed after it was read."""
+    cache = DocumentCache(str(tmp_path / "cache"), 2 ** 20)
+    file_name = str(tmp_path / "example.json")
+    file_stat = write_file(file_name, DOCUMENT, 10 ** 18)
+    write_file(file_name, DOCUMENT, 2 * 10 ** 18)
+    assert not cache.put(file_name, DOCUMENT, file_stat)
+
+
+def test_verify_content(tmp_path) -> None:
+    """With verify_content an entry is not used if the content changed, size and mtime kept."""
+    cache = DocumentCache(str(tmp_path / "cache"), 2 ** 20, verify_content=True)
+    file_name = str(tmp_path / "example.json")
+    assert cache.put(file_name, [1, 2], write_file(file_name, [1, 2], 10 ** 18))
+    assert cache.get(file_name) == [1, 2]
+
+    write_file(file_name, [3, 4], 10 ** 18)
+    assert cache.get(file_name) is None
+    cache.verify_content = False
+    assert cache.get(file_name) == [1, 2]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path) -> None:
+    """Least recently used entries are removed when the cache is over its size limit."""
+    document = {"values": list(range(1000))}
+    cache = DocumentCache(str(tmp_path / "cache"), 2 ** 20)
+    file_names = [str(tmp_path / ("file%d.json" % number)) for number in range(3)]
+    for number, file_name in enumerate(file_names):
+        assert cache.put(file_name, document, write_file(file_name, document, 10 ** 18))
+        entry_name = cache._entry_name(file_name)
+        os.utime(entry_name, ns=(10 ** 18 + number, 10 ** 18 + number))
+    entry_size = cache.size() // 3
+
+    # Reading the oldest entry makes it the most recently used one
+    assert cache.get(file_names[0]) == document
+    cache.max_bytes = 2 * entry_size
+    extra_name = str(tmp_path / "extra.json")
+    assert cache.put(extra_name, document, write_file(extra_name, document, 10 ** 18))
+
+    assert cache.get(file_names[1]) is None
+    assert cache.get(file_names[0]) == document
+    assert cache.get(extra_name) == document
+    assert cache.clear() == 2
+    assert cache.size() == 0
+
+
+def test_load_json_from_file_hashes_read_chunks(tmp_path, monkeypatch) -> None:
+    """Parsed file is written to the cache with the hash of the chunks read for parsing."""
+    cache = DocumentCache(str(tmp_path / "cache"), 2 ** 20, verify_content=True)
+    monkeypatch.setattr("utils.JsonParsing.DOCUMENT_CACHE", cache)
+    hashed = []
+    monkeypatch.setattr(cache, "_file_hash", lambda file_name: hashed.append(file_name) or
+                        DocumentCache._file_hash(file_name))
+    file_name = str(tmp_path / "example.json")
+    write_file(file_name, DOCUMENT, 10 ** 18)
+
+    assert JsonParsing().load_json_from_file(file_name) == DOCUMENT
+    assert cache.stores == 1 and hashed == []
+    assert JsonParsing().load_json_from_file(file_name) == DOCUMENT
+    assert cache.hits == 1 and hashed == [file_name]
@@ -0,0 +1,129 @@
+"""Tests of loading JSON files to the tree by DocumentLoader.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import json
+
+# Tests do not need a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import QThread
+from PyQt5.QtTest import QAbstractItemModelTester
+from PyQt5.QtWidgets import QApplication
+from mainwindow.DocumentLoader import DocumentLoader
+from treemodel.QJsonTreeModel import QJsonTreeModel
+
+APPLICATION = QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def run_loader(loader: DocumentLoader) -> list:
+    """Run loader in the current thread and return its loaded, failed and canceled signals."""
+    results = []
+    loader.loaded.connect(lambda root_item: results.append(("loaded", root_item)))
+    loader.failed.connect(lambda message: results.append(("failed", message)))
+    loader.canceled.connect(lambda: results.append(("canceled", None)))
+    loader.run()
+    return results
+
+
+def test_loader_builds_tree(tmp_path) -> None:
+    """Loaded tree is the parsed document and progress reaches the file size."""
+    document = {"list": [1, 2.5, "three", None], "dict": {"flag": True}}
+    file_name = tmp_path / "example.json"
+    file_name.write_text(json.dumps(document))
+    loader = DocumentLoader(str(file_name))
+    progress = []
+    loader.progress.connect(lambda bytes_read, total_bytes, nodes: progress.append(
+        (bytes_read, total_bytes)))
+
+    results = run_loader(loader)
+    assert [signal for signal, _value in results] == ["loaded"]
+    model = QJsonTreeModel()
+    model.set_root_item(results[0][1])
+    assert model.get_json_from_tree() == document
+    assert progress[-1] == (file_name.stat().st_size, file_name.stat().st_size)
+
+
+def test_loader_reports_invalid_json(tmp_path) -> None:
+    """Invalid JSON and missing files are reported with failed signal."""
+    file_name = tmp_path / "broken.json"
+    file_name.write_text('{"key": ')
+    assert [signal for signal, _value in run_loader(DocumentLoader(str(file_name)))] == \
+        ["failed"]
+    assert [signal for signal, _value in run_loader(
+        DocumentLoader(str(tmp_path / "missing.json")))] == ["failed"]
+
+
+def test_loader_cancel(tmp_path) -> None:
+    """Loading canceled during progress emits only canceled signal."""
+    file_name = tmp_path / "example.json"
+    file_name.write_text(json.dumps([{"value": value} for value in range(1000)]))
+    loader = DocumentLoader(str(file_name))
+    loader.progress.connect(lambda *_args: loader.cancel())
+    assert run_loader(loader) == [("canceled", None)]
+
+
+def test_loader_in_worker_thread(tmp_path) -> None:
+    """Tree built in a worker thread is delivered to the GUI thread."""
+    document = [{"value": value} for value in range(100)]
+    file_name = tmp_path / "example.json"
+    file_name.write_text(json.dumps(document))
+    thread = QThread()
+    loader = DocumentLoader(str(file_name))
+    loader.moveToThread(thread)
+    thread.started.connect(loader.run)
+    root_items = []
+    loader.loaded.connect(root_items.append)
+    loader.loaded.connect(thread.quit)
+    loader.failed.connect(thread.quit)
+    thread.start()
+    while not thread.wait(10):
+        APPLICATION.processEvents()
+    APPLICATION.processEvents()
+
+    model = QJsonTreeModel()
+    model.set_root_item(root_items[0])
+    assert model.get_json_from_tree() == document
+
+
+def test_streaming_loader_shows_items_while_reading(tmp_path) -> None:
+    """Streamed top-level items are shown in batches and sorted when the file is read."""
+    document = {"key %04d" % (999 - key): {"value": key} for key in range(1000)}
+    file_name = tmp_path / "example.json"
+    file_name.write_text(json.dumps(document))
+    model = QJsonTreeModel()
+    tester = QAbstractItemModelTester(
+        model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+    loader = DocumentLoader(str(file_name), streaming=True)
+    batches = []
+    loader.items_loaded.connect(lambda root_item, items: batches.append(len(items)))
+    loader.items_loaded.connect(model.append_streamed_items)
+    loader.streamed.connect(model.finish_streaming)
+
+    assert run_loader(loader) == []
+    assert sum(batches) == len(document) and len(batches) > 1
+    assert model.rowCount() == len(document)
+    assert model.index(0, 0).data() == "key 0000"
+    assert model.get_json_from_tree() == document
+    assert tester is not None
+
+
+def test_loader_maps_json_lines(tmp_path) -> None:
+    """JSON Lines files are mapped, invalid first records are reported with failed signal."""
+    file_name = tmp_path / "example.jsonl"
+    file_name.write_text('{"a": 1}\n[2]\n"three"\n')
+    loader = DocumentLoader(str(file_name), json_lines=True)
+    mapped = []
+    loader.mapped.connect(lambda root_item, index: mapped.append((root_item, index)))
+    assert run_loader(loader) == []
+    root_item, index = mapped[0]
+    assert root_item.pending_count() == 3
+    index.close()
+
+    file_name.write_text('{"a": 1}\nnot json\n')
+    assert [signal for signal, _value in run_loader(
+        DocumentLoader(str(file_name), json_lines=True))] == ["failed"]
@@ -0,0 +1,121 @@
+"""Tests of saving documents atomically: replacing_file and DocumentSaver.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import json
+import stat
+
+import pytest
+
+# Tests do not need a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import Qt, QModelIndex
+from PyQt5.QtWidgets import QApplication
+from treemodel.QJsonTreeModel import QJsonTreeModel
+from utils.JsonParsing import JsonParsing, replacing_file
+from mainwindow.DocumentSaver import DocumentSaver
+
+APPLICATION = QApplication.instance() or QApplication(sys.argv[:1])
+
+DOCUMENT = {"list": [1, 2.5, None], "text": "значение"}
+
+
+def run_saver(saver: DocumentSaver) -> list:
+    """Run saver in the current thread and return its saved and failed signals."""
+    results = []
+    saver.saved.connect(lambda file_name: results.append(("saved", file_name)))
+    saver.failed.connect(lambda message: results.append(("failed", message)))
+    saver.run()
+    return results
+
+
+def test_replacing_file_keeps_original_when_write_raises(tmp_path) -> None:
+    """File is not changed and no temporary file is left if the block raises."""
+    file_name = tmp_path / "example.json"
+    file_name.write_bytes(b"original")
+    with pytest.raises(RuntimeError):
+        with replacing_file(str(file_name)) as opened_file:
+            opened_file.write(b"partial")
+            raise RuntimeError("interrupted")
+    assert file_name.read_bytes() == b"original"
+    assert os.listdir(tmp_path) == ["example.json"]
+
+
+def test_replacing_file_keeps_permissions_and_links(tmp_path) -> None:
+    """Replaced file keeps its permissions, the target of a symbolic link is replaced."""
+    file_name = tmp_path / "example.json"
+    file_name.write_bytes(b"original")
+    os.chmod(file_name, 0o640)
+    link = tmp_path / "link.json"
+    os.symlink(file_name, link)
+
+    with replacing_file(str(link)) as opened_file:
+        opened_file.write(b"new")
+    assert file_name.read_bytes() == b"new"
+    assert link.is_symlink()
+    assert stat.S_IMODE(os.stat(file_name).st_mode) == 0o640
+    assert sorted(os.listdir(tmp_path)) == ["example.json", "link.json"]
+
+    new_file = tmp_path / "new.json"
+    with replacing_file(str(new_file)) as opened_file:
+        opened_file.write(b"{}")
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(new_file).st_mode) == 0o666 & ~umask
+
+
+def test_write_json_lines_keeps_original_on_error(tmp_path) -> None:
+    """JSON Lines file is not changed if a record could not be written."""
+    file_name = tmp_path / "records.jsonl"
+    file_name.write_bytes(b'{"a": 1}\n')
+    with pytest.raises(TypeError):
+        JsonParsing().write_json_lines_to_file(str(file_name), [{"b": 2}, {"c": object()}])
+    assert file_name.read_bytes() == b'{"a": 1}\n'
+
+
+def test_saver_writes_tree(tmp_path) -> None:
+    """Saver writes the tree and reports progress and the saved file."""
+    model = QJsonTreeModel()
+    model.load(DOCUMENT)
+    file_name = tmp_path / "example.json"
+    file_name.write_text("[]")
+    saver = DocumentSaver(str(file_name), model.root_item)
+    progress = []
+    saver.progress.connect(lambda bytes_written, total_bytes: progress.append(
+        (bytes_written, total_bytes)))
+
+    assert run_saver(saver) == [("saved", str(file_name))]
+    assert json.loads(file_name.read_text(encoding="utf-8")) == DOCUMENT
+    assert progress[-1] == (file_name.stat().st_size, 2)
+
+
+def test_saver_reports_failure(tmp_path) -> None:
+    """Values which could not be written are reported and the file is not changed."""
+    model = QJsonTreeModel()
+    model.load({"a": 1})
+    model.root_item.child(0).value = object()
+    file_name = tmp_path / "example.json"
+    file_name.write_text("[]")
+    saver = DocumentSaver(str(file_name), model.root_item)
+    assert [signal for signal, _value in run_saver(saver)] == ["failed"]
+    assert saver.error is not None
+    assert file_name.read_text() == "[]"
+
+
+def test_frozen_model_rejects_edits() -> None:
+    """While the model is frozen for saving, edits, inserts and removes are rejected."""
+    model = QJsonTreeModel()
+    model.is_editable = True
+    model.load(DOCUMENT)
+    model.is_frozen = True
+    assert not model.setData(model.index(1, 2), "edited", Qt.EditRole)
+    assert not model.insertRows(0, 1, model.index(0, 0))
+    assert not model.removeRows(0, 1, QModelIndex())
+    assert not model.is_modified
+    model.is_frozen = False
+    assert model.setData(model.index(1, 2), "edited", Qt.EditRole)
@@ -0,0 +1,87 @@
+"""Tests of opening many files with FileBatchLoader.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import json
+import time
+
+# Tests do not need a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtWidgets import QApplication
+from mainwindow.FileBatchLoader import FileBatchLoader, expand_file_names
+
+APPLICATION = QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def wait_for(condition, timeout: float=30) -> bool:
+    """Process events until condition() is True or timeout seconds pass."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        APPLICATION.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_expand_file_names(tmp_path) -> None:
+    """Patterns are expanded with glob, files are returned once and missing ones are kept."""
+    (tmp_path / "sub" / "deep").mkdir(parents=True)
+    for name in ("b.json", "a.json", "sub/c.json", "sub/deep/d.json", "sub/e.txt"):
+        (tmp_path / name).write_text("{}")
+
+    file_names = expand_file_names([
+        str(tmp_path / "b.json"), str(tmp_path / "*.json"), str(tmp_path / "**" / "*.json"),
+        str(tmp_path / "missing.json"), str(tmp_path / "none*.json"), str(tmp_path / "sub")])
+    assert [os.path.relpath(name, tmp_path) for name in file_names] == [
+        "b.json", "a.json", os.path.join("sub", "c.json"),
+        os.path.join("sub", "deep", "d.json"), "missing.json"]
+
+
+def test_loader_reports_every_file(tmp_path, monkeypatch) -> None:
+    """Every file is reported once, with None for files which are not parsed by the pool."""
+    monkeypatch.setattr("mainwindow.FileBatchLoader.DOCUMENT_CACHE.enabled", False)
+    documents = {str(tmp_path / ("%d.json" % number)): {"number": number, "list": [number]}
+                 for number in range(3)}
+    for file_name, document in documents.items():
+        with open(file_name, mode="w") as opened_file:
+            json.dump(document, opened_file)
+    broken = tmp_path / "broken.json"
+    broken.write_text('{"key": ')
+    records = tmp_path / "records.jsonl"
+    records.write_text('{"a": 1}\n')
+    file_names = list(documents) + [str(broken), str(records), str(tmp_path / "missing.json")]
+
+    loader = FileBatchLoader(workers=2)
+    results = {}
+    loader.ready.connect(lambda file_name, document: results.update({file_name: document}))
+    loader.start(file_names)
+    assert wait_for(lambda: len(results) == len(file_names))
+    loader.stop()
+
+    for file_name, document in documents.items():
+        assert results[file_name] == document
+    assert results[str(broken)] is None
+    assert results[str(records)] is None
+    assert results[str(tmp_path / "missing.json")] is None
+
+
+def test_stop_cancels_waiting_files(tmp_path, monkeypatch) -> None:
+    """Files which were not started before stop are not reported."""
+    monkeypatch.setattr("mainwindow.FileBatchLoader.DOCUMENT_CACHE.enabled", False)
+    file_names = []
+    for number in range(20):
+        file_name = tmp_path / ("%d.json" % number)
+        file_name.write_text(json.dumps([number] * 1000))
+        file_names.append(str(file_name))
+
+    loader = FileBatchLoader(workers=1)
+    results = []
+    loader.ready.connect(lambda file_name, document: results.append(file_name))
+    loader.start(file_names)
+    loader.stop()
+    wait_for(lambda: False, timeout=1)
+    assert len(results) < len(file_names)
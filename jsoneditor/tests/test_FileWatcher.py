@@ -0,0 +1,83 @@
+"""Tests of reporting changes of files made by other programs.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import time
+
+# Tests do not need a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtWidgets import QApplication
+from mainwindow.FileWatcher import FileChecker, FileWatcher
+
+APPLICATION = QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def write_file(file_name: str, text: str, mtime_ns: int) -> None:
+    """Write text with the given mtime."""
+    with open(file_name, mode="w", encoding="utf-8") as opened_file:
+        opened_file.write(text)
+    os.utime(file_name, ns=(mtime_ns, mtime_ns))
+
+
+def test_checker_reports_only_changed_content(tmp_path) -> None:
+    """Touched files with the same content are not reported, changed content is."""
+    file_name = str(tmp_path / "example.json")
+    write_file(file_name, '{"key": 1}', 10 ** 18)
+    checker = FileChecker()
+    changed = []
+    checker.changed.connect(changed.append)
+    checker.rebase(file_name)
+
+    write_file(file_name, '{"key": 1}', 2 * 10 ** 18)
+    checker.check(file_name)
+    assert changed == []
+
+    write_file(file_name, '{"key": 2}', 3 * 10 ** 18)
+    checker.check(file_name)
+    assert changed == [file_name]
+    checker.check(file_name)
+    assert changed == [file_name]
+
+    os.remove(file_name)
+    checker.check(file_name)
+    assert changed == [file_name]
+
+
+def wait_for(condition, seconds: float=5.0) -> bool:
+    """Process events until condition() is True or seconds passed."""
+    deadline = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        APPLICATION.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_watcher_reports_changes_of_other_programs(tmp_path) -> None:
+    """Changes after watch() are reported once, writes before watch() are known."""
+    file_name = str(tmp_path / "example.json")
+    write_file(file_name, '{"key": 1}', 10 ** 18)
+    watcher = FileWatcher(debounce_ms=50)
+    changed = []
+    watcher.changed.connect(changed.append)
+    try:
+        watcher.watch(file_name)
+        write_file(file_name, '{"key": 2}', 2 * 10 ** 18)
+        write_file(file_name, '{"key": 3}', 3 * 10 ** 18)
+        assert wait_for(lambda: changed)
+        assert changed == [os.path.abspath(file_name)]
+
+        # File written by the editor itself is watched again with its new content
+        write_file(file_name, '{"key": 4}', 4 * 10 ** 18)
+        watcher.watch(file_name)
+        assert not wait_for(lambda: len(changed) > 1, 0.5)
+
+        watcher.unwatch()
+        write_file(file_name, '{"key": 5}', 5 * 10 ** 18)
+        assert not wait_for(lambda: len(changed) > 1, 0.5)
+    finally:
+        watcher.stop()
@@ -0,0 +1,74 @@
+"""Tests of JSON backends against the standard library json module.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import json
+import math
+
+import pytest
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.JsonBackends import (
+    StdlibBackend, OrjsonBackend, available_backends, get_backend
+)
+
+requires_orjson = pytest.mark.skipif(
+    not OrjsonBackend.is_available(), reason="orjson is not installed")
+
+FLOATS = [0.0, -0.0, 1.5, 0.1, 1e-05, 0.0001, 1.5e-07, 1e16, 1.7976931348623157e308,
+          5e-324, 123456789.123, -2.5e-3, 1e22, 12345678901234567.0]
+INTEGERS = [0, -1, 2 ** 63 - 1, -2 ** 63, 2 ** 63, 2 ** 64, -2 ** 64 - 1, 10 ** 30,
+            1234567890123456789012345678901234567890]
+DOCUMENTS = [
+    {"floats": FLOATS, "integers": INTEGERS},
+    {"b": "ключ", "a": ["😀", "é", " ", "\"\\\t\n"], "c": {}, "d": [], "e": None,
+     "f": [True, False], "g": [{"nested": [[1.25], {"x": 1e100}]}]},
+    [{"nan": float("nan")}, float("inf"), float("-inf")],
+    ["\ud800 lone surrogate"],
+    "text", 1.0, [],
+]
+
+
+@requires_orjson
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_orjson_dumps_as_stdlib(document) -> None:
+    """orjson backend writes the same text as json.dumps, floats, NaN and big ints included."""
+    for sort_keys in (True, False):
+        for indent in (2, None, 4):
+            assert OrjsonBackend.dumps(document, indent, sort_keys) == \
+                StdlibBackend.dumps(document, indent, sort_keys)
+    assert StdlibBackend.dumps(document) == json.dumps(
+        document, indent=2, ensure_ascii=False, sort_keys=True)
+
+
+@requires_orjson
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_orjson_loads_as_stdlib(document) -> None:
+    """orjson backend parses the same values as json.loads."""
+    data = json.dumps(document, ensure_ascii=False).encode("utf-8", "surrogatepass")
+    value = OrjsonBackend.loads(data)
+    expected = json.loads(data)
+    assert json.dumps(value) == json.dumps(expected)
+    assert type(value) is type(expected)
+
+
+@requires_orjson
+def test_orjson_loads_big_integers_exactly() -> None:
+    """Integers out of 64-bit range are parsed exactly, not as floats."""
+    data = json.dumps(INTEGERS).encode("utf-8")
+    assert OrjsonBackend.loads(data) == INTEGERS
+    assert all(type(value) is int for value in OrjsonBackend.loads(data))
+    assert math.isnan(OrjsonBackend.loads(b"[NaN]")[0])
+
+
+def test_get_backend() -> None:
+    """Unknown or unavailable backends fall back to the standard library."""
+    assert get_backend("stdlib") is StdlibBackend
+    assert get_backend("unknown") is StdlibBackend
+    assert "stdlib" in available_backends()
+    assert get_backend("auto") is (
+        OrjsonBackend if OrjsonBackend.is_available() else StdlibBackend)
@@ -0,0 +1,91 @@
+"""Tests of reading and writing compressed JSON files.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import bz2
+import gzip
+import json
+import lzma
+
+import pytest
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.JsonCompression import (
+    DECOMPRESSION_ERRORS, compressing_writer, decompressing_reader, is_compressed_file)
+from utils.JsonParsing import JsonParsing
+from utils.JsonStream import JsonEventParser, START_OBJECT
+from utils.DocumentCache import DocumentCache
+
+DOCUMENT = {"list": [1, 2.5, None, True], "text": "значение", "nested": {"b": [], "a": {}}}
+
+MODULES = {".gz": gzip, ".bz2": bz2, ".xz": lzma}
+
+
+@pytest.mark.parametrize("extension", sorted(MODULES))
+def test_round_trip(tmp_path, monkeypatch, extension) -> None:
+    """Written files are compressed by their extension and read back to the same document."""
+    monkeypatch.setattr("utils.JsonParsing.DOCUMENT_CACHE.enabled", False)
+    file_name = str(tmp_path / ("example.json" + extension))
+    JsonParsing().write_json_to_file(file_name, DOCUMENT)
+    assert is_compressed_file(file_name.upper())
+    assert json.loads(MODULES[extension].decompress(open(file_name, "rb").read())) == DOCUMENT
+
+    progress = []
+    document = JsonParsing().load_json_from_file(
+        file_name, lambda bytes_read, total_bytes: progress.append((bytes_read, total_bytes)),
+        workers=2)
+    assert document == DOCUMENT
+    assert progress[-1] == (os.path.getsize(file_name), os.path.getsize(file_name))
+
+    with open(file_name, mode="rb") as raw_file:
+        events = list(JsonEventParser(decompressing_reader(file_name, raw_file)).events())
+    assert events[0][0] == START_OBJECT
+
+
+def test_compact_output(tmp_path) -> None:
+    """Compact files have no indents and spaces, other files are indented by 2 spaces."""
+    compact = tmp_path / "compact.json"
+    JsonParsing().write_json_to_file(str(compact), DOCUMENT, compact=True)
+    assert compact.read_text(encoding="utf-8") == json.dumps(
+        DOCUMENT, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+    indented = tmp_path / "indented.json"
+    JsonParsing().write_json_to_file(str(indented), DOCUMENT)
+    assert indented.read_text(encoding="utf-8") == json.dumps(
+        DOCUMENT, sort_keys=True, indent=2, ensure_ascii=False)
+
+
+def test_plain_files_are_not_wrapped(tmp_path) -> None:
+    """Files with other extensions are read and written as they are."""
+    file_name = str(tmp_path / "example.json")
+    with open(file_name, mode="wb") as raw_file:
+        assert compressing_writer(file_name, raw_file) is raw_file
+    with open(file_name, mode="rb") as raw_file:
+        assert decompressing_reader(file_name, raw_file) is raw_file
+    assert not is_compressed_file(file_name)
+
+
+def test_corrupted_file(tmp_path, monkeypatch) -> None:
+    """Truncated compressed files raise one of DECOMPRESSION_ERRORS or OSError."""
+    monkeypatch.setattr("utils.JsonParsing.DOCUMENT_CACHE.enabled", False)
+    file_name = tmp_path / "example.json.gz"
+    file_name.write_bytes(gzip.compress(json.dumps(DOCUMENT).encode("utf-8"))[:20])
+    with pytest.raises((OSError,) + DECOMPRESSION_ERRORS):
+        JsonParsing().load_json_from_file(str(file_name))
+
+
+def test_cache_hashes_compressed_bytes(tmp_path, monkeypatch) -> None:
+    """Compressed files are cached and verified by the hash of their compressed bytes."""
+    cache = DocumentCache(str(tmp_path / "cache"), 2 ** 20, verify_content=True)
+    monkeypatch.setattr("utils.JsonParsing.DOCUMENT_CACHE", cache)
+    file_name = str(tmp_path / "example.json.xz")
+    JsonParsing().write_json_to_file(file_name, DOCUMENT)
+
+    assert JsonParsing().load_json_from_file(file_name) == DOCUMENT
+    assert cache.stores == 1
+    assert JsonParsing().load_json_from_file(file_name) == DOCUMENT
+    assert cache.hits == 1
@@ -0,0 +1,113 @@
+"""Tests of indexing memory-mapped JSON files with JsonIndex.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import json
+import math
+
+import pytest
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.JsonIndex import JsonIndex, JsonSpan
+
+DOCUMENT = {
+    "b": [1, -2.5e3, "text with \"escaped\" quotes and [brackets]", None, True, False],
+    "a": {"ключ": "значение", "nested": [{"name": "first", "group": "g"}, []], "empty": {}},
+    "c": "}{][",
+}
+
+
+def open_index(tmp_path, text: str) -> JsonIndex:
+    """Write text to a file and return its scanned index."""
+    file_name = tmp_path / "example.json"
+    file_name.write_bytes(text.encode("utf-8"))
+    index = JsonIndex(str(file_name))
+    index.scan()
+    return index
+
+
+def resolve(value):
+    """Return value with all JsonSpan parsed level by level through items()."""
+    if not isinstance(value, JsonSpan):
+        return value
+    items = value.items(sort=False)
+    if value.is_dict():
+        return {key: resolve(child) for key, child in items}
+    return [resolve(child) for _key, child in items]
+
+
+def test_items_match_json_loads(tmp_path) -> None:
+    """Containers parsed level by level are the same as the document of json.loads."""
+    text = json.dumps(DOCUMENT, indent=2, ensure_ascii=False)
+    index = open_index(tmp_path, text)
+    root = index.root()
+    assert resolve(root) == json.loads(text)
+    assert root.value() == json.loads(text)
+    assert [key for key, _value in root.items()] == ["a", "b", "c"]
+    assert [key for key, _value in root.items(sort=False)] == ["b", "a", "c"]
+    assert index.container_count() == 7
+    index.close()
+
+
+def test_items_accept_nan_and_infinity(tmp_path) -> None:
+    """NaN, Infinity and -Infinity are accepted as json.loads does."""
+    index = open_index(tmp_path, '{"nan": NaN, "list": [Infinity, -Infinity, -1, null]}')
+    items = dict(index.root().items())
+    assert math.isnan(items["nan"])
+    assert resolve(items["list"]) == [float("inf"), float("-inf"), -1, None]
+    index.close()
+
+
+def test_repeated_keys(tmp_path) -> None:
+    """Repeated key keeps the position of the first one and the value of the last one."""
+    index = open_index(tmp_path, '{"b": 1, "a": 2, "b": [3]}')
+    items = index.root().items(sort=False)
+    assert [key for key, _value in items] == ["b", "a"]
+    assert resolve(items[0][1]) == [3]
+    index.close()
+
+
+def test_item_offsets_and_line_column(tmp_path) -> None:
+    """Offsets of items point at their keys and convert to line and column and back."""
+    text = json.dumps(DOCUMENT, indent=2, ensure_ascii=False)
+    data = text.encode("utf-8")
+    index = open_index(tmp_path, text)
+    lines = text.split("\n")
+    for item_index in range(2):
+        span = index.root().items()[item_index][1]
+        items = span.items()
+        for (key, _value), offset in zip(items, items.offsets):
+            if key is not None:
+                assert data[offset:].startswith(json.dumps(key, ensure_ascii=False).encode())
+            line, column = index.line_column(offset)
+            assert lines[line - 1][:column - 1].encode("utf-8") == \
+                data[data.rfind(b"\n", 0, offset) + 1:offset]
+            assert index.offset(line, column) == offset
+
+    assert index.line_column(0) == (1, 1)
+    assert index.offset(1) == 0
+    with pytest.raises(ValueError):
+        index.offset(len(lines) + 1)
+    index.close()
+
+
+def test_next_container(tmp_path) -> None:
+    """Container at or after a byte offset is found by its start."""
+    index = open_index(tmp_path, '[1, {"a": [2]}, 3]')
+    assert index.next_container(1) == (4, 14)
+    assert index.next_container(5) == (10, 13)
+    with pytest.raises(ValueError):
+        index.next_container(15)
+    index.close()
+
+
+@pytest.mark.parametrize("text", ['{"a": [1}', '[1]]', '"text"', '[1] [2]', '{"a" 1}', '[1 2]'])
+def test_invalid_documents(tmp_path, text: str) -> None:
+    """Unbalanced brackets fail on scan, other errors when the container is parsed."""
+    with pytest.raises(ValueError):
+        index = open_index(tmp_path, text)
+        resolve(index.root())
@@ -0,0 +1,150 @@
+"""Tests of JSON Lines documents: JsonLinesIndex, lazy records and saving.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import re
+import sys
+import json
+
+import pytest
+
+# Tests do not need a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication
+from utils.JsonLines import (
+    JsonLinesIndex, JsonLine, is_json_lines_file, read_appended_records)
+from utils.JsonParsing import JsonParsing
+from treemodel.QJsonTreeModel import QJsonTreeModel, FETCH_BATCH_SIZE
+from QJsonTreeItem import QJsonTreeItem
+
+APPLICATION = QApplication.instance() or QApplication(sys.argv[:1])
+
+RECORDS = [{"id": 1, "tags": ["a", "b"]}, [1, 2], "text", 3.5, None, {"id": 2, "error": True}]
+
+
+def open_index(tmp_path, text: str) -> JsonLinesIndex:
+    """Write text to a JSON Lines file and return its scanned index."""
+    file_name = tmp_path / "example.jsonl"
+    file_name.write_bytes(text.encode("utf-8"))
+    index = JsonLinesIndex(str(file_name))
+    index.scan()
+    return index
+
+
+def open_model(index: JsonLinesIndex) -> QJsonTreeModel:
+    """Return model showing the records of index."""
+    model = QJsonTreeModel()
+    model.set_root_item(QJsonTreeItem.load_span_to_tree(index.root()), index)
+    return model
+
+
+def test_records_match_json_loads(tmp_path) -> None:
+    """Records are the lines parsed with json.loads, blank lines are skipped."""
+    text = "\n".join(json.dumps(record) for record in RECORDS[:3]) + "\n\n  \r\n" + \
+        "\n".join(json.dumps(record) for record in RECORDS[3:])
+    index = open_index(tmp_path, text)
+    root = index.root()
+    assert root.value() == RECORDS
+    assert not root.is_dict()
+    items = root.items()
+    assert len(items) == len(RECORDS)
+    assert isinstance(items[0][1], JsonLine)
+    assert items[0][1].value() == RECORDS[0]
+    assert items[-1][1].value() == RECORDS[-1]
+    assert [value for _key, value in items[2:5]] == RECORDS[2:5]
+    assert index.record(items.offsets[1]) == b"[1, 2]"
+    index.close()
+
+
+def test_items_do_not_parse_records(tmp_path) -> None:
+    """Invalid records are reported only when their pairs are taken."""
+    index = open_index(tmp_path, '{"a": 1}\nnot json\n{"b": 2}\n')
+    items = index.root().items()
+    assert len(items) == 3
+    assert items[0][1].value() == {"a": 1}
+    assert items[2][1].value() == {"b": 2}
+    with pytest.raises(ValueError, match="Line 2"):
+        items[:2]
+    index.close()
+
+
+def test_find_and_record_row(tmp_path) -> None:
+    """find returns offsets of matching records, once per record."""
+    index = open_index(tmp_path, "\n".join(json.dumps(record) for record in RECORDS))
+    offsets = index.find(re.compile(rb'"id"'))
+    assert [index.record_row(offset) for offset in offsets] == [0, 5]
+    assert index.find(re.compile(rb"missing")) == []
+    assert is_json_lines_file("A.NDJSON") and not is_json_lines_file("a.json")
+    index.close()
+
+
+def test_model_fetches_records_in_batches(tmp_path) -> None:
+    """Root of JSON Lines document creates FETCH_BATCH_SIZE records at a time."""
+    count = FETCH_BATCH_SIZE + 5
+    index = open_index(tmp_path, "\n".join(json.dumps({"id": i}) for i in range(count)))
+    model = open_model(index)
+    assert model.rowCount() == FETCH_BATCH_SIZE
+    model.fetchMore(model.index(-1, -1))
+    assert model.rowCount() == count
+    last = model.index(count - 1, 0)
+    assert model.rowCount(last) == 0 and model.canFetchMore(last)
+    model.fetchMore(last)
+    assert model.index(0, 2, last).data() == count - 1
+    index.close()
+
+
+def test_model_skips_invalid_records(tmp_path) -> None:
+    """Batch with invalid record is not fetched instead of breaking the model."""
+    lines = [json.dumps(i) for i in range(FETCH_BATCH_SIZE + 5)]
+    lines[FETCH_BATCH_SIZE + 1] = "invalid"
+    index = open_index(tmp_path, "\n".join(lines))
+    model = open_model(index)
+    assert model.rowCount() == FETCH_BATCH_SIZE
+    model.fetchMore(model.index(-1, -1))
+    assert model.rowCount() == FETCH_BATCH_SIZE
+    index.close()
+
+
+def test_save_keeps_unchanged_records(tmp_path) -> None:
+    """Saved file has the original text of unchanged records and the new text of edited ones."""
+    lines = ['{"id": 1,   "name": "first"}', "[ 1, 2 ]", '"text"', '{"id": 2}']
+    index = open_index(tmp_path, "\n".join(lines) + "\n")
+    model = open_model(index)
+
+    first = model.index(0, 0)
+    model.fetchMore(first)
+    model.fetchMore(model.index(1, 0))
+    name = model.index(1, 2, first)
+    assert name.data() == "first"
+    assert model.setData(name, "changed", Qt.EditRole)
+
+    saved = tmp_path / "saved.jsonl"
+    JsonParsing().write_json_lines_to_file(str(saved), model.get_json_lines_from_tree())
+    saved_lines = saved.read_text(encoding="utf-8").splitlines()
+    assert saved_lines[1:] == lines[1:]
+    assert json.loads(saved_lines[0]) == {"id": 1, "name": "changed"}
+    index.close()
+
+
+def test_read_appended_records(tmp_path) -> None:
+    """Only complete appended lines are read, invalid ones are skipped."""
+    file_name = tmp_path / "followed.jsonl"
+    file_name.write_bytes(b'{"a": 1}\n')
+    offset = file_name.stat().st_size
+    with open(file_name, mode="ab") as opened_file:
+        opened_file.write(b'{"b": 2}\ninvalid\n[3]\n{"c": ')
+    records, new_offset = read_appended_records(str(file_name), offset)
+    assert records == [{"b": 2}, [3]]
+    with open(file_name, mode="ab") as opened_file:
+        opened_file.write(b'4}\n')
+    assert read_appended_records(str(file_name), new_offset) == \
+        ([{"c": 4}], file_name.stat().st_size)
+
+    file_name.write_bytes(b"{}\n")
+    with pytest.raises(ValueError):
+        read_appended_records(str(file_name), new_offset)
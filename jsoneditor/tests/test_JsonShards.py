@@ -0,0 +1,88 @@
+"""Tests of parsing JSON documents in parallel shards with utils.JsonShards.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.JsonShards import ShardError, find_shards, load_json_sharded
+from utils.JsonParsing import JsonParsing
+
+DOCUMENT = {"key %04d" % number: {"list": [number, "text,\n", None], "nested": {"a": 1}}
+            for number in range(500)}
+
+
+def write(tmp_path, text: str) -> str:
+    """Write text to a file and return its name."""
+    file_name = tmp_path / "example.json"
+    file_name.write_text(text, encoding="utf-8")
+    return str(file_name)
+
+
+def test_shards_join_to_document() -> None:
+    """Shards are runs of whole top-level members in the order of the file."""
+    data = json.dumps(DOCUMENT, indent=4).encode("utf-8")
+    is_dict, ranges = find_shards(data, 8)
+    assert is_dict
+    assert len(ranges) == 8
+    joined = {}
+    for start, end in ranges:
+        joined.update(json.loads(b"{" + data[start:end] + b"}"))
+    assert list(joined.items()) == list(DOCUMENT.items())
+
+    is_dict, ranges = find_shards(b"[1,2,3]", 4)
+    assert not is_dict and ranges == [(1, 6)]
+    with pytest.raises(ShardError):
+        find_shards(b'"text"', 4)
+
+
+def test_load_json_sharded_equals_json_loads(tmp_path) -> None:
+    """Documents parsed in shards are identical to json.loads of the whole file."""
+    text = json.dumps(DOCUMENT, indent=2, ensure_ascii=False)
+    file_name = write(tmp_path, text)
+    progress = []
+    document = load_json_sharded(file_name, 2, lambda done, total: progress.append(
+        (done, total)))
+    assert list(document.items()) == list(json.loads(text).items())
+    assert progress[-1][1] == os.path.getsize(file_name)
+
+    items = [{"row": row, "text": "значение"} for row in range(300)]
+    text = json.dumps(items, indent="\t", ensure_ascii=False)
+    assert load_json_sharded(write(tmp_path, text), 2) == json.loads(text)
+
+
+def test_load_json_sharded_repeated_keys(tmp_path) -> None:
+    """Repeated keys in different shards keep the first position and the last value."""
+    lines = ['  "a": %d' % number for number in range(100)] + ['  "b": 0', '  "a": -1']
+    text = "{\n" + ",\n".join(lines) + "\n}"
+    assert list(load_json_sharded(write(tmp_path, text), 2).items()) == \
+        list(json.loads(text).items())
+
+
+def test_unsplittable_and_invalid_documents(tmp_path, monkeypatch) -> None:
+    """Documents without line breaks are not split, invalid shards raise ShardError."""
+    monkeypatch.setattr("utils.JsonParsing.DOCUMENT_CACHE.enabled", False)
+    assert load_json_sharded(write(tmp_path, json.dumps(DOCUMENT)), 2) is None
+
+    text = json.dumps(DOCUMENT, indent=4)
+    with pytest.raises(ShardError):
+        load_json_sharded(write(tmp_path, text.replace('"key 0100"', "key 0100")), 2)
+    # Parsed at once when shards fail, the error comes from the whole document
+    with pytest.raises(ValueError):
+        JsonParsing().load_json_from_file(
+            write(tmp_path, text.replace('"key 0100"', "key 0100")), workers=2)
+
+
+def test_load_json_sharded_cancel(tmp_path, monkeypatch) -> None:
+    """Parsing canceled by progress returns None."""
+    monkeypatch.setattr("utils.JsonParsing.DOCUMENT_CACHE.enabled", False)
+    file_name = write(tmp_path, json.dumps(DOCUMENT, indent=4))
+    assert load_json_sharded(file_name, 2, lambda done, total: False) is None
+    assert JsonParsing().load_json_from_file(
+        file_name, lambda done, total: False, workers=2) is None
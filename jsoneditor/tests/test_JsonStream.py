@@ -0,0 +1,91 @@
+"""Tests of parsing JSON file into events by JsonEventParser.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import io
+import os
+import sys
+import json
+import math
+
+import pytest
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.JsonStream import (
+    JsonEventParser, JsonValueBuilder, START_OBJECT, END_OBJECT, START_ARRAY, END_ARRAY, KEY,
+    VALUE
+)
+
+CHUNK_SIZES = (1, 2, 3, 7, 1024)
+
+DOCUMENT = {
+    "name": "Ёлка é中\U0001f600",
+    "escaped": "quote \" backslash \\ tab \t unicode é 😀",
+    "numbers": [0, -1, 12345678901234567890123, 1.5, -2.5e-3, 1E10, 0.1],
+    "literals": [True, False, None],
+    "empty": [{}, [], ""],
+    "nested": {"list": [[1, [2, [3]]], {"key": {"key": "value"}}]}
+}
+
+
+def parse(text: bytes, chunk_size: int):
+    """Return value of text built from JsonEventParser events."""
+    builder = JsonValueBuilder()
+    for event, value, _start, _end in JsonEventParser(
+            io.BytesIO(text), chunk_size=chunk_size).events():
+        builder.feed(event, value)
+    return builder.value
+
+
+def test_events_match_json_loads() -> None:
+    """Documents are parsed as json.loads does, in any chunks."""
+    for text in (json.dumps(DOCUMENT, ensure_ascii=False).encode("utf-8"),
+                 json.dumps(DOCUMENT, indent=2).encode("utf-8"),
+                 b"  42 ", b'"text"', b"-Infinity", b"[1e5]"):
+        for chunk_size in CHUNK_SIZES:
+            assert parse(text, chunk_size) == json.loads(text)
+
+
+def test_events_accept_nan_and_infinity() -> None:
+    """NaN, Infinity and -Infinity are accepted as json.load does, in any chunks."""
+    text = b'{"nan": NaN, "list": [Infinity, -Infinity, -1.5e3, null]}'
+    for chunk_size in CHUNK_SIZES:
+        value = parse(text, chunk_size)
+        assert math.isnan(value["nan"])
+        assert value["list"] == json.loads(text)["list"]
+
+
+def test_event_offsets_are_bytes() -> None:
+    """Start and end of every token are byte offsets, also after non-ASCII text."""
+    text = '{"ключ": ["значение", 12, true], "é": {"k": null}}'.encode("utf-8")
+    for chunk_size in CHUNK_SIZES:
+        tokens = [(event, text[start:end]) for event, _value, start, end in JsonEventParser(
+            io.BytesIO(text), chunk_size=chunk_size).events()]
+        assert tokens == [
+            (START_OBJECT, b"{"), (KEY, '"ключ"'.encode("utf-8")), (START_ARRAY, b"["),
+            (VALUE, '"значение"'.encode("utf-8")), (VALUE, b"12"), (VALUE, b"true"),
+            (END_ARRAY, b"]"), (KEY, '"é"'.encode("utf-8")), (START_OBJECT, b"{"),
+            (KEY, b'"k"'), (VALUE, b"null"), (END_OBJECT, b"}"), (END_OBJECT, b"}")]
+
+
+@pytest.mark.parametrize("text", [
+    b'{"key": "line\nbreak"}', b'["tab\tinside"]', b'{"key" 1}', b"[1, 2", b"[1] 2",
+    b"[01]", b"[1,]", b'{"key": tru}', b'["\\x"]', b'{"key": "value"', b"", b"[-]",
+    b'{1: 2}', b"[1 2]", b"]"])
+def test_invalid_documents(text: bytes) -> None:
+    """Invalid documents, raw control characters in strings included, raise ValueError."""
+    with pytest.raises(ValueError):
+        json.loads(text)
+    for chunk_size in CHUNK_SIZES:
+        with pytest.raises(ValueError):
+            parse(text, chunk_size)
+
+
+def test_progress_cancels_parsing() -> None:
+    """Parsing stops when progress returns False."""
+    text = json.dumps(list(range(1000))).encode("utf-8")
+    events = list(JsonEventParser(
+        io.BytesIO(text), chunk_size=16, progress=lambda read, total: read < 64).events())
+    assert 0 < len(events) < 30
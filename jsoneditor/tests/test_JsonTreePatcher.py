@@ -0,0 +1,139 @@
+"""Tests of writing edits of the tree into its file with JsonTreePatcher.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import json
+
+import pytest
+
+# Tests do not need a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import Qt, QModelIndex
+from PyQt5.QtWidgets import QApplication
+from treemodel.QJsonTreeModel import QJsonTreeModel
+from utils.JsonIndex import JsonIndex
+from QJsonTreeItem import QJsonTreeItem
+from JsonTreePatcher import file_state
+
+APPLICATION = QApplication.instance() or QApplication(sys.argv[:1])
+
+# Layout of the file differs from the one JsonTreeWriter writes
+TEXT = (b'{\n'
+        b'    "name": "first",\n'
+        b'    "list": [1,   2,   3],\n'
+        b'    "nested": {"inner": "value",    "other": true}\n'
+        b'}\n')
+
+
+@pytest.fixture
+def document(tmp_path):
+    """Return file name of TEXT and a model of it with editable tree."""
+    file_name = tmp_path / "example.json"
+    file_name.write_bytes(TEXT)
+    model = QJsonTreeModel()
+    model.is_editable = True
+    model.load(json.loads(TEXT))
+    return str(file_name), model
+
+
+def find(model: QJsonTreeModel, key: str, parent: QModelIndex=QModelIndex()) -> QModelIndex:
+    """Return index of the child of parent with the key."""
+    for row in range(model.rowCount(parent)):
+        index = model.index(row, 0, parent)
+        if index.data() == key:
+            return index
+    raise KeyError(key)
+
+
+def patched(file_name: str, model: QJsonTreeModel) -> bytes:
+    """Patch the file with edits of the model and return its new text."""
+    patcher = model.create_patcher(file_name, file_state(file_name))
+    assert patcher.patch()
+    assert patcher.splices
+    with open(file_name, mode="rb") as opened_file:
+        text = opened_file.read()
+    assert json.loads(text) == model.get_json_from_tree()
+    return text
+
+
+def test_patch_edited_value(document) -> None:
+    """Only the bytes of the edited value are replaced."""
+    file_name, model = document
+    name = find(model, "name")
+    assert model.setData(model.index(name.row(), 2), "second", Qt.EditRole)
+    assert patched(file_name, model) == TEXT.replace(b'"first"', b'"second"')
+
+
+def test_patch_renamed_key(document) -> None:
+    """Renamed keys are replaced in place, the other members keep their layout."""
+    file_name, model = document
+    nested = find(model, "nested")
+    assert model.setData(find(model, "inner", nested), "renamed", Qt.EditRole)
+    assert patched(file_name, model) == TEXT.replace(b'"inner"', b'"renamed"')
+
+
+def test_patch_inserted_and_removed_rows(document) -> None:
+    """Inserted rows get the separators of their neighbours, removed ones are cut out."""
+    file_name, model = document
+    list_index = find(model, "list")
+    assert model.removeRows(1, 1, list_index)
+    text = patched(file_name, model)
+    assert json.loads(text)["list"] == [1, 3]
+    assert text.startswith(b'{\n    "name": "first",\n')
+    assert text.endswith(b'    "nested": {"inner": "value",    "other": true}\n}\n')
+
+    model.is_modified = False
+    assert model.insertRows(2, 1, list_index)
+    text = patched(file_name, model)
+    assert json.loads(text)["list"] == [1, 3, model.getItem(list_index).child(2).value]
+    assert text.startswith(b'{\n    "name": "first",\n')
+
+    model.is_modified = False
+    nested = find(model, "nested")
+    assert model.removeRows(find(model, "other", nested).row(), 1, nested)
+    text = patched(file_name, model)
+    assert b'"nested": {"inner": "value"}' in text
+
+
+def test_patch_rejects_changed_file(document) -> None:
+    """Files changed since they were loaded are not patched."""
+    file_name, model = document
+    state = file_state(file_name)
+    assert model.setData(model.index(find(model, "name").row(), 2), "second", Qt.EditRole)
+    with open(file_name, mode="ab") as opened_file:
+        opened_file.write(b" ")
+    assert not model.create_patcher(file_name, state).patch()
+    assert open(file_name, mode="rb").read() == TEXT + b" "
+
+
+def test_invalid_rows_keep_no_original_children(document) -> None:
+    """Rejected inserts and removes do not record the original children."""
+    _file_name, model = document
+    list_index = find(model, "list")
+    assert not model.removeRows(2, 5, list_index)
+    assert not model.insertRows(-1, 1, list_index)
+    assert not model.original_children
+    assert not model.dirty_items
+
+
+def test_patch_mapped_document(tmp_path) -> None:
+    """Edits of a memory-mapped document are written through a new file."""
+    file_name = tmp_path / "example.json"
+    file_name.write_bytes(TEXT)
+    index = JsonIndex(str(file_name))
+    index.scan()
+    model = QJsonTreeModel()
+    model.is_editable = True
+    model.set_root_item(QJsonTreeItem.load_span_to_tree(index.root()), index)
+    state = file_state(str(file_name))
+
+    name = find(model, "name")
+    assert model.setData(model.index(name.row(), 2), "a longer name", Qt.EditRole)
+    assert model.create_patcher(str(file_name), state).patch()
+    assert file_name.read_bytes() == TEXT.replace(b'"first"', b'"a longer name"')
+    index.close()
@@ -0,0 +1,230 @@
+"""Tests of writing JSON straight from the tree with JsonTreeWriter.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import io
+import os
+import sys
+import gzip
+import copy
+import json
+
+import pytest
+
+# Tests do not need a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import Qt, QModelIndex
+from PyQt5.QtWidgets import QApplication
+from treemodel.QJsonTreeModel import QJsonTreeModel
+from utils.JsonIndex import JsonIndex
+from QJsonTreeItem import QJsonTreeItem
+from JsonTreeWriter import FragmentCache, JsonTreeWriter, scalar_text
+
+APPLICATION = QApplication.instance() or QApplication(sys.argv[:1])
+
+DOCUMENT = {
+    "list": [1, -2.5e-300, 10 ** 30, "text \"quoted\"\n\u0001", None, True, False, [], {}],
+    "nested": {"b": [[1, [2, {"deep": [3]}]]], "a": {"ключ": "значение"}, "": 0},
+    "floats": [float("nan"), float("inf"), -float("inf"), 0.1, 1e16],
+    "z": "last",
+}
+
+
+def dumps(document, compact: bool=False) -> bytes:
+    """Return text of json.dumps which JsonTreeWriter must write."""
+    if compact:
+        text = json.dumps(document, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    else:
+        text = json.dumps(document, indent=2, ensure_ascii=False, sort_keys=True)
+    return text.encode("utf-8")
+
+
+def written(item, compact: bool=False, buffer_size: int=7, cache=None) -> bytes:
+    """Return text of item written by JsonTreeWriter with a small buffer."""
+    return cached_write(item, compact, buffer_size, cache)[0]
+
+
+def cached_write(item, compact: bool=False, buffer_size: int=7, cache=None) -> tuple:
+    """Return text of item and amount of characters written from the cache."""
+    opened_file = io.BytesIO()
+    writer = JsonTreeWriter(opened_file, compact=compact, buffer_size=buffer_size, cache=cache)
+    writer.write(item)
+    assert writer.bytes_written == len(opened_file.getvalue())
+    return opened_file.getvalue(), writer.cached_characters
+
+
+def large_document(count: int=1000) -> dict:
+    """Return document with groups of count values.
+
+    Groups of the default count are cached, the whole document is too large for one text.
+    """
+    return {"group%d" % group: {"values": [{"id": index, "name": "item %d" % index}
+                                           for index in range(count)], "count": count}
+            for group in range(4)}
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_eager_tree_matches_json_dumps(compact) -> None:
+    """Text of a fully created tree is byte-identical to json.dumps of the document."""
+    model = QJsonTreeModel()
+    model.load(DOCUMENT)
+    assert written(model.root_item, compact) == dumps(DOCUMENT, compact)
+    assert written(model.root_item, compact, buffer_size=2 ** 20) == dumps(DOCUMENT, compact)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_lazy_tree_matches_json_dumps(compact) -> None:
+    """Children which were not created yet are written from their values."""
+    model = QJsonTreeModel(lazy=True)
+    model.load(DOCUMENT)
+    nested = model.index(2, 0)
+    model.fetchMore(nested)
+    assert model.rowCount(model.index(0, 0)) == 0
+    assert written(model.root_item, compact) == dumps(DOCUMENT, compact)
+
+
+def test_mapped_tree_matches_json_dumps(tmp_path) -> None:
+    """Containers of memory-mapped document are parsed when they are written."""
+    file_name = tmp_path / "example.json"
+    file_name.write_text(json.dumps(DOCUMENT, indent=4), encoding="utf-8")
+    index = JsonIndex(str(file_name))
+    index.scan()
+    model = QJsonTreeModel()
+    model.set_root_item(QJsonTreeItem.load_span_to_tree(index.root()), index)
+    model.fetchMore(model.index(2, 0))
+    assert written(model.root_item) == dumps(DOCUMENT)
+    index.close()
+
+
+def test_selection_and_compressed_file(tmp_path) -> None:
+    """An item is written as a document of its own, compressed by the file extension."""
+    model = QJsonTreeModel()
+    model.load(DOCUMENT)
+    nested = model.index(2, 0)
+    assert nested.data() == "nested"
+
+    file_name = str(tmp_path / "selection.json.gz")
+    model.write_json_to_file(file_name, model.getItem(nested))
+    with gzip.open(file_name, mode="rb") as opened_file:
+        assert opened_file.read() == dumps(DOCUMENT["nested"])
+
+    file_name = str(tmp_path / "document.json")
+    model.write_json_to_file(file_name, compact=True)
+    with open(file_name, mode="rb") as opened_file:
+        assert opened_file.read() == dumps(DOCUMENT, compact=True)
+
+
+def test_scalar_text() -> None:
+    """Scalars are written as json.dumps writes them, other objects raise TypeError."""
+    for value in DOCUMENT["list"][:7] + DOCUMENT["floats"]:
+        assert scalar_text(value) == json.dumps(value)
+    with pytest.raises(TypeError):
+        scalar_text(object())
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_cache_after_edit(compact) -> None:
+    """Unchanged containers are written from the cache, edited ones and their parents again."""
+    document = large_document()
+    model = QJsonTreeModel()
+    model.is_editable = True
+    model.load(copy.deepcopy(document))
+    cache = model.fragment_cache
+
+    assert cached_write(model.root_item, compact, cache=cache) == (dumps(document, compact), 0)
+    assert cache.size > 0
+    text, cached_characters = cached_write(model.root_item, compact, cache=cache)
+    assert text == dumps(document, compact)
+    assert cached_characters > 0
+
+    group = model.index(1, 0)
+    values = model.index(1, 0, group)
+    first = model.index(0, 0, values)
+    name = model.index(1, 2, first)
+    assert name.data() == "item 0"
+    assert model.setData(name, "edited", Qt.EditRole)
+    document["group1"]["values"][0]["name"] = "edited"
+    assert id(model.getItem(group)) not in cache.fragments
+    assert id(model.getItem(values)) not in cache.fragments
+    text, cached_characters = cached_write(model.root_item, compact, cache=cache)
+    assert text == dumps(document, compact)
+    assert 0 < cached_characters < len(text)
+
+
+def test_cache_after_rename_insert_and_remove() -> None:
+    """Renamed keys, inserted and removed children are written, not their old texts."""
+    document = large_document()
+    model = QJsonTreeModel()
+    model.is_editable = True
+    model.load(copy.deepcopy(document))
+    cache = model.fragment_cache
+    written(model.root_item, cache=cache)
+
+    group = model.index(0, 0)
+    assert group.data() == "group0"
+    assert model.setData(model.index(0, 0, group), "total", Qt.EditRole)
+    document["group0"]["total"] = document["group0"].pop("count")
+    assert written(model.root_item, cache=cache) == dumps(document)
+
+    values = model.index(1, 0, model.index(2, 0))
+    assert model.removeRows(0, 2, values)
+    del document["group2"]["values"][:2]
+    assert written(model.root_item, cache=cache) == dumps(document)
+
+    assert model.insertRows(0, 1, values)
+    new_value = model.getItem(values).child(0)
+    document["group2"]["values"].insert(0, new_value.value)
+    assert written(model.root_item, cache=cache) == dumps(document)
+
+
+def test_cache_format_and_size() -> None:
+    """Another format drops the cached texts, a cache of size 0 keeps none."""
+    document = large_document()
+    model = QJsonTreeModel()
+    model.load(document)
+    cache = model.fragment_cache
+    written(model.root_item, cache=cache)
+    assert cached_write(model.root_item, compact=True, cache=cache) == (
+        dumps(document, compact=True), 0)
+    assert cached_write(model.root_item, compact=True, cache=cache)[1] > 0
+
+    empty_cache = FragmentCache(0)
+    assert cached_write(model.root_item, cache=empty_cache) == (dumps(document), 0)
+    assert cached_write(model.root_item, cache=empty_cache) == (dumps(document), 0)
+    assert empty_cache.size == 0 and not empty_cache.fragments
+
+    small_cache = FragmentCache(400)
+    model.load(large_document(count=5))
+    written(model.root_item, cache=small_cache)
+    assert 0 < small_cache.size <= 400
+    assert cached_write(model.root_item, cache=small_cache)[0] == dumps(large_document(count=5))
+
+
+def test_cache_of_lazy_tree() -> None:
+    """Children fetched after a write and a new document do not reuse old texts."""
+    document = large_document()
+    model = QJsonTreeModel(lazy=True)
+    model.is_editable = True
+    model.load(copy.deepcopy(document))
+    cache = model.fragment_cache
+    written(model.root_item, cache=cache)
+
+    group = model.index(3, 0)
+    model.fetchMore(group)
+    values = model.index(1, 0, group)
+    model.fetchMore(values)
+    assert model.rowCount(values) == 1000
+    text, cached_characters = cached_write(model.root_item, cache=cache)
+    assert text == dumps(document)
+    assert cached_characters > 0
+
+    assert model.removeRows(999, 1, values)
+    del document["group3"]["values"][999]
+    assert written(model.root_item, cache=cache) == dumps(document)
+
+    model.load({"other": [1, 2, 3]})
+    assert cache.size == 0 and not cache.fragments
+    assert written(model.root_item, cache=cache) == dumps({"other": [1, 2, 3]})
@@ -0,0 +1,57 @@
+"""Tests of translating JSON keys with KeyTranslator.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import json
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.KeyTranslator import KeyTranslator
+
+
+def write_table(file_name: str, table: dict, mtime_ns: int) -> None:
+    """Write translation table with the given mtime, so reloading does not depend on the clock."""
+    with open(file_name, mode="w", encoding="utf-8") as opened_file:
+        json.dump(table, opened_file, ensure_ascii=False)
+    os.utime(file_name, ns=(mtime_ns, mtime_ns))
+
+
+def test_translate_forward_and_reverse(tmp_path) -> None:
+    """Keys are translated to Russian with the table and back to English with its reverse."""
+    file_name = str(tmp_path / "translate.json")
+    write_table(file_name, {"devices": "устройства", "name": "имя"}, 10 ** 18)
+    translator = KeyTranslator(file_name)
+
+    assert translator.translate("devices", "ru") == "устройства"
+    assert translator.translate("имя", "en") == "name"
+    assert translator.translate("unknown", "ru") == "unknown"
+    assert translator.translate("devices", "en") == "devices"
+    assert translator.translate("devices", "de") is None
+    assert translator.statistics() == {"hits": 2, "misses": 2, "loads": 1}
+
+
+def test_reload_if_changed(tmp_path) -> None:
+    """Table is read again only when mtime of the file changes."""
+    file_name = str(tmp_path / "translate.json")
+    write_table(file_name, {"devices": "устройства"}, 10 ** 18)
+    translator = KeyTranslator(file_name, check_interval=3600)
+    assert translator.translate("devices", "ru") == "устройства"
+
+    write_table(file_name, {"devices": "приборы"}, 2 * 10 ** 18)
+    assert translator.translate("devices", "ru") == "устройства"
+    assert not translator.reload_if_changed()
+    assert translator.reload_if_changed(force=True)
+    assert translator.translate("devices", "ru") == "приборы"
+    assert translator.translate("приборы", "en") == "devices"
+    assert not translator.reload_if_changed(force=True)
+    assert translator.loads == 2
+
+
+def test_missing_file(tmp_path) -> None:
+    """Keys are returned untranslated if translate.json does not exist."""
+    translator = KeyTranslator(str(tmp_path / "translate.json"))
+    assert translator.translate("devices", "ru") == "devices"
+    assert translator.statistics() == {"hits": 0, "misses": 1, "loads": 1}
@@ -0,0 +1,90 @@
+"""Tests of MainWindow.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import json
+import time
+
+import pytest
+
+# Tests do not need a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication
+import mainwindow.MainWindow as main_window
+
+APPLICATION = QApplication.instance() or QApplication(sys.argv[:1])
+
+
+@pytest.fixture
+def window(tmp_path, monkeypatch):
+    """MainWindow with a small loaded file and a low large_node_count.
+
+    MainWindow writes config.ini when it is closed, the file is restored afterwards.
+    """
+    config_file = main_window.Utils().get_abs_file_path("utils/config/config.ini")
+    with open(config_file, mode="rb") as opened_file:
+        config = opened_file.read()
+    monkeypatch.setattr("utils.DocumentCache.DOCUMENT_CACHE.enabled", False)
+    monkeypatch.setitem(main_window.CONFIG_OBJECT["Loading"], "large_file_mb", "64")
+    monkeypatch.setitem(main_window.CONFIG_OBJECT["Loading"], "large_node_count", "10000")
+    file_name = tmp_path / "small.json"
+    file_name.write_text(json.dumps({"a": [1, 2], "b": "text"}))
+    main = main_window.MainWindow(str(file_name))
+    wait_for_loading(main)
+    yield main
+    main.close()
+    with open(config_file, mode="wb") as opened_file:
+        opened_file.write(config)
+
+
+def wait_for_loading(main, timeout: float=30) -> None:
+    """Process events until the window loads its file."""
+    deadline = time.monotonic() + timeout
+    while main.is_loading() and time.monotonic() < deadline:
+        APPLICATION.processEvents()
+
+
+def test_profile_is_chosen_by_node_count(window, tmp_path) -> None:
+    """Files with many nodes are large even if they are small in bytes."""
+    assert window.choose_load_profile(window.json_file_name) == main_window.PROFILE_SMALL
+    assert window.choose_load_profile(str(tmp_path / "missing.json")) == \
+        main_window.PROFILE_SMALL
+
+    many_nodes = tmp_path / "many_nodes.json"
+    many_nodes.write_text(json.dumps([[row, row] for row in range(5000)]))
+    assert window.choose_load_profile(str(many_nodes)) == main_window.PROFILE_LARGE
+
+    few_nodes = tmp_path / "few_nodes.json"
+    few_nodes.write_text(json.dumps(["x" * 100 for _row in range(5000)]))
+    assert window.choose_load_profile(str(few_nodes)) == main_window.PROFILE_SMALL
+
+
+def test_profile_is_chosen_by_size(window, tmp_path, monkeypatch) -> None:
+    """Files over large_file_mb are large without sampling them."""
+    monkeypatch.setitem(main_window.CONFIG_OBJECT["Loading"], "large_file_mb", "0.001")
+    large = tmp_path / "large.json"
+    large.write_text(json.dumps(["x" * 2000]))
+    assert window.choose_load_profile(str(large)) == main_window.PROFILE_LARGE
+
+
+def test_manual_profile(window, tmp_path) -> None:
+    """Manually chosen profile is used for every file and applied to the model and view."""
+    window.action_change_load_profile(main_window.PROFILE_LARGE)
+    wait_for_loading(window)
+    assert window.choose_load_profile(window.json_file_name) == main_window.PROFILE_LARGE
+    assert window.model.lazy and window.model.is_plain
+    assert window.tree_view.uniformRowHeights()
+    assert window.model.data(window.model.index(0, 0), Qt.FontRole) is None
+    assert window.model.get_json_from_tree() == {"a": [1, 2], "b": "text"}
+
+    window.action_change_load_profile(main_window.PROFILE_SMALL)
+    wait_for_loading(window)
+    assert not window.model.is_plain
+    assert not window.tree_view.uniformRowHeights()
+    assert window.model.data(window.model.index(0, 0), Qt.FontRole) is not None
@@ -0,0 +1,128 @@
+"""Tests of QJsonTreeItem.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import io
+import os
+import sys
+import json
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(1, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "treemodel"))
+from utils.JsonStream import JsonEventParser
+from QJsonTreeItem import (
+    QJsonTreeItem, NO_CHILDREN, TYPE_DICT, TYPE_LIST, TYPE_STR, TYPE_INT, TYPE_FLOAT,
+    TYPE_BOOL, TYPE_NULL
+)
+
+
+def create_item(rows: int) -> QJsonTreeItem:
+    """Return item with rows children, key of each child is its initial row."""
+    parent = QJsonTreeItem()
+    for row in range(rows):
+        child = QJsonTreeItem(parent)
+        child.key = row
+        parent.appendChild(child)
+    return parent
+
+
+def assert_rows(parent: QJsonTreeItem) -> None:
+    """Check that row() of every child is its position in the parent."""
+    for row in range(parent.childCount()):
+        assert parent.child(row).row() == row
+
+
+def test_row_after_insert_children() -> None:
+    """Children after inserted ones are shifted."""
+    parent = create_item(10)
+    assert_rows(parent)
+    assert parent.insertChildren(3, 2, 3)
+    assert parent.insertChildren(0, 1, 3)
+    assert parent.insertChildren(parent.childCount(), 1, 3)
+    assert parent.childCount() == 14
+    assert_rows(parent)
+    assert [parent.child(row).key for row in (0, 1, 4, 6, 12)] == ["", 0, "", 3, 9]
+
+
+def test_row_after_remove_children() -> None:
+    """Children after removed ones are shifted, removing out of range fails."""
+    parent = create_item(10)
+    assert_rows(parent)
+    assert parent.removeChildren(2, 3)
+    assert parent.removeChildren(0, 1)
+    assert not parent.removeChildren(5, 3)
+    assert parent.childCount() == 6
+    assert_rows(parent)
+    assert [parent.child(row).key for row in range(6)] == [1, 5, 6, 7, 8, 9]
+
+
+def test_row_without_parent() -> None:
+    """Root item is in row 0."""
+    assert QJsonTreeItem().row() == 0
+
+
+def test_type_tags() -> None:
+    """Types of loaded values are stored as tags and mapped back to Python classes."""
+    document = {"dict": {}, "list": [], "str": "", "int": 1, "float": 1.5,
+                "bool": True, "null": None}
+    root_item = QJsonTreeItem.load_json_to_tree(document)
+    tags = {root_item.child(row).key: root_item.child(row).type_tag
+            for row in range(root_item.childCount())}
+    assert tags == {"dict": TYPE_DICT, "list": TYPE_LIST, "str": TYPE_STR, "int": TYPE_INT,
+                    "float": TYPE_FLOAT, "bool": TYPE_BOOL, "null": TYPE_NULL}
+    assert root_item.type is dict
+    for row in range(root_item.childCount()):
+        child = root_item.child(row)
+        assert child.type is type(document[child.key])
+
+
+def test_items_without_children_share_empty_tuple() -> None:
+    """Leaf items have no own list of children and no __dict__."""
+    root_item = QJsonTreeItem.load_json_to_tree({"a": 1, "b": [2]})
+    leaf = root_item.child(0)
+    assert leaf._children is NO_CHILDREN
+    assert not hasattr(leaf, "__dict__")
+    assert leaf.insertChildren(0, 1)
+    assert leaf.childCount() == 1
+    assert root_item.child(0)._children is not NO_CHILDREN
+
+
+def dump_tree(item: QJsonTreeItem) -> tuple:
+    """Return keys, type tags, values and children of the tree as nested tuples."""
+    return (item.key, item.type_tag, item.value,
+            tuple(dump_tree(item.child(row)) for row in range(item.childCount())))
+
+
+STREAMED_TEXT = b"""{"b": [{"name": "first", "group": "g"}, {"group": "only group"}, [1, 2], 3],
+                     "a": {"z": null, "y": [true, false, 1.5]},
+                     "b": [{"name": "repeated key keeps the last value"}],
+                     "c": "text"}"""
+
+
+def test_load_events_to_tree_matches_load_json_to_tree() -> None:
+    """Tree built from parser events is the same as the tree of the parsed document."""
+    events = JsonEventParser(io.BytesIO(STREAMED_TEXT), chunk_size=5).events()
+    assert dump_tree(QJsonTreeItem.load_events_to_tree(events)) == \
+        dump_tree(QJsonTreeItem.load_json_to_tree(json.loads(STREAMED_TEXT)))
+
+
+def test_streamed_top_level_items_in_final_order() -> None:
+    """Top-level items passed to top_level_item are put in order by final_order."""
+    items = []
+    keys = []
+
+    def top_level_item(item: QJsonTreeItem, key: str) -> None:
+        items.append(item)
+        keys.append(key)
+
+    events = JsonEventParser(io.BytesIO(STREAMED_TEXT)).events()
+    root_item = QJsonTreeItem.load_events_to_tree(events, top_level_item=top_level_item)
+    assert root_item.childCount() == 0
+    assert keys == ["b", "a", "b", "c"]
+    for row in QJsonTreeItem.final_order(keys):
+        root_item.appendChild(items[row])
+    assert dump_tree(root_item) == \
+        dump_tree(QJsonTreeItem.load_json_to_tree(json.loads(STREAMED_TEXT)))
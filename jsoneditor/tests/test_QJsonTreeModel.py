@@ -0,0 +1,294 @@
+"""Tests of QJsonTreeModel.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import json
+import tempfile
+
+# Tests do not need a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5.QtCore import Qt, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtTest import QAbstractItemModelTester
+from PyQt5.QtWidgets import QApplication, QTreeView
+from treemodel.QJsonTreeModel import QJsonTreeModel, FETCH_BATCH_SIZE, TYPE_NAMES
+from utils.JsonLines import JsonLinesIndex
+from QJsonTreeItem import QJsonTreeItem, TYPE_STR, TYPE_INT, TYPE_BOOL
+
+APPLICATION = QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def test_lazy_model_fetches_children_in_batches() -> None:
+    """Lazy model creates children of an item by FETCH_BATCH_SIZE when fetchMore is called."""
+    document = {"list": list(range(2 * FETCH_BATCH_SIZE + 10)), "tail": {"key": "value"}}
+    model = QJsonTreeModel(lazy=True)
+    model.load(document)
+
+    list_index = model.index(0, 0)
+    assert model.rowCount(list_index) == 0
+    assert model.hasChildren(list_index)
+    assert model.canFetchMore(list_index)
+
+    model.fetchMore(list_index)
+    assert model.rowCount(list_index) == FETCH_BATCH_SIZE
+    model.fetchMore(list_index)
+    model.fetchMore(list_index)
+    assert model.rowCount(list_index) == len(document["list"])
+    assert not model.canFetchMore(list_index)
+    assert model.index(len(document["list"]) - 1, 2, list_index).data() == \
+        document["list"][-1]
+    QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+
+
+def test_lazy_model_saves_pending_children() -> None:
+    """Children which are not created yet are written to the document."""
+    document = {"list": list(range(FETCH_BATCH_SIZE + 5)), "tail": {"nested": [1, 2]}}
+    model = QJsonTreeModel(lazy=True)
+    model.load(document)
+    model.fetchMore(model.index(0, 0))
+    assert model.get_json_from_tree() == document
+
+
+def test_insert_rows_fetches_pending_children() -> None:
+    """Inserting rows into a partly created item creates its remaining children first."""
+    model = QJsonTreeModel(lazy=True)
+    model.load({"list": list(range(FETCH_BATCH_SIZE + 5))})
+    list_index = model.index(0, 0)
+    model.fetchMore(list_index)
+
+    assert model.insertRows(0, 1, list_index)
+    assert model.rowCount(list_index) == FETCH_BATCH_SIZE + 6
+    assert not model.canFetchMore(list_index)
+
+
+def test_eager_model_creates_all_children() -> None:
+    """Model which is not lazy creates the whole tree on load."""
+    model = QJsonTreeModel()
+    model.load({"list": list(range(FETCH_BATCH_SIZE + 5))})
+    assert model.rowCount(model.index(0, 0)) == FETCH_BATCH_SIZE + 5
+    assert not model.canFetchMore(model.index(0, 0))
+    assert not model.canFetchMore(QModelIndex())
+
+
+def test_type_column_names() -> None:
+    """Type column is named from the type tag of the item."""
+    model = QJsonTreeModel()
+    model.load({"a": "text", "b": 1, "c": False, "d": [1]})
+    assert [model.index(row, 1).data() for row in range(4)] == \
+        [TYPE_NAMES[TYPE_STR], TYPE_NAMES[TYPE_INT], TYPE_NAMES[TYPE_BOOL], None]
+
+
+def test_role_values_are_cached() -> None:
+    """Fonts, brushes and icons are created once for items of the same type and depth."""
+    model = QJsonTreeModel()
+    model.load({"key %d" % key: {"list": [key, str(key)]} for key in range(50)})
+    roles = (Qt.BackgroundRole, Qt.FontRole, Qt.DecorationRole)
+
+    def paint() -> None:
+        for row in range(model.rowCount()):
+            parent = model.index(row, 0)
+            for column in range(3):
+                for role in roles:
+                    model.index(row, column).data(role)
+                    model.index(0, column, parent).data(role)
+
+    paint()
+    created = model.reset_role_allocations()
+    assert 0 < created <= 20
+    paint()
+    assert model.reset_role_allocations() == 0
+    first_font = model.index(0, 0).data(Qt.FontRole)
+    assert model.index(1, 0).data(Qt.FontRole) == first_font
+
+    model.clear_role_cache()
+    paint()
+    assert model.reset_role_allocations() == created
+
+
+def test_deep_document_is_loaded_and_saved_without_recursion() -> None:
+    """100k levels of nesting are loaded into the tree and written back."""
+    depth = 100000
+    document = leaf = {}
+    for level in range(depth):
+        leaf["level"] = {"depth": level} if level == depth - 1 else {}
+        leaf = leaf["level"]
+    model = QJsonTreeModel()
+    model.load(document)
+
+    saved = model.get_json_from_tree()
+    for level in range(depth):
+        assert list(saved) == ["level"]
+        saved = saved["level"]
+    assert saved == {"depth": depth - 1}
+
+
+def create_document(keys: range) -> dict:
+    """Return dictionary with scalars, nested dictionaries and lists for keys."""
+    return {"key %02d" % key: key if key % 2 else
+            {"value": key, "list": [key, {"nested": str(key)}]} for key in keys}
+
+
+def test_update_from_document_removes_expanded_items() -> None:
+    """Removed items which are expanded and selected in the view leave no dangling indexes.
+
+    Removed scalars are freed as soon as they leave the tree, so the check is repeated
+    for memory of freed items to be reused.
+    """
+    for _ in range(10):
+        model = QJsonTreeModel()
+        model.load(create_document(range(30)))
+        tester = QAbstractItemModelTester(
+            model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+        proxy_model = QSortFilterProxyModel()
+        proxy_model.setSourceModel(model)
+        view = QTreeView()
+        view.setModel(proxy_model)
+        view.expandAll()
+        view.setCurrentIndex(proxy_model.index(25, 0))
+        view.selectAll()
+
+        document = create_document(range(0, 30, 3))
+        assert model.update_from_document(document) == 20
+        APPLICATION.processEvents()
+
+        assert model.get_json_from_tree() == document
+        assert not view.currentIndex().isValid()
+        assert tester is not None
+
+
+def test_update_from_document_replaces_containers() -> None:
+    """Containers which become scalars and scalars which become containers are replaced."""
+    model = QJsonTreeModel()
+    model.load(create_document(range(5)))
+    tester = QAbstractItemModelTester(
+        model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+    document = create_document(range(5))
+    document["key 01"] = {"value": 1}
+    document["key 02"] = 2
+    document["key 04"]["list"] = "list"
+    model.update_from_document(document)
+
+    assert model.get_json_from_tree() == document
+    assert tester is not None
+
+
+def test_update_from_document_keeps_nan_values() -> None:
+    """NaN values which did not change are not reported as changed."""
+    document = {"nan": float("nan"), "list": [float("nan"), 1.5], "nested": {"nan": float("nan")}}
+    model = QJsonTreeModel()
+    model.load(document)
+    changed = []
+    model.dataChanged.connect(lambda top_left, bottom_right: changed.append(top_left))
+
+    document = {"nan": float("nan"), "list": [float("nan"), 2.5], "nested": {"nan": float("nan")}}
+    assert model.update_from_document(document) == 1
+    assert len(changed) == 1
+    assert model.update_from_document(document) == 0
+
+
+def test_edits_mark_model_modified() -> None:
+    """Editing, inserting and removing rows mark the model modified, loading clears it."""
+    model = QJsonTreeModel()
+    model.is_editable = True
+    model.load({"a": "text", "b": [1, 2]})
+    assert not model.is_modified
+
+    assert model.setData(model.index(0, 2), "edited", Qt.EditRole)
+    assert model.is_modified
+    model.load({"a": "text", "b": [1, 2]})
+    assert not model.is_modified
+
+    assert model.insertRows(0, 1, model.index(1, 0))
+    assert model.is_modified
+    model.is_modified = False
+    assert model.removeRows(0, 1, model.index(1, 0))
+    assert model.is_modified
+
+    model.update_from_document({"a": "text", "b": [1, 2]})
+    assert not model.is_modified
+
+
+def load_json_lines(file_name: str) -> QJsonTreeModel:
+    """Return model of JSON Lines file with lazily created records, as DocumentLoader does."""
+    index = JsonLinesIndex(file_name)
+    index.scan()
+    model = QJsonTreeModel()
+    model.set_root_item(QJsonTreeItem.load_span_to_tree(index.root()), index)
+    return model
+
+
+def test_append_records_keeps_records_pending() -> None:
+    """Appended records of followed file do not create records which are not created yet."""
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".jsonl", delete=False) as opened_file:
+        for row in range(3000):
+            opened_file.write(json.dumps({"row": row}) + "\n")
+    try:
+        model = load_json_lines(opened_file.name)
+        root_item = model.root_item
+        model.fetchMore(QModelIndex())
+        created = root_item.childCount()
+        assert root_item.pending_count() == 3000 - created
+
+        model.append_records([{"row": 3000}, {"row": 3001}])
+        assert root_item.childCount() == created
+        assert root_item.pending_count() == 3002 - created
+        records = [record if isinstance(record, dict) else json.loads(record)
+                   for record in model.get_json_lines_from_tree()]
+        assert records == [{"row": row} for row in range(3002)]
+
+        model.append_records([{"row": 3002}], limit=1000)
+        assert root_item.childCount() + root_item.pending_count() == 1000
+        model.fetch_all(QModelIndex())
+        assert model.get_json_from_tree() == [{"row": row} for row in range(2003, 3003)]
+        model.source_index.close()
+    finally:
+        os.remove(opened_file.name)
+
+
+def test_generation_counts_edits() -> None:
+    """Edits increase the generation and record dirty items, unchanged values do not."""
+    model = QJsonTreeModel()
+    model.is_editable = True
+    model.load({"a": "text", "b": [1, 2]})
+    flips = []
+    model.modified_changed.connect(flips.append)
+    generation = model.generation
+
+    assert model.setData(model.index(0, 2), "text", Qt.EditRole)
+    assert model.generation == generation and not model.is_modified
+
+    assert model.setData(model.index(0, 2), "edited", Qt.EditRole)
+    list_index = model.index(1, 0)
+    assert model.insertRows(2, 1, list_index)
+    assert model.removeRows(0, 1, list_index)
+    assert model.generation == generation + 3
+    assert model.dirty_items == {model.getItem(model.index(0, 0)), model.getItem(list_index)}
+    assert flips == [True]
+
+    model.is_modified = False
+    assert not model.dirty_items
+    assert flips == [True, False]
+
+
+def test_invalid_rows_are_not_edits() -> None:
+    """Rows outside of the parent are rejected before the model is changed."""
+    model = QJsonTreeModel()
+    model.is_editable = True
+    model.load({"a": "text", "b": [1, 2]})
+    tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+    list_index = model.index(1, 0)
+
+    assert not model.insertRows(3, 1, list_index)
+    assert not model.insertRows(-1, 1, list_index)
+    assert not model.insertRows(0, 0, list_index)
+    assert not model.removeRows(1, 2, list_index)
+    assert not model.removeRows(-1, 1, list_index)
+    assert not model.removeRows(0, 0, list_index)
+    assert not model.is_modified
+    assert model.rowCount(list_index) == 2
+    assert model.get_json_from_tree() == {"a": "text", "b": [1, 2]}
+    assert tester is not None
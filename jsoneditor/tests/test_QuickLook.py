@@ -0,0 +1,82 @@
+"""Tests of summarizing heads of files with QuickLook.
+
+Run from the jsoneditor directory:
+
+    python3 -m pytest -q tests
+"""
+import os
+import sys
+import json
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.QuickLook import QuickLook, QUICK_LOOK_MEMBER_LIMIT
+
+
+def write(tmp_path, name: str, text: str) -> str:
+    """Write text to a file and return its name."""
+    file_name = tmp_path / name
+    file_name.write_text(text, encoding="utf-8")
+    return str(file_name)
+
+
+def test_complete_object(tmp_path) -> None:
+    """Small documents are read to the end with exact counts of members and elements."""
+    document = {"list": [1, [2, [3]], {"a": 1}], "text": "значение", "empty": {}}
+    quick_look = QuickLook(write(tmp_path, "example.json", json.dumps(document)))
+    assert quick_look.scan()
+    assert quick_look.root_type == "object"
+    assert quick_look.count == quick_look.estimated_count() == 3
+    assert quick_look.members == [["list", "array", 3, True], ["text", "string", None, True],
+                                  ["empty", "object", 0, True]]
+    assert quick_look.max_depth == 4
+    assert quick_look.nodes == quick_look.estimated_nodes() == 11
+    assert quick_look.bytes_scanned == quick_look.file_size
+    assert quick_look.error is None
+
+    summary = quick_look.summary()
+    assert "Type: object" in summary
+    assert "Elements: 3" in summary
+    assert "    list: array (3)" in summary
+
+
+def test_budget_extrapolates_count(tmp_path) -> None:
+    """Scan stops after max_bytes and the amount of members is extrapolated."""
+    items = [{"row": row, "text": "x" * 50} for row in range(2000)]
+    file_name = write(tmp_path, "example.json", json.dumps(items))
+    quick_look = QuickLook(file_name)
+    assert not quick_look.scan(max_bytes=16 * 1024)
+    assert quick_look.root_type == "array"
+    assert 0 < quick_look.count < len(items)
+    assert abs(quick_look.estimated_count() - len(items)) < len(items) * 0.1
+    assert len(quick_look.members) == QUICK_LOOK_MEMBER_LIMIT
+    assert "Elements: about" in quick_look.summary(max_members=2)
+    assert abs(quick_look.estimated_nodes() - 3 * len(items)) < len(items) * 0.3
+
+
+def test_invalid_and_scalar_documents(tmp_path) -> None:
+    """Invalid JSON is kept as error, scalar documents have their type."""
+    quick_look = QuickLook(write(tmp_path, "broken.json", '{"a": [1, 2,, 3]}'))
+    assert not quick_look.scan()
+    assert quick_look.error is not None
+    assert quick_look.members == [["a", "array", 2, False]]
+    assert "Invalid JSON" in quick_look.summary()
+
+    quick_look = QuickLook(write(tmp_path, "scalar.json", '"text"'))
+    assert quick_look.scan()
+    assert quick_look.root_type == "string" and quick_look.count == 0
+
+
+def test_json_lines(tmp_path) -> None:
+    """JSON Lines files are summarized by records, incomplete last line is not read."""
+    text = "".join(json.dumps({"row": row, "list": [[row]]}) + "\n" for row in range(100))
+    quick_look = QuickLook(write(tmp_path, "records.jsonl", text))
+    assert quick_look.scan()
+    assert quick_look.root_type == "JSON Lines"
+    assert quick_look.count == 100
+    assert quick_look.max_depth == 3
+    assert quick_look.nodes == 500
+    assert quick_look.members[0] == [None, "object", 2, True]
+
+    quick_look = QuickLook(write(tmp_path, "records.jsonl", text + '{"row": '))
+    assert not quick_look.scan(max_bytes=len(text) + 4)
+    assert quick_look.count == 100
@@ -0,0 +1,468 @@
+"""This module writes edits of the tree into its JSON file keeping the layout of the file.
+
+Only byte ranges of edited values are replaced. Members keep the order and whitespace
+of the file, removed members are cut out with their separators, new members are added
+after the last member of their object or at their row in arrays, with the separators
+and indents of their neighbours. If the edits keep the size of the file the changed
+bytes are written in place, otherwise only the tail of the file from the first edit is
+written again. Larger tails and memory-mapped documents, whose mapping must not shrink,
+are written to a new file which replaces the old one, see utils.JsonParsing.replacing_file.
+
+Items are matched to members of the file by the keys and rows they had when the file
+was loaded or saved, see QJsonTreeModel.original_children. If the file does not match
+the tree patch returns False and the file has to be written as a whole.
+
+    Typical usage example:
+    ----------------------
+
+    patcher = model.create_patcher("example.json", file_state("example.json"))
+    ... # Edit the tree
+    if not patcher.patch():
+        model.write_json_to_file("example.json")
+"""
+import io
+import os
+import sys
+from json.encoder import encode_basestring
+from configparser import ConfigParser
+
+sys.path.insert(1, "..")
+from utils.Utils import Utils
+from utils.JsonIndex import JsonIndex, JsonSpan
+from utils.JsonBackends import JSON_BACKEND
+from utils.JsonParsing import replacing_file
+from utils.KeyTranslator import KEY_TRANSLATOR
+from QJsonTreeItem import QJsonTreeItem, TYPE_DICT, TYPE_LIST
+from JsonTreeWriter import JsonTreeWriter, WRITE_BUFFER_SIZE
+
+
+CONFIG_OBJECT = ConfigParser()
+CONFIG_OBJECT.read(Utils().get_abs_file_path("utils/config/config.ini"))
+
+# Largest tail of the file in bytes which is read to memory and written again in place.
+# Files with larger tails are written to a new file
+PATCH_TAIL_MAX_SIZE = 64 * 1024 * 1024
+
+_OPENING = {TYPE_DICT: 123, TYPE_LIST: 91}  # { and [
+_SPACES = b" \t\n\r"
+
+
+def file_state(file_name: str) -> tuple:
+    """Return (size, mtime) of the file, which is patched only if it did not change.
+
+    Raises:
+    -------
+        OSError:
+            File could not be stat'ed
+    """
+    file_stat = os.stat(file_name)
+    return (file_stat.st_size, file_stat.st_mtime_ns)
+
+
+class JsonTreePatcher():
+    """Class for writing edits of the tree to its JSON file as replaced byte ranges.
+
+    Attributes:
+    -----------
+    file_name:
+        File name of JSON file the tree was loaded from or saved to
+    splices:
+        List of (start, end, text) of the last patch sorted by start, the bytes from
+        start to end are replaced by text
+    bytes_written:
+        Amount of bytes written by the last patch
+
+    Methods:
+    --------
+    patch(self, progress=None) -> bool:
+        Writes edits of the tree to the file
+    """
+    def __init__(self, file_name: str, root_item: QJsonTreeItem, dirty_items: set,
+                 new_items: set, original_children: dict, state: tuple,
+                 source_index=None, compact: bool=False) -> None:
+        """Constructs all necessary attributes for the JsonTreePatcher object.
+
+        Args:
+        -----
+            file_name: str
+                File name of JSON file
+            root_item: QJsonTreeItem
+                Root of the tree
+            dirty_items: set
+                Items changed after the file was loaded or saved
+            new_items: set
+                Items inserted after the file was loaded or saved
+            original_children: dict
+                [children by item, next row] of items whose children were inserted,
+                removed or renamed, see QJsonTreeModel.original_children
+            state: tuple
+                file_state of the file when it was loaded or saved
+            source_index: JsonIndex
+                Index of the file if the tree is a memory-mapped document
+            compact: bool
+                Write new values without indents if the layout of the file is unknown
+        """
+        self.file_name = file_name
+        self.splices = []
+        self.bytes_written = 0
+        self._root_item = root_item
+        self._dirty_items = dirty_items
+        self._new_items = new_items
+        self._original_children = original_children
+        self._state = state
+        self._source_index = source_index
+        self._compact = compact
+        self._tree_language = CONFIG_OBJECT.get("Language", "default_tree_language")
+        self._write_language = CONFIG_OBJECT.get("Language", "write_to_json_language")
+        self._index = None
+        self._data = None
+        self._affected = set()
+        self._unit = None
+
+    def patch(self, progress=None) -> bool:
+        """Writes edits of the tree to the file.
+
+        Args:
+        -----
+            progress: callable
+                Called as progress(bytes_written) after every written chunk
+
+        Returns:
+        --------
+            False if the file was changed since it was loaded or saved or it does not
+            match the tree, the file is not changed then
+
+        Raises:
+        -------
+            OSError:
+                An error occured during reading or writing the file
+            TypeError:
+                A value could not be serialized
+        """
+        self.splices = []
+        self.bytes_written = 0
+        try:
+            if file_state(self.file_name) != self._state:
+                return False
+        except OSError:
+            return False
+
+        index = self._source_index
+        owns_index = (index is None or
+                      os.path.realpath(index.file_name) != os.path.realpath(self.file_name))
+        try:
+            if owns_index:
+                index = None
+                index = JsonIndex(self.file_name)
+                index.scan()
+            self._index = index
+            self._data = index.data
+            self._plan()
+        except ValueError:
+            self._index = None
+            self._data = None
+            if owns_index and index is not None:
+                index.close()
+            return False
+
+        try:
+            self._apply(owns_index, progress)
+        finally:
+            self._index = None
+            self._data = None
+            if owns_index:
+                index.close()
+        return True
+
+    def _plan(self) -> None:
+        """Collects splices of all edits, raises ValueError if the file does not match."""
+        affected = self._affected = set()
+        for item in self._dirty_items:
+            while item is not None and item not in affected:
+                affected.add(item)
+                item = item.parent()
+        if not affected:
+            return
+
+        root = self._index.root()
+        self._unit = self._detect_unit(root)
+        self._patch_value(self._root_item, root.start, root.end)
+        self.splices.sort(key=lambda splice: (splice[0], splice[1]))
+
+    def _detect_unit(self, root: JsonSpan):
+        """Return indent of one level of the file, None for files without line breaks."""
+        data = self._data
+        position = root.start + 1
+        while position < root.end - 1 and data[position] in _SPACES:
+            position += 1
+        if position == root.end - 1:
+            return None if self._compact else "  "
+
+        opening = data[root.start + 1:position]
+        if b"\n" not in opening:
+            return None
+        indent = opening.rsplit(b"\n", 1)[1]
+        return indent[len(self._line_indent(root.start)):].decode("ascii")
+
+    def _patch_value(self, item: QJsonTreeItem, start: int, end: int) -> None:
+        """Collects splices of item whose original value is from start to end."""
+        if item not in self._affected:
+            return
+
+        opening = self._data[start]
+        if _OPENING.get(item.type_tag) == opening:
+            self._patch_container(item, JsonSpan(self._index, start, end))
+            return
+        if item.type_tag not in _OPENING and opening not in (123, 91):
+            original = JSON_BACKEND.loads(self._data[start:end])
+            if type(original) is type(item.value) and original == item.value:
+                return
+        self.splices.append((start, end, self._value_text(item, self._line_indent(start))))
+
+    def _patch_container(self, item: QJsonTreeItem, span: JsonSpan) -> None:
+        """Collects splices of children of item, matching them to members of span."""
+        members = span.members()
+        is_dict = item.type_tag == TYPE_DICT
+        entries = self._original_entries(item, is_dict)
+
+        if is_dict:
+            translate = KEY_TRANSLATOR.translate
+            positions = {}
+            # The last one of repeated keys is the value of the tree
+            for position, member in enumerate(members):
+                positions[translate(member[0], self._tree_language)] = position
+            original_count = len(positions)
+        else:
+            original_count = len(members)
+        if (item not in self._original_children and
+                len(entries) != original_count):
+            raise ValueError("File %s does not match the tree" % self.file_name)
+        if is_dict:
+            # Of repeated keys the last one is written, as JsonTreeWriter writes them
+            last = {}
+            for number, (origin, value) in enumerate(entries):
+                key = value.key if isinstance(value, QJsonTreeItem) else origin
+                last[translate(key, self._write_language)] = number
+            if len(last) != len(entries):
+                entries = [entries[number] for number in sorted(last.values())]
+
+        kept = {}
+        output = []
+        for origin, value in entries:
+            if origin is None:
+                output.append(value)
+                continue
+            if is_dict:
+                position = positions.get(origin)
+            else:
+                position = origin if origin < len(members) else None
+            if position is None or position in kept:
+                raise ValueError("File %s does not match the tree" % self.file_name)
+            kept[position] = (origin, value)
+            output.append(position)
+
+        if is_dict:
+            # Members keep the order of the file, new ones are added at the end
+            output = sorted(kept) + [value for value in output if not isinstance(value, int)]
+        else:
+            rows = [entry for entry in output if isinstance(entry, int)]
+            if rows != sorted(rows):
+                raise ValueError("File %s does not match the tree" % self.file_name)
+
+        for position, (origin, value) in kept.items():
+            if not isinstance(value, QJsonTreeItem):
+                continue
+            member = members[position]
+            if is_dict and value.key != origin:
+                self.splices.append((member[1], member[2], self._key_text(value.key)))
+            self._patch_value(value, member[3], member[4])
+
+        if output != list(range(len(members))):
+            self._splice_members(span, members, output, is_dict)
+
+    def _original_entries(self, item: QJsonTreeItem, is_dict: bool) -> list:
+        """Return (origin, value) of children and pending values of item in tree order.
+
+        Origin is the key of the tree or the row the child had in the file, None for
+        inserted children.
+        """
+        record = self._original_children.get(item)
+        original_children = {} if record is None else record[0]
+        row = 0 if record is None else record[1]
+        new_items = self._new_items
+
+        entries = []
+        for child in item._children:
+            if child in new_items:
+                entries.append((None, child))
+            elif child in original_children:
+                entries.append((original_children[child], child))
+            elif is_dict:
+                entries.append((child.key, child))
+            else:
+                entries.append((row, child))
+                row += 1
+
+        translate = KEY_TRANSLATOR.translate
+        for key, raw_value in item.pending_items():
+            if is_dict:
+                entries.append((translate(key, self._tree_language), raw_value))
+            else:
+                entries.append((row, raw_value))
+                row += 1
+        return entries
+
+    def _splice_members(self, span: JsonSpan, members: list, output: list,
+                        is_dict: bool) -> None:
+        """Collects splices of removed and inserted members of span.
+
+        Output is the new list of members: positions of kept members and new items.
+        """
+        data = self._data
+        content_start = span.start + 1
+        content_end = span.end - 1
+        count = len(members)
+        starts = [member[1] if is_dict else member[3] for member in members]
+
+        if count > 0:
+            opening = data[content_start:starts[0]]
+            closing = data[members[-1][4]:content_end]
+            separator = data[members[0][4]:starts[1]] if count > 1 else b"," + opening
+            key_separator = data[members[0][2]:members[0][3]] if is_dict else b""
+        elif self._unit is None:
+            opening = closing = b""
+            separator = b","
+            key_separator = b":"
+        elif self._is_inline(span.end):
+            opening = closing = b""
+            separator = b", "
+            key_separator = b": "
+        else:
+            closing = b"\n" + self._line_indent(span.start)
+            opening = closing + self._unit.encode("ascii")
+            separator = b"," + opening
+            key_separator = b": "
+        # Values of containers written in one line are written in one line too
+        inline = b"\n" not in opening
+        indent = b"" if inline else opening.rsplit(b"\n", 1)[1]
+
+        # Pieces are (start, end) ranges of the file or new text
+        pieces = []
+        if output:
+            pieces.append((content_start, starts[0]) if count > 0 else opening)
+        previous = None
+        for number, entry in enumerate(output):
+            if number > 0:
+                if previous is not None and previous + 1 < count:
+                    pieces.append((members[previous][4], starts[previous + 1]))
+                else:
+                    pieces.append(separator)
+            if isinstance(entry, int):
+                pieces.append((starts[entry], members[entry][4]))
+                previous = entry
+            else:
+                text = self._value_text(entry, indent, inline)
+                if is_dict:
+                    text = self._key_text(entry.key) + key_separator + text
+                pieces.append(text)
+                previous = None
+        if output:
+            pieces.append((members[-1][4], content_end) if count > 0 else closing)
+
+        position = content_start
+        texts = []
+        for piece in pieces:
+            if isinstance(piece, bytes):
+                texts.append(piece)
+                continue
+            start, end = piece
+            if start != position or texts:
+                self.splices.append((position, start, b"".join(texts)))
+                texts = []
+            position = end
+        if position != content_end or texts:
+            self.splices.append((position, content_end, b"".join(texts)))
+
+    def _value_text(self, value, indent: bytes, inline: bool=False) -> bytes:
+        """Return JSON text of value in the layout of the file, indented by indent."""
+        opened_file = io.BytesIO()
+        JsonTreeWriter(opened_file, compact=inline or self._unit is None,
+                       indent=self._unit or "").write(value)
+        text = opened_file.getvalue()
+        if indent:
+            text = text.replace(b"\n", b"\n" + indent)
+        return text
+
+    def _key_text(self, key) -> bytes:
+        """Return JSON text of key of the tree translated to write_to_json_language."""
+        return encode_basestring(
+            KEY_TRANSLATOR.translate(key, self._write_language)).encode("utf-8")
+
+    def _is_inline(self, offset: int) -> bool:
+        """Return True if other values follow byte offset in its line."""
+        data = self._data
+        line_end = data.find(b"\n", offset)
+        if line_end == -1:
+            line_end = self._index.size
+        return data[offset:line_end].strip(b" \t\r,") != b""
+
+    def _line_indent(self, offset: int) -> bytes:
+        """Return spaces and tabs at the start of the line of byte offset."""
+        data = self._data
+        line_start = data.rfind(b"\n", 0, offset) + 1
+        position = line_start
+        while position < offset and data[position] in b" \t":
+            position += 1
+        return data[line_start:position]
+
+    def _apply(self, owns_index: bool, progress) -> None:
+        """Writes the splices to the file in place, by its tail or as a new file."""
+        splices = self.splices
+        if not splices:
+            return
+
+        if all(len(text) == end - start for start, end, text in splices):
+            with open(self.file_name, mode="r+b") as opened_file:
+                for start, _end, text in splices:
+                    opened_file.seek(start)
+                    opened_file.write(text)
+                    self._written(len(text), progress)
+                opened_file.flush()
+                os.fsync(opened_file.fileno())
+            return
+
+        # The mapping of memory-mapped document must not shrink while it is used
+        first = splices[0][0]
+        if owns_index and self._index.size - first <= PATCH_TAIL_MAX_SIZE:
+            tail = b"".join(self._chunks(first))
+            self._index.close()
+            with open(self.file_name, mode="r+b") as opened_file:
+                opened_file.seek(first)
+                opened_file.write(tail)
+                opened_file.truncate()
+                opened_file.flush()
+                os.fsync(opened_file.fileno())
+            self._written(len(tail), progress)
+            return
+
+        with replacing_file(self.file_name) as opened_file:
+            for chunk in self._chunks(0):
+                opened_file.write(chunk)
+                self._written(len(chunk), progress)
+
+    def _chunks(self, start: int):
+        """Yields the patched content of the file from byte start in chunks."""
+        data = self._data
+        position = start
+        for splice_start, splice_end, text in self.splices:
+            for chunk_start in range(position, splice_start, WRITE_BUFFER_SIZE):
+                yield data[chunk_start:min(chunk_start + WRITE_BUFFER_SIZE, splice_start)]
+            yield text
+            position = splice_end
+        for chunk_start in range(position, self._index.size, WRITE_BUFFER_SIZE):
+            yield data[chunk_start:min(chunk_start + WRITE_BUFFER_SIZE, self._index.size)]
+
+    def _written(self, amount: int, progress) -> None:
+        self.bytes_written += amount
+        if progress is not None:
+            progress(self.bytes_written)
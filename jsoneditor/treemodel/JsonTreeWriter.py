@@ -0,0 +1,439 @@
+"""This module writes JSON text of tree items straight to a file.
+
+The tree is walked with an explicit stack and the text is written in chunks of
+WRITE_BUFFER_SIZE characters, so neither the document nor its whole text is built
+in memory. The text is identical to json.dumps(document, indent=2, ensure_ascii=False,
+sort_keys=True) of the document returned by QJsonTreeModel.get_json_from_tree, or to
+its compact form without whitespace. Children which were not created yet in lazy mode
+are written from their values, not parsed containers of memory-mapped document are
+parsed one at a time.
+
+With a FragmentCache the text of every written container is kept by its item, a
+later save writes unchanged containers from the cache and encodes only the edited
+items and their parents, see QJsonTreeModel.fragment_cache.
+
+    Typical usage example:
+    ----------------------
+
+    with open("example.json", mode="wb") as opened_file:
+        JsonTreeWriter(opened_file).write(model.root_item)
+
+    write_tree_to_file("example.json.gz", model.root_item)
+    write_tree_to_file("example.json", model.root_item, cache=model.fragment_cache)
+"""
+import sys
+from json.encoder import encode_basestring
+from itertools import chain
+from configparser import ConfigParser
+
+sys.path.insert(1, "..")
+from utils.Utils import Utils
+from utils.JsonIndex import JsonSpan
+from utils.JsonParsing import replacing_file
+from utils.JsonCompression import compressing_writer
+from utils.KeyTranslator import KEY_TRANSLATOR
+from QJsonTreeItem import QJsonTreeItem, TYPE_DICT, TYPE_LIST
+
+
+CONFIG_OBJECT = ConfigParser()
+CONFIG_OBJECT.read(Utils().get_abs_file_path("utils/config/config.ini"))
+
+# Amount of characters collected before they are encoded and written
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Texts of containers are cached if their length in characters is in these limits.
+# Smaller containers are cached as part of their parents, larger ones by their children
+FRAGMENT_MIN_SIZE = 64
+FRAGMENT_MAX_SIZE = 64 * 1024
+
+_INFINITY = float("inf")
+
+
+def scalar_text(value) -> str:
+    """Return JSON text of a scalar value as json.dumps writes it."""
+    if isinstance(value, str):
+        return encode_basestring(value)
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value == _INFINITY:
+            return "Infinity"
+        if value == -_INFINITY:
+            return "-Infinity"
+        return float.__repr__(value)
+    raise TypeError("Object of type %s is not JSON serializable" % type(value).__name__)
+
+
+def write_tree_to_file(file_name: str, item, compact: bool=False, progress=None,
+                       cache=None) -> None:
+    """Writes JSON text of the item to file_name.
+
+    The file is replaced atomically, see utils.JsonParsing.replacing_file. Files with
+    .gz, .bz2 and .xz extensions are compressed, see utils.JsonCompression.
+
+    Args:
+    -----
+        file_name: str
+            File name of JSON file
+        item: QJsonTreeItem
+            Item whose value is written
+        compact: bool
+            Write the text without indents and spaces
+        progress: callable
+            Called as progress(bytes_written) after every written chunk, bytes of the
+            file on disk are counted for compressed files
+        cache: FragmentCache
+            Cache of texts of unchanged containers, updated if the file was written.
+            Only for items which are always written from the same item
+
+    Raises:
+    -------
+        OSError:
+            An error occured during writing the file
+        TypeError:
+            A value could not be serialized
+    """
+    with replacing_file(file_name) as raw_file:
+        opened_file = compressing_writer(file_name, raw_file)
+        writer = JsonTreeWriter(
+            opened_file, compact=compact, cache=cache,
+            progress=None if progress is None else lambda _bytes: progress(raw_file.tell()))
+        writer.write(item)
+        if opened_file is not raw_file:
+            opened_file.close()
+
+
+class FragmentCache():
+    """Class for JSON text of containers which did not change since they were written.
+
+    Texts are kept by their items, or by values of children which were not created
+    yet. Every text is the value only, its key is written by the parent. Texts include
+    indents of their depth, so they are valid only for the item they were written from
+    and the same format. Cached texts do not overlap: children of a cached container
+    are not kept.
+
+    Attributes:
+    -----------
+    max_size:
+        Maximal amount of cached characters, 0 disables the cache
+    size:
+        Amount of cached characters
+    fragments:
+        Dictionary of (container, depth, text) by id of the container
+    format:
+        Format the texts were written in, a change of the format drops all texts
+
+    Methods:
+    --------
+    invalidate(self, item) -> None:
+        Drops texts of the item and its parents
+    clear(self) -> None:
+        Drops all texts
+    """
+    def __init__(self, max_size: int) -> None:
+        """Constructs all necessary attributes for the FragmentCache object."""
+        self.max_size = max_size
+        self.size = 0
+        self.fragments = {}
+        self.format = None
+
+    def invalidate(self, item) -> None:
+        """Drops texts of the item and its parents, called for every edit of the item."""
+        fragments = self.fragments
+        while item is not None:
+            entry = fragments.pop(id(item), None)
+            if entry is not None:
+                self.size -= len(entry[2])
+            item = item.parent()
+
+    def clear(self) -> None:
+        """Drops all texts, called when the tree is replaced."""
+        self.fragments = {}
+        self.size = 0
+
+
+class JsonTreeWriter():
+    """Class for writing JSON text of tree items to a binary file in chunks.
+
+    Attributes:
+    -----------
+    opened_file:
+        Binary file object the text is written to
+    compact:
+        Write the text without indents and spaces instead of indent of 2 spaces
+    indent:
+        Indent of one level if the text is not compact
+    bytes_written:
+        Amount of bytes written so far
+    cached_characters:
+        Amount of characters written from the cache
+
+    Methods:
+    --------
+    write(self, item) -> None:
+        Writes JSON text of the item and its children
+    """
+    def __init__(self, opened_file, compact: bool=False,
+                 buffer_size: int=WRITE_BUFFER_SIZE, progress=None, cache=None,
+                 indent: str="  ") -> None:
+        """Constructs all necessary attributes for the JsonTreeWriter object.
+
+        Args:
+        -----
+            opened_file:
+                Binary file object the text is written to
+            compact: bool
+                Write the text without indents and spaces
+            buffer_size: int
+                Amount of characters collected before they are written
+            progress: callable
+                Called as progress(bytes_written) after every written chunk
+            cache: FragmentCache
+                Cache of texts of unchanged containers. Default is None
+            indent: str
+                Indent of one level. Default is 2 spaces
+        """
+        self.opened_file = opened_file
+        self.compact = compact
+        self.indent = indent
+        self.bytes_written = 0
+        self.cached_characters = 0
+        self._buffer_size = buffer_size
+        self._progress = progress
+        self._pieces = []
+        self._length = 0
+        self._tree_language = CONFIG_OBJECT.get("Language", "default_tree_language")
+        self._write_language = CONFIG_OBJECT.get("Language", "write_to_json_language")
+        self._cache = cache if cache is not None and cache.max_size > 0 else None
+        self._fragments = {}
+        self._cached_size = 0
+        self._depth = 0
+        # Texts of the innermost open container, None if it is not cached
+        self._capture = None
+        self._capture_length = 0
+        # Ids of containers in _fragments in the order they were written
+        self._kept = []
+
+    def write(self, item) -> None:
+        """Writes JSON text of the item, the root item writes the whole document.
+
+        Keys of dictionaries are translated to write_to_json_language and sorted,
+        of repeated keys the last value is written at the first position, as
+        get_json_from_tree builds them. The cache is replaced by texts of the written
+        containers only if the whole item was written.
+
+        Args:
+        -----
+            item: QJsonTreeItem
+                Item whose value is written
+
+        Raises:
+        -------
+            OSError:
+                An error occured during writing the file
+            TypeError:
+                A value could not be serialized
+        """
+        if self.compact:
+            newline, indent, key_separator = "", "", ":"
+        else:
+            newline, indent, key_separator = "\n", self.indent, ": "
+
+        cache = self._cache
+        if cache is not None:
+            cache_format = (self.compact, indent, self._tree_language, self._write_language)
+            if cache.format != cache_format:
+                cache.clear()
+                cache.format = cache_format
+
+        # Frames are [entries, is_dict, closing bracket, has written entries], with
+        # the cache also [container, capture of the parent and its length, position
+        # of the first child in _kept]
+        stack = []
+        self._depth = 0
+        frame = self._begin(item)
+        if frame is not None:
+            stack.append(frame)
+        while stack:
+            frame = stack[-1]
+            entry = next(frame[0], None)
+            if entry is None:
+                stack.pop()
+                self._depth = len(stack)
+                self._add(newline + indent * len(stack) + frame[2])
+                if cache is not None:
+                    self._close(frame)
+                continue
+
+            prefix = "," + newline if frame[3] else newline
+            frame[3] = True
+            if frame[1]:
+                key, value = entry
+                self._add(prefix + indent * len(stack) + encode_basestring(key) +
+                          key_separator)
+            else:
+                value = entry[0]
+                self._add(prefix + indent * len(stack))
+            self._depth = len(stack)
+            frame = self._begin(value)
+            if frame is not None:
+                stack.append(frame)
+        self._flush()
+        if cache is not None:
+            cache.fragments = self._fragments
+            cache.size = self._cached_size
+
+    def _begin(self, value):
+        """Writes scalar or empty container, else opens it and returns its frame.
+
+        Entries of frames are (key, value) pairs of dictionaries and one-element
+        tuples of list values, so an entry is never None. Values are tree items
+        or values of children which were not created yet.
+        """
+        if isinstance(value, QJsonTreeItem):
+            if value.type_tag == TYPE_DICT:
+                if self._add_cached(value):
+                    return None
+                entries = self._item_entries(value)
+                if entries:
+                    return self._open([iter(sorted(entries.items())), True, "}", False],
+                                      value)
+                self._add("{}")
+            elif value.type_tag == TYPE_LIST:
+                if self._add_cached(value):
+                    return None
+                pending = value.pending_items()
+                if value.childCount() > 0 or pending:
+                    return self._open(
+                        [chain(((child,) for child in value._children),
+                               ((raw_value,) for _key, raw_value in pending)),
+                         False, "]", False], value)
+                self._add("[]")
+            else:
+                self._add(scalar_text(value.value))
+            return None
+
+        # Parsed values of spans are new objects every time, they are not cached
+        container = value
+        if isinstance(value, JsonSpan):
+            value = value.value()
+            container = None
+        if isinstance(value, dict):
+            if value:
+                if self._add_cached(container):
+                    return None
+                translate = KEY_TRANSLATOR.translate
+                entries = {}
+                for key, raw_value in value.items():
+                    entries[translate(translate(key, self._tree_language),
+                                      self._write_language)] = raw_value
+                return self._open([iter(sorted(entries.items())), True, "}", False],
+                                  container)
+            self._add("{}")
+        elif isinstance(value, (list, tuple)):
+            if value:
+                if self._add_cached(container):
+                    return None
+                return self._open(
+                    [((raw_value,) for raw_value in value), False, "]", False], container)
+            self._add("[]")
+        else:
+            self._add(scalar_text(value))
+        return None
+
+    def _add_cached(self, container) -> bool:
+        """Writes cached text of the container and return True if it is cached."""
+        if self._cache is None or container is None:
+            return False
+        entry = self._cache.fragments.get(id(container))
+        if entry is None or entry[0] is not container or entry[1] != self._depth:
+            return False
+        self._add(entry[2])
+        self._keep_fragment(entry, len(self._kept))
+        self.cached_characters += len(entry[2])
+        return True
+
+    def _open(self, frame: list, container) -> list:
+        """Writes opening bracket of the container and return its frame.
+
+        The text of the container is captured for the cache from here on.
+        """
+        if self._cache is not None:
+            frame.extend((container, self._capture, self._capture_length, len(self._kept)))
+            self._capture = []
+            self._capture_length = 0
+        self._add("{" if frame[1] else "[")
+        return frame
+
+    def _close(self, frame: list) -> None:
+        """Caches text of the closed container and adds it to the capture of the parent."""
+        text = None if self._capture is None else "".join(self._capture)
+        self._capture, self._capture_length = frame[5], frame[6]
+        if self._capture is not None:
+            if text is None or self._capture_length + len(text) > FRAGMENT_MAX_SIZE:
+                self._capture = None
+            else:
+                self._capture.append(text)
+                self._capture_length += len(text)
+        if text is not None and frame[4] is not None and len(text) >= FRAGMENT_MIN_SIZE:
+            self._keep_fragment((frame[4], self._depth, text), frame[7])
+
+    def _keep_fragment(self, entry: tuple, first_child: int) -> None:
+        """Keeps text for the next write instead of texts of its children.
+
+        Texts of the children are the ids in _kept from first_child on.
+        """
+        fragments = self._fragments
+        kept = self._kept
+        children_size = sum(len(fragments[key][2]) for key in kept[first_child:])
+        size = self._cached_size - children_size + len(entry[2])
+        if size > self._cache.max_size:
+            return
+        for key in kept[first_child:]:
+            del fragments[key]
+        del kept[first_child:]
+        kept.append(id(entry[0]))
+        fragments[id(entry[0])] = entry
+        self._cached_size = size
+
+    def _item_entries(self, item: QJsonTreeItem) -> dict:
+        """Return children and pending values of dictionary item by translated keys."""
+        translate = KEY_TRANSLATOR.translate
+        entries = {}
+        for child in item._children:
+            entries[translate(child.key, self._write_language)] = child
+        for key, raw_value in item.pending_items():
+            entries[translate(translate(key, self._tree_language),
+                              self._write_language)] = raw_value
+        return entries
+
+    def _add(self, text: str) -> None:
+        """Adds text to the buffer, writes the buffer when it is full."""
+        self._pieces.append(text)
+        self._length += len(text)
+        if self._capture is not None:
+            self._capture.append(text)
+            self._capture_length += len(text)
+            if self._capture_length > FRAGMENT_MAX_SIZE:
+                self._capture = None
+        if self._length >= self._buffer_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Writes the buffer to the file."""
+        if self._pieces:
+            data = "".join(self._pieces).encode("utf-8")
+            self.opened_file.write(data)
+            self.bytes_written += len(data)
+            self._pieces = []
+            self._length = 0
+            if self._progress is not None:
+                self._progress(self.bytes_written)
@@ -3,20 +3,54 @@
     Typical usage example:
     ----------------------
 
-    rootItem = QJsonTreeItem("Key", "Value")
     document = {"Example": "Example value"}
-    rootItem.load_json_to_tree(document)
+    rootItem = QJsonTreeItem.load_json_to_tree(document)
+    rootItem.type_tag == TYPE_DICT
 """
 import sys
+from itertools import repeat
 from configparser import ConfigParser
 
 sys.path.insert(1, "..")
 from utils.JsonParsing import JsonParsing
+from utils.JsonStream import START_OBJECT, START_ARRAY, KEY, VALUE, JsonValueBuilder
+from utils.JsonIndex import JsonSpan
+from utils.KeyTranslator import KEY_TRANSLATOR
 from utils.Utils import Utils
 
 CONFIG_OBJECT = ConfigParser()
 CONFIG_OBJECT.read(Utils().get_abs_file_path("utils/config/config.ini"))
 
+# Integer type tags of tree items
+TYPE_UNKNOWN = 0
+TYPE_DICT = 1
+TYPE_LIST = 2
+TYPE_STR = 3
+TYPE_INT = 4
+TYPE_FLOAT = 5
+TYPE_BOOL = 6
+TYPE_NULL = 7
+
+TYPE_TAGS = {
+    dict: TYPE_DICT,
+    list: TYPE_LIST,
+    tuple: TYPE_LIST,
+    str: TYPE_STR,
+    int: TYPE_INT,
+    float: TYPE_FLOAT,
+    bool: TYPE_BOOL,
+    type(None): TYPE_NULL
+}
+TYPE_CLASSES = (None, dict, list, str, int, float, bool, type(None))
+
+COLUMN_COUNT = 3
+
+# Amount of created items between two calls of load_json_to_tree progress callback
+PROGRESS_INTERVAL = 10000
+
+# Shared children of items without children, replaced by a list on first insertion
+NO_CHILDREN = ()
+
 
 class QJsonTreeItem(object):
     """Class to create basic tree item.
@@ -30,11 +64,13 @@ class QJsonTreeItem(object):
     value:
         QTreeView value
     type:
-        QTreeView type
+        QTreeView type as Python class, stored as type_tag
+    type_tag:
+        QTreeView type as one of TYPE_* integer tags
     children:
         Index items
-    item_data:
-        Data for the tree item
+    offset:
+        Byte offset of the item in memory-mapped file or None, see utils.JsonIndex
 
     Methods:
     --------
@@ -49,7 +85,7 @@ class QJsonTreeItem(object):
     columnCount:
         Return column count
     row:
-        Return index of tree
+        Return index of item in its parent in constant time
     data:
         Return data for specific column
     setData:
@@ -58,16 +94,58 @@ class QJsonTreeItem(object):
         Insert children for specific row and column
     removeChildren:
         Remove children from specific row
+    insert_items:
+        Inserts already created items at specific row
+    reorder_children:
+        Keeps children with given rows in given order
+    has_children:
+        Return True if item has created or pending children
+    can_fetch_more:
+        Return True if some children are not created yet
+    pending_count:
+        Return amount of children which are not created yet
+    pending_items:
+        Return key and value pairs of children which are not created yet
+    set_pending_items:
+        Replaces children which are not created yet
+    append_pending_items:
+        Appends children which are not created yet after the pending ones
+    pending_offsets:
+        Return byte offsets of children which are not created yet
+    drop_pending:
+        Drops first children which are not created yet
+    is_unparsed:
+        Return True if children of memory-mapped container are not parsed yet
+    fetch_children:
+        Creates pending children
+    set_source:
+        Sets container whose children will be created on demand
+    create_child:
+        Creates child item for given key and value
     load_json_to_tree:
         Prepare data for loading it to tree
+    load_events_to_tree:
+        Builds tree from events of streaming JSON parser
+    load_span_to_tree:
+        Creates root item of memory-mapped document
+    final_order:
+        Return final order of top-level children built by load_events_to_tree
     """
-    def __init__(self, data, parent=None) -> None:
+    __slots__ = (
+        "_parent", "_key", "_value", "_type_tag", "_children",
+        "_row", "_renumber_from", "_source", "_source_position", "_offset")
+
+    def __init__(self, parent=None) -> None:
         self._parent = parent
         self._key = ""
         self._value = ""
-        self._type = None
-        self._children = list()
-        self.item_data = data
+        self._type_tag = TYPE_UNKNOWN
+        self._children = NO_CHILDREN
+        self._row = 0
+        self._renumber_from = None
+        self._source = None
+        self._source_position = 0
+        self._offset = None
 
     @property
     def key(self):
@@ -87,14 +165,28 @@ class QJsonTreeItem(object):
 
     @property
     def type(self):
-        return self._type
+        return TYPE_CLASSES[self._type_tag]
 
     @type.setter
     def type(self, typ):
-        self._type = typ
+        self._type_tag = TYPE_TAGS.get(typ, TYPE_UNKNOWN)
+
+    @property
+    def offset(self):
+        return self._offset
+
+    @property
+    def type_tag(self):
+        return self._type_tag
+
+    @type_tag.setter
+    def type_tag(self, type_tag):
+        self._type_tag = type_tag
 
     def appendChild(self, item) -> None:
-        self._children.append(item)
+        children = self._children_list()
+        item._row = len(children)
+        children.append(item)
 
     def child(self, row) -> None:
         return self._children[row]
@@ -105,35 +197,55 @@ class QJsonTreeItem(object):
     def childCount(self) -> None:
         return len(self._children)
 
-    def columnCount(self) -> None:
-        return len(self.item_data)
+    def columnCount(self) -> int:
+        return COLUMN_COUNT
+
+    def row(self) -> int:
+        parent = self._parent
+        if parent is None:
+            return 0
+        if parent._renumber_from is not None:
+            parent._renumber_children()
+        return self._row
 
-    def row(self) -> None:
-        return (
-            self._parent._children.index(self) if self._parent
-            else 0
-        )
+    def _renumber_children(self) -> None:
+        """Fixes stored rows of children after insertChildren or removeChildren.
+
+        Rows are fixed once for all shifted children on the first row() call
+        after any amount of insertions or removals.
+        """
+        children = self._children
+        for row in range(self._renumber_from, len(children)):
+            children[row]._row = row
+        self._renumber_from = None
+
+    def _children_list(self) -> list:
+        if self._children is NO_CHILDREN:
+            self._children = []
+        return self._children
+
+    def _mark_renumber(self, position: int) -> None:
+        if self._renumber_from is None or position < self._renumber_from:
+            self._renumber_from = position
 
     def data(self, column) -> None:
-        if column is 0:
-            return self.key
-        elif column is 2:
-            return self.value
+        if column == 0:
+            return self._key
+        elif column == 2:
+            return self._value
 
     def setData(self, column, value) -> None:
-        if column is 0:
-            self.key = value
-        if column is 2:
-            self.value = value
+        if column == 0:
+            self._key = value
+        if column == 2:
+            self._value = value
 
-    def insertChildren(self, position, rows, columns) -> bool:
+    def insertChildren(self, position, rows, columns=COLUMN_COUNT) -> bool:
         if position < 0 or position > len(self._children):
             return False
 
-        for row in range(rows):
-            data = [None for v in range(columns)]
-            item = QJsonTreeItem(data, self)
-            self._children.insert(position, item)
+        self._children_list()[position:position] = [QJsonTreeItem(self) for row in range(rows)]
+        self._mark_renumber(position)
 
         return True
 
@@ -141,23 +253,186 @@ class QJsonTreeItem(object):
         if position < 0 or position + rows > len(self._children):
             return False
 
-        for row in range(rows):
-            self._children.pop(position)
+        del self._children_list()[position:position + rows]
+        self._mark_renumber(position)
 
         return True
 
-    @classmethod
-    def load_json_to_tree(cls, value, parent=None, sort: bool=True):
-        """Loads JSON to tree.
+    def insert_items(self, position: int, items: list) -> bool:
+        """Inserts already created items with this item as their parent at position."""
+        if position < 0 or position > len(self._children):
+            return False
+
+        self._children_list()[position:position] = items
+        self._mark_renumber(position)
+
+        return True
+
+    def reorder_children(self, order: list) -> None:
+        """Keeps only children with given rows, in the order of the list."""
+        children = self._children
+        self._children = [children[row] for row in order]
+        self._mark_renumber(0)
+
+    def has_children(self) -> bool:
+        """Return True if the item has loaded or not yet loaded children."""
+        if len(self._children) > 0:
+            return True
+        if isinstance(self._source, JsonSpan):
+            return not self._source.is_empty()
+        return self.pending_count() > 0
+
+    def can_fetch_more(self) -> bool:
+        """Return True if some children of the item are not created yet."""
+        return self.pending_count() > 0
+
+    def pending_count(self) -> int:
+        """Return amount of children which are not created yet."""
+        if self._source is None:
+            return 0
+        if isinstance(self._source, JsonSpan):
+            self._source = self._source.items()
+        return len(self._source) - self._source_position
+
+    def pending_items(self, count: int=None) -> list:
+        """Return (key, value) pairs of the children which are not created yet.
+
+        Keys are returned as they are in the document, without translation.
+
+        Args:
+        -----
+            count: int
+                Amount of the next pairs to return. None to return all of them
+
+        Raises:
+        -------
+            ValueError:
+                A record of JSON Lines document among the pairs is not valid JSON
+        """
+        if self.pending_count() == 0:
+            return []
+        if count is None:
+            return self._source[self._source_position:]
+        return self._source[self._source_position:self._source_position + count]
+
+    def set_pending_items(self, pairs: list) -> None:
+        """Replaces children which are not created yet with (key, value) pairs.
+
+        Keys are raw keys of the document, None for lists.
+        """
+        self._source = pairs if pairs else None
+        self._source_position = 0
+
+    def append_pending_items(self, pairs: list) -> None:
+        """Appends (key, value) pairs after the children which are not created yet.
+
+        Offsets of appended children are not known, see pending_offsets.
+        """
+        if self.pending_count() == 0:
+            self.set_pending_items(list(pairs))
+        else:
+            self._source.extend(pairs)
+
+    def pending_offsets(self) -> list:
+        """Return byte offsets of children which are not created yet.
+
+        Offsets are known only for children of memory-mapped document, for other
+        items empty list is returned. Children appended by append_pending_items have
+        no offsets, they are after the returned ones.
+        """
+        if self.pending_count() == 0:
+            return []
+        offsets = getattr(self._source, "offsets", None)
+        if not offsets:
+            return []
+        return offsets[self._source_position:]
+
+    def drop_pending(self, count: int) -> None:
+        """Drops first count children which are not created yet."""
+        pending = self.pending_count()
+        if count >= pending:
+            self.set_pending_items([])
+        elif count > 0:
+            self._source_position += count
+
+    def is_unparsed(self) -> bool:
+        """Return True if the item is a container of memory-mapped document not parsed yet."""
+        return isinstance(self._source, JsonSpan)
+
+    def fetch_children(self, count: int=None, sort: bool=True) -> int:
+        """Creates next count children from the pending source.
+
+        Children containers are created lazily too, so only one level is built.
+
+        Args:
+        -----
+            count: int
+                Amount of children to create. None to create all of them
+            sort: bool
+                Sort or not dictionary keys of created children
+
+        Returns:
+        --------
+            Amount of created children
+        """
+        pending = self.pending_count()
+        if pending == 0:
+            return 0
+        if count is None or count > pending:
+            count = pending
+
+        start = self._source_position
+        for key, value in self._source[start:start + count]:
+            self.appendChild(self.create_child(key, value, self, lazy=True, sort=sort))
+
+        offsets = getattr(self._source, "offsets", None)
+        if offsets is not None:
+            children = self._children
+            first = len(children) - count
+            for position in range(min(count, len(offsets) - start)):
+                children[first + position]._offset = offsets[start + position]
+
+        self._source_position = start + count
+        if self._source_position >= len(self._source):
+            self._source = None
+            self._source_position = 0
+        return count
+
+    def set_source(self, value, sort: bool=True) -> None:
+        """Sets dict or list value as pending source of not yet created children.
+
+        Children of JsonSpan are parsed only when they are counted or created.
+
+        Args:
+        -----
+            value: dict, list or JsonSpan
+                Container which children will be created on demand
+            sort: bool
+                Sort or not dictionary keys
+        """
+        if isinstance(value, JsonSpan):
+            value.sort = sort
+            self._source = value
+        elif isinstance(value, dict):
+            self._source = sorted(value.items()) if sort else list(value.items())
+        else:
+            self._source = [(None, child) for child in value]
+        self._source_position = 0
 
-        Recursion function to prepare data for further loading to QTreeView
+    @classmethod
+    def create_child(cls, key, value, parent, lazy: bool=False, sort: bool=True):
+        """Creates child item for given key and value.
 
         Args:
         -----
+            key: str or None
+                Key of the value in parent dictionary. None if parent is list
             value: Any
                 Value to load
             parent: QJsonTreeItem
                 Parent item
+            lazy: bool
+                Do not create children of the value until they are fetched
             sort: bool
                 Sort or not
 
@@ -165,31 +440,297 @@ class QJsonTreeItem(object):
         --------
             QJsonTreeItem
         """
-        root_item = QJsonTreeItem(parent=parent, data=value)
-        root_item.key = "root"
-
-        if isinstance(value, dict):
-            items = (
-                sorted(value.items())
-                if sort else value.items()
-            )
-
-            root_item.type = type(value)
-            for key, value in items:
-                child = cls.load_json_to_tree(value, root_item)
-                child.key = JsonParsing().translate(
+        if isinstance(value, JsonSpan):
+            child = QJsonTreeItem(parent=parent)
+            child.set_source(value, sort)
+            child._type_tag = TYPE_DICT if value.is_dict() else TYPE_LIST
+            if parent._type_tag == TYPE_LIST:
+                child._key = JsonParsing.get_name_from_dict(value.labels())
+            else:
+                child._key = KEY_TRANSLATOR.translate(
                     key, CONFIG_OBJECT.get("Language", "default_tree_language"))
-                child.type = type(value)
-                root_item.appendChild(child)
-        elif isinstance(value, list):
-            root_item.type = type(value)
-            for index, value in enumerate(value):
-                child = cls.load_json_to_tree(value, root_item)
-                child.key = JsonParsing().get_name_from_dict(value)
-                child.type = type(value)
-                root_item.appendChild(child)
+            return child
+
+        if lazy and isinstance(value, (dict, list)):
+            child = QJsonTreeItem(parent=parent)
+            child.set_source(value, sort)
         else:
-            root_item.value = value
-            root_item.type = type(value)
+            child = cls.load_json_to_tree(value, parent, sort)
+
+        if parent._type_tag == TYPE_LIST:
+            child._key = JsonParsing.get_name_from_dict(value)
+        else:
+            child._key = KEY_TRANSLATOR.translate(
+                key, CONFIG_OBJECT.get("Language", "default_tree_language"))
+        child._type_tag = TYPE_TAGS.get(type(value), TYPE_UNKNOWN)
+        return child
+
+    @classmethod
+    def load_span_to_tree(cls, span: JsonSpan, sort: bool=True):
+        """Creates root item of memory-mapped document.
+
+        Nothing is parsed, children are created from the byte range of span
+        when they are fetched.
+
+        Args:
+        -----
+            span: JsonSpan
+                Top-level container of the document, see JsonIndex.root
+            sort: bool
+                Sort or not
+
+        Returns:
+        --------
+            QJsonTreeItem
+        """
+        root_item = QJsonTreeItem()
+        root_item._key = "root"
+        root_item._type_tag = TYPE_DICT if span.is_dict() else TYPE_LIST
+        root_item._offset = span.start
+        root_item.set_source(span, sort)
+        return root_item
+
+    @classmethod
+    def load_json_to_tree(cls, value, parent=None, sort: bool=True, lazy: bool=False,
+                          progress=None):
+        """Loads JSON to tree.
+
+        Builds items with an explicit stack instead of recursion, so the nesting depth
+        of value is not limited by the Python recursion limit.
+
+        Args:
+        -----
+            value: Any
+                Value to load
+            parent: QJsonTreeItem
+                Parent item
+            sort: bool
+                Sort or not
+            lazy: bool
+                Create only first level of children, deeper levels are created
+                on demand by fetch_children
+            progress: callable
+                Called as progress(nodes) after every PROGRESS_INTERVAL created items.
+                If it returns False building is canceled
+
+        Returns:
+        --------
+            QJsonTreeItem or None if building was canceled
+        """
+        root_item = QJsonTreeItem(parent=parent)
+        root_item._key = "root"
+        root_item._type_tag = TYPE_TAGS.get(type(value), TYPE_UNKNOWN)
+
+        if not isinstance(value, (dict, list)):
+            root_item._value = value
+            return root_item
+
+        if lazy:
+            root_item.set_source(value, sort)
+            return root_item
+
+        tree_language = CONFIG_OBJECT.get("Language", "default_tree_language")
+        translate = KEY_TRANSLATOR.translate
+        get_name_from_dict = JsonParsing.get_name_from_dict
+        type_tags = TYPE_TAGS
+
+        # Parallel stacks: item being filled and iterator over its (key, value) pairs
+        items = [root_item]
+        iterators = [cls._iterate_source(value, sort)]
+        nodes = 0
+        next_progress = PROGRESS_INTERVAL if progress is not None else -1
+        while items:
+            item = items[-1]
+            is_list = item._type_tag == TYPE_LIST
+            for key, child_value in iterators[-1]:
+                child = QJsonTreeItem(item)
+                if is_list:
+                    child._key = get_name_from_dict(child_value)
+                else:
+                    child._key = translate(key, tree_language)
+                child._type_tag = type_tags.get(type(child_value), TYPE_UNKNOWN)
+                item.appendChild(child)
+
+                nodes += 1
+                if nodes == next_progress:
+                    if progress(nodes) is False:
+                        return None
+                    next_progress += PROGRESS_INTERVAL
+
+                if isinstance(child_value, (dict, list)):
+                    items.append(child)
+                    iterators.append(cls._iterate_source(child_value, sort))
+                    break
+                child._value = child_value
+            else:
+                items.pop()
+                iterators.pop()
+
+        return root_item
+
+    @classmethod
+    def load_events_to_tree(cls, events, sort: bool=True, progress=None,
+                            top_level_item=None):
+        """Loads JSON to tree directly from parser events.
+
+        Items are created from events of utils.JsonStream.JsonEventParser, so the Python
+        object graph of the document is never built. The result is the same as
+        load_json_to_tree(json.load(...)): a repeated key keeps the position of the
+        first occurrence and the value of the last one.
+
+        Args:
+        -----
+            events: iterable
+                (event, value, start, end) tuples of JsonEventParser.events()
+            sort: bool
+                Sort or not
+            progress: callable
+                Called as progress(nodes) after every PROGRESS_INTERVAL created items.
+                If it returns False building is canceled
+            top_level_item: callable
+                Called as top_level_item(item, key) for every completed child of the
+                root, where key is the raw key from the document (None in lists).
+                Such children are not appended to the root, see final_order
+
+        Returns:
+        --------
+            QJsonTreeItem or None if building was canceled
+        """
+        tree_language = CONFIG_OBJECT.get("Language", "default_tree_language")
+        translate = KEY_TRANSLATOR.translate
+        get_name_from_dict = JsonParsing.get_name_from_dict
+        type_tags = TYPE_TAGS
+
+        # Open containers as [item, {raw key: child} for dict or None for list,
+        # {"name": ..., "group": ...} for dict inside of list or None, raw key]
+        frames = []
+        root_item = None
+        key = None
+        nodes = 0
+        next_progress = PROGRESS_INTERVAL if progress is not None else -1
+
+        # Containers of "name" or "group" keys, recorded as [events, depth, labels, key]
+        # and turned into Python values for the labels, could be nested
+        captures = []
+
+        for event, value, _start, _end in events:
+            if captures:
+                for capture in captures:
+                    capture[0].append((event, value))
+                if event == START_OBJECT or event == START_ARRAY:
+                    for capture in captures:
+                        capture[1] += 1
+                elif event != KEY and event != VALUE:
+                    for capture in captures:
+                        capture[1] -= 1
+                    if captures[-1][1] == 0:
+                        captured, _depth, labels, label_key = captures.pop()
+                        labels[label_key] = cls._value_from_events(captured)
+
+            if event == KEY:
+                key = value
+                continue
+
+            if event != VALUE and event != START_OBJECT and event != START_ARRAY:
+                item, children, labels, raw_key = frames.pop()
+                if children:
+                    pairs = sorted(children.items()) if sort else children.items()
+                    for _raw_key, child in pairs:
+                        item.appendChild(child)
+                if labels is not None:
+                    item._key = get_name_from_dict(labels)
+                if frames:
+                    cls._attach_streamed(frames[-1], item, raw_key, top_level_item)
+                continue
+
+            raw_key = None
+            if not frames:
+                item = QJsonTreeItem()
+                item._key = "root"
+                root_item = item
+            else:
+                frame = frames[-1]
+                item = QJsonTreeItem(frame[0])
+                if frame[1] is None:
+                    item._key = None
+                else:
+                    raw_key = key
+                    item._key = translate(key, tree_language)
+                    labels = frame[2]
+                    if labels is not None and (key == "name" or key == "group"):
+                        if event == VALUE:
+                            labels[key] = value
+                        else:
+                            captures.append([[(event, value)], 1, labels, key])
+
+                nodes += 1
+                if nodes == next_progress:
+                    if progress(nodes) is False:
+                        return None
+                    next_progress += PROGRESS_INTERVAL
+
+            if event == VALUE:
+                item._type_tag = type_tags.get(type(value), TYPE_UNKNOWN)
+                item._value = value
+                if frames:
+                    cls._attach_streamed(frames[-1], item, raw_key, top_level_item)
+            elif event == START_OBJECT:
+                item._type_tag = TYPE_DICT
+                in_list = bool(frames) and frames[-1][1] is None
+                frames.append([item, {}, {} if in_list else None, raw_key])
+            else:
+                item._type_tag = TYPE_LIST
+                frames.append([item, None, None, raw_key])
 
         return root_item
+
+    @classmethod
+    def _attach_streamed(cls, frame: list, item, raw_key, top_level_item) -> None:
+        """Adds completed item to its parent frame of load_events_to_tree."""
+        if top_level_item is not None and frame[0]._parent is None:
+            top_level_item(item, raw_key)
+        elif frame[1] is None:
+            frame[0].appendChild(item)
+        else:
+            frame[1][raw_key] = item
+
+    @classmethod
+    def _value_from_events(cls, events: list):
+        """Return Python value of (event, value) pairs of one container."""
+        builder = JsonValueBuilder()
+        for event, value in events:
+            builder.feed(event, value)
+        return builder.value
+
+    @classmethod
+    def final_order(cls, keys: list, sort: bool=True) -> list:
+        """Return order of top-level children streamed by load_events_to_tree.
+
+        Args:
+        -----
+            keys: list
+                Raw keys passed to top_level_item, in the order of the calls
+            sort: bool
+                Sort or not
+
+        Returns:
+        --------
+            Indexes of the streamed children in their final order. Children of
+            repeated keys except the last one are not in the list
+        """
+        if not keys or keys[0] is None:
+            return list(range(len(keys)))
+
+        latest = {}
+        for position, key in enumerate(keys):
+            latest[key] = position
+        if sort:
+            return [latest[key] for key in sorted(latest)]
+        return list(latest.values())
+
+    @classmethod
+    def _iterate_source(cls, value, sort: bool=True):
+        """Return iterator over (key, value) pairs of dict or (None, value) pairs of list."""
+        if isinstance(value, dict):
+            return iter(sorted(value.items()) if sort else value.items())
+        return zip(repeat(None), value)
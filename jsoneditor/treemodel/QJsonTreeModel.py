@@ -12,16 +12,26 @@ Due to this QJsonTreeModel inherited from QAbstractItemModel with some overriden
 """
 import sys
 import gettext
+from bisect import bisect_right
 from configparser import ConfigParser
 
-from PyQt5.QtCore import QAbstractItemModel, QModelIndex, Qt
+from PyQt5.QtCore import QAbstractItemModel, QModelIndex, Qt, pyqtSignal
 from PyQt5.QtGui import QIcon, QBrush, QColor, QFont, QPixmap
 
 sys.path.insert(1, "..")
 from utils.Utils import Utils
+from utils.KeyTranslator import KEY_TRANSLATOR
+from utils.JsonIndex import JsonIndex, JsonSpan
+from utils.JsonLines import JsonLinesIndex
+from utils.JsonBackends import JSON_BACKEND
 from utils.JsonParsing import JsonParsing
 sys.path.insert(1, Utils().get_abs_file_path("treemodel"))
-from QJsonTreeItem import QJsonTreeItem
+from QJsonTreeItem import (
+    QJsonTreeItem, TYPE_TAGS, TYPE_UNKNOWN, TYPE_DICT, TYPE_LIST, TYPE_STR, TYPE_INT,
+    TYPE_BOOL
+)
+from JsonTreeWriter import FragmentCache, write_tree_to_file
+from JsonTreePatcher import JsonTreePatcher
 
 
 CONFIG_OBJECT = ConfigParser()
@@ -33,6 +43,27 @@ TRANSLATE_QJSONTREEMODEL = gettext.translation(
     languages=[CONFIG_OBJECT.get("Language", "default_gui_language")])
 TRANSLATE_QJSONTREEMODEL.install()
 
+TYPE_NAMES = {
+    TYPE_STR: TRANSLATE_QJSONTREEMODEL.gettext("str"),
+    TYPE_INT: TRANSLATE_QJSONTREEMODEL.gettext("int"),
+    TYPE_BOOL: TRANSLATE_QJSONTREEMODEL.gettext("bool")
+}
+
+# Kinds of frames of generate_json_from_free
+_FRAME_ITEMS = 0
+_FRAME_PAIRS = 1
+_FRAME_VALUES = 2
+
+# Amount of children created by one fetchMore call in lazy mode
+FETCH_BATCH_SIZE = 1000
+
+# Amount of matching records of JSON Lines document parsed by one search
+SEARCH_RECORD_LIMIT = 10000
+
+# Roles of setData which change the document
+_EDIT_ROLES = (Qt.EditRole, Qt.DecorationRole, Qt.ToolTipRole, Qt.StatusTipRole,
+               Qt.WhatsThisRole, Qt.SizeHintRole)
+
 class QJsonTreeModel(QAbstractItemModel):
     """Class to create basic tree item.
 
@@ -44,6 +75,33 @@ class QJsonTreeModel(QAbstractItemModel):
         QTreeView headers
     is_editable:
         Is QTreeView model editable
+    role_allocations:
+        Amount of fonts, brushes and icons created for the role cache
+    lazy:
+        Create children of items only when they are expanded
+    is_plain:
+        Do not return fonts and icons of items, for large documents
+    source_index:
+        JsonIndex of memory-mapped document of the tree or None,
+        JsonLinesIndex for JSON Lines documents
+    is_modified:
+        True if the tree was edited after it was loaded or saved
+    generation:
+        Amount of edits of the tree since the model was created
+    dirty_items:
+        Items changed after the tree was loaded or saved
+    new_items:
+        Items inserted after the tree was loaded or saved
+    original_children:
+        Keys or rows which children had when the tree was loaded or saved, for items
+        whose children were inserted, removed or renamed since then
+    modified_changed:
+        Signal with is_modified, emitted when it changes
+    is_frozen:
+        Items are not edited, inserted, removed or fetched, while the tree is saved
+    fragment_cache:
+        JSON text of containers of the last save, edits drop texts of edited items and
+        their parents, so the next save encodes only them
 
     Methods:
     --------
@@ -51,8 +109,30 @@ class QJsonTreeModel(QAbstractItemModel):
         Clear model by loading an empty dict to it
     load:
         Loads input document to QTreeView
+    set_root_item:
+        Replaces the tree with already built one
+    append_streamed_items:
+        Appends top-level items of a document which is still being read
+    finish_streaming:
+        Sorts top-level items of a streamed document
+    update_from_document:
+        Patches the tree to a newly parsed document keeping unchanged items
+    source_position:
+        Return line and column of an item in memory-mapped file
+    index_from_source_position:
+        Return index of the item at line and column of memory-mapped file
+    fetch_matching_records:
+        Creates items of records of JSON Lines document which match search pattern
+    get_json_lines_from_tree:
+        Return records of JSON Lines document, unchanged ones as their original text
+    append_records:
+        Appends records to the end of followed JSON Lines document
     data:
         Return data for specific input index
+    clear_role_cache:
+        Clear cached fonts, brushes and icons after theme change
+    reset_role_allocations:
+        Return and reset amount of created role values
     getItem:
         Return item for specific input index
     setData:
@@ -65,6 +145,14 @@ class QJsonTreeModel(QAbstractItemModel):
         Return parent for specific index
     rowCount:
         Return amount of rows for specific parent
+    hasChildren:
+        Return True if parent has children, even not created yet
+    canFetchMore:
+        Return True if parent has children which are not created yet
+    fetchMore:
+        Creates next batch of children for parent
+    fetch_all:
+        Creates all not yet created children for parent
     columnCount:
         Return amount of columns
     flags:
@@ -77,25 +165,45 @@ class QJsonTreeModel(QAbstractItemModel):
         Return JSON from tree
     generate_json_from_free:
         Generate JSON from tree
+    write_json_to_file:
+        Writes JSON of the tree or its item straight to file
+    create_patcher:
+        Return JsonTreePatcher writing edits of the tree to its file
     """
-    def __init__(self, parent=None) -> None:
+    modified_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, lazy: bool=False) -> None:
         """Constructs all necessary attributes for the QJsonTreeModel object.
 
         Args:
         -----
             parent:
                 Parent of the model. Default is None
+            lazy: bool
+                Create children of items only when they are expanded. Default is False
         """
         super(QJsonTreeModel, self).__init__(parent)
-        self._root_item = QJsonTreeItem(
-            [TRANSLATE_QJSONTREEMODEL.gettext("Key"),
-             TRANSLATE_QJSONTREEMODEL.gettext("Type"),
-             TRANSLATE_QJSONTREEMODEL.gettext("Value")])
+        self._root_item = QJsonTreeItem()
         self._headers = (
             TRANSLATE_QJSONTREEMODEL.gettext("Key"),
             TRANSLATE_QJSONTREEMODEL.gettext("Type"),
             TRANSLATE_QJSONTREEMODEL.gettext("Value"))
         self._is_editable = False
+        self._lazy = lazy
+        self._is_plain = False
+        self._source_index = None
+        self._generation = 0
+        self._saved_generation = 0
+        self._dirty_items = set()
+        self._new_items = set()
+        self._original_children = {}
+        self.fragment_cache = FragmentCache(
+            int(float(CONFIG_OBJECT.get("Other", "save_cache_mb", fallback="256")) * 1024 * 1024))
+        self._is_frozen = False
+        self._patch_persistent = None
+        self._patch_removed = []
+        self._role_cache = {}
+        self.role_allocations = 0
 
     @property
     def is_editable(self):
@@ -104,8 +212,137 @@ class QJsonTreeModel(QAbstractItemModel):
 
     @is_editable.setter
     def is_editable(self, is_editable):
+        if is_editable != self._is_editable:
+            self._role_cache.clear()
         self._is_editable = is_editable
 
+    @property
+    def root_item(self):
+        """Get current _root_item property."""
+        return self._root_item
+
+    @property
+    def lazy(self):
+        """Get or set current _lazy property. Applied on the next load."""
+        return self._lazy
+
+    @lazy.setter
+    def lazy(self, lazy):
+        self._lazy = lazy
+
+    @property
+    def is_plain(self):
+        """Get or set current _is_plain property."""
+        return self._is_plain
+
+    @is_plain.setter
+    def is_plain(self, is_plain):
+        if is_plain != self._is_plain:
+            self._is_plain = is_plain
+            if self.rowCount() > 0:
+                self.dataChanged.emit(
+                    self.index(0, 0),
+                    self.index(self.rowCount() - 1, self.columnCount() - 1),
+                    [Qt.FontRole, Qt.DecorationRole])
+
+    @property
+    def is_modified(self):
+        """Get or set whether the tree has edits which are not saved.
+
+        Set by setData, insertRows and removeRows, cleared when a document is loaded.
+        Answered from the generation without comparing the tree to the file.
+        """
+        return self._generation != self._saved_generation
+
+    @is_modified.setter
+    def is_modified(self, is_modified):
+        if is_modified:
+            self._mark_modified(self._root_item)
+            return
+        was_modified = self.is_modified
+        self._saved_generation = self._generation
+        self._dirty_items = set()
+        self._new_items = set()
+        self._original_children = {}
+        if was_modified:
+            self.modified_changed.emit(False)
+
+    @property
+    def generation(self):
+        """Get amount of edits of the tree, increased by every edit."""
+        return self._generation
+
+    @property
+    def dirty_items(self):
+        """Get items changed after the tree was loaded or saved.
+
+        Edited items and parents of inserted or removed rows are kept, the set must
+        not be changed by callers.
+        """
+        return self._dirty_items
+
+    @property
+    def new_items(self):
+        """Get items inserted by insertRows after the tree was loaded or saved."""
+        return self._new_items
+
+    @property
+    def original_children(self):
+        """Get [original keys or rows by child, next row] of items by item.
+
+        Kept for items whose children were inserted, removed or renamed after the tree
+        was loaded or saved, before the first such edit. Keys are kept for children of
+        dictionaries, rows in the file for children of lists. Children which are not
+        in it and not in new_items still have their original keys, rows of such
+        children of lists follow the next row in their order.
+        """
+        return self._original_children
+
+    def _keep_original_children(self, item: QJsonTreeItem) -> None:
+        """Remembers keys or rows of children of item before they are changed."""
+        record = self._original_children.get(item)
+        if record is None:
+            record = self._original_children[item] = [{}, 0]
+        original_children = record[0]
+        new_items = self._new_items
+        is_dict = item.type_tag == TYPE_DICT
+        for child in item._children:
+            if child in original_children or child in new_items:
+                continue
+            if is_dict:
+                original_children[child] = child.key
+            else:
+                original_children[child] = record[1]
+                record[1] += 1
+
+    def _mark_modified(self, item: QJsonTreeItem) -> None:
+        """Counts an edit of the item."""
+        was_modified = self.is_modified
+        self._generation += 1
+        self._dirty_items.add(item)
+        self.fragment_cache.invalidate(item)
+        if not was_modified:
+            self.modified_changed.emit(True)
+
+    @property
+    def is_frozen(self):
+        """Get or set current _is_frozen property.
+
+        Frozen tree keeps its items as they are, so it could be written by a worker
+        thread: setData, insertRows and removeRows fail, children are not fetched
+        and items are not editable.
+        """
+        return self._is_frozen
+
+    @is_frozen.setter
+    def is_frozen(self, is_frozen):
+        self._is_frozen = is_frozen
+
+    @property
+    def source_index(self):
+        """Get current _source_index property, set by set_root_item."""
+        return self._source_index
+
     def clear(self) -> None:
         """Clear model.
 
@@ -133,19 +370,500 @@ class QJsonTreeModel(QAbstractItemModel):
                                              (type(document)))
         )
 
+        root_item = QJsonTreeItem.load_json_to_tree(document, lazy=self._lazy)
+        root_item.type = type(document)
+        self.set_root_item(root_item)
+        return True
+
+    def set_root_item(self, root_item: QJsonTreeItem, source_index=None) -> None:
+        """Replaces the whole tree of the model with one reset.
+
+        Used to swap in a tree which was built outside of the model,
+        for example by DocumentLoader in a worker thread.
+
+        Args:
+        -----
+            root_item: QJsonTreeItem
+                Root of the new tree
+            source_index: JsonIndex
+                Index of memory-mapped document if root_item was created by
+                QJsonTreeItem.load_span_to_tree. Its children are always created lazily
+        """
         self.beginResetModel()
 
-        self._root_item = QJsonTreeItem.load_json_to_tree(document)
-        self._root_item.type = type(document)
+        self._root_item = root_item
+        self._source_index = source_index
+        self.is_modified = False
+        self.fragment_cache.clear()
+        if self._lazy or source_index is not None:
+            if self._can_fetch(self._root_item, FETCH_BATCH_SIZE):
+                self._root_item.fetch_children(FETCH_BATCH_SIZE)
 
         self.endResetModel()
-        return True
+
+    def append_streamed_items(self, root_item: QJsonTreeItem, items: list) -> None:
+        """Appends top-level items of a document which is still being streamed.
+
+        The first call for a new root_item replaces the tree with it.
+
+        Args:
+        -----
+            root_item: QJsonTreeItem
+                Root of the streamed tree, parent of items
+            items: list
+                Completed top-level QJsonTreeItem objects
+        """
+        if root_item is not self._root_item:
+            self.set_root_item(root_item)
+        if not items:
+            return
+
+        self.fragment_cache.invalidate(root_item)
+        count = root_item.childCount()
+        self.beginInsertRows(QModelIndex(), count, count + len(items) - 1)
+        for item in items:
+            root_item.appendChild(item)
+        self.endInsertRows()
+
+    def finish_streaming(self, root_item: QJsonTreeItem, order: list) -> None:
+        """Puts top-level items of streamed document in their final order.
+
+        Top-level items are appended in the order of the file, at the end they are
+        sorted and repeated keys are dropped, see QJsonTreeItem.final_order.
+
+        Args:
+        -----
+            root_item: QJsonTreeItem
+                Root of the streamed tree
+            order: list
+                Indexes of streamed top-level items in their final order
+        """
+        if root_item is not self._root_item:
+            self.set_root_item(root_item)
+
+        if order == list(range(root_item.childCount())):
+            return
+        self.fragment_cache.invalidate(root_item)
+
+        if len(order) != root_item.childCount():
+            self.beginResetModel()
+            root_item.reorder_children(order)
+            self.endResetModel()
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        root_item.reorder_children(order)
+        old_indexes = [
+            index for index in self.persistentIndexList()
+            if index.internalPointer().parent() is root_item]
+        self.changePersistentIndexList(old_indexes, [
+            self.createIndex(index.internalPointer().row(), index.column(),
+                             index.internalPointer())
+            for index in old_indexes])
+        self.layoutChanged.emit()
+
+    def update_from_document(self, document) -> int:
+        """Patches the tree to document instead of replacing it.
+
+        Items are matched by key in dictionaries and by row in lists. Unchanged items
+        are kept with their expansion and selection, changed values emit dataChanged.
+        Added and removed rows of all levels are applied as one layout change: every
+        beginInsertRows or beginRemoveRows walks all persistent indexes of the view,
+        which is as slow as rebuilding an expanded tree.
+        Children which were not created yet in lazy mode are replaced without signals,
+        new keys of such items are created after the already created children.
+        The whole model is reset if type of the root changes or the tree is a
+        memory-mapped document.
+
+        Args:
+        -----
+            document: dict or list
+                Newly parsed JSON document
+
+        Returns:
+        --------
+            Amount of inserted, removed and changed items
+        """
+        if (self._source_index is not None or
+                TYPE_TAGS.get(type(document)) != self._root_item.type_tag):
+            self.load(document)
+            return self._root_item.childCount()
+
+        translate = KEY_TRANSLATOR.translate
+        tree_language = CONFIG_OBJECT.get("Language", "default_tree_language")
+        type_tags = TYPE_TAGS
+        same_value = self._same_value
+
+        self._patch_persistent = None
+        self._patch_removed = []
+        changes = 0
+        stack = [(self._root_item, document)]
+        while stack:
+            item, value = stack.pop()
+            has_pending = item.pending_count() > 0
+
+            if item.type_tag == TYPE_DICT:
+                pairs = [(translate(key, tree_language), key, child_value)
+                         for key, child_value in sorted(value.items())]
+                positions = {tree_key: position for position, (tree_key, _key, _value)
+                             in enumerate(pairs)}
+                seen = set()
+                removed = []
+                for row, child in enumerate(item._children):
+                    if child.key not in positions or child.key in seen:
+                        removed.append(row)
+                    seen.add(child.key)
+                changes += self._remove_children(item, removed)
+                existing = {child.key: child for child in item._children}
+            else:
+                pairs = [(None, None, child_value) for child_value in value]
+                changes += self._remove_children(
+                    item, list(range(len(pairs), item.childCount())))
+                existing = None
+
+            position = 0
+            inserted = []
+            pending = []
+            for row, (tree_key, key, child_value) in enumerate(pairs):
+                if existing is None:
+                    child = item.child(row) if row < item.childCount() else None
+                else:
+                    child = existing.get(tree_key)
+
+                if child is None:
+                    if has_pending:
+                        pending.append((key, child_value))
+                    else:
+                        inserted.append(QJsonTreeItem.create_child(
+                            key, child_value, item, lazy=self._lazy))
+                    continue
+
+                if inserted:
+                    changes += self._insert_children(item, position, inserted)
+                    inserted = []
+                position = child.row() + 1
+                # Unchanged scalars of dictionaries are the most of the items
+                if (existing is not None and same_value(child._value, child_value) and
+                        child._type_tag == type_tags.get(type(child_value))):
+                    continue
+                changes += self._update_child(child, key, child_value, stack)
+            changes += self._insert_children(item, position, inserted)
+            if has_pending or pending:
+                item.set_pending_items(pending)
+
+        if self._patch_persistent is not None:
+            self._end_patch_layout()
+        self._patch_persistent = None
+        self._patch_removed = []
+        self.is_modified = False
+        self.fragment_cache.clear()
+        return changes
+
+    def _begin_patch_layout(self) -> None:
+        """Starts layout change of update_from_document before the first added or removed row."""
+        if self._patch_persistent is None:
+            self.layoutAboutToBeChanged.emit()
+            self._patch_persistent = self.persistentIndexList()
+
+    def _end_patch_layout(self) -> None:
+        """Moves persistent indexes to new rows of their items and finishes layout change.
+
+        Indexes of removed items and of their descendants become invalid.
+        """
+        # Removed items are kept in _patch_removed until layoutChanged, persistent
+        # indexes still point at them
+        removed = {id(item) for item in self._patch_removed}
+        root_item = self._root_item
+        new_indexes = []
+        for index in self._patch_persistent:
+            item = index.internalPointer()
+            ancestor = item
+            while ancestor is not root_item and ancestor is not None:
+                if id(ancestor) in removed:
+                    ancestor = None
+                    break
+                ancestor = ancestor.parent()
+            if ancestor is None:
+                new_indexes.append(QModelIndex())
+            else:
+                new_indexes.append(self.createIndex(item.row(), index.column(), item))
+        self.changePersistentIndexList(self._patch_persistent, new_indexes)
+        self.layoutChanged.emit()
+
+    def _remove_children(self, item: QJsonTreeItem, rows: list) -> int:
+        """Removes children with given ascending rows as a part of the patch layout change."""
+        if not rows:
+            return 0
+        self._begin_patch_layout()
+        children = item._children
+        for row in reversed(rows):
+            self._patch_removed.append(children[row])
+            item.removeChildren(row, 1)
+        return len(rows)
+
+    def _insert_children(self, item: QJsonTreeItem, position: int, items: list) -> int:
+        """Inserts created items at position as a part of the patch layout change."""
+        if not items:
+            return 0
+        self._begin_patch_layout()
+        item.insert_items(position, items)
+        return len(items)
+
+    def _update_child(self, child: QJsonTreeItem, key, value, stack: list) -> int:
+        """Updates child to value or pushes it to stack of update_from_document.
+
+        Children which change between a container and a scalar are replaced,
+        key is the raw key of the child in the document.
+        """
+        type_tag = TYPE_TAGS.get(type(value), TYPE_UNKNOWN)
+        is_container = type_tag == TYPE_DICT or type_tag == TYPE_LIST
+        row = child.row()
+
+        if child.type_tag != type_tag and (
+                is_container or child.type_tag == TYPE_DICT or child.type_tag == TYPE_LIST):
+            item = child.parent()
+            self._remove_children(item, [row])
+            self._insert_children(item, row, [QJsonTreeItem.create_child(
+                key, value, item, lazy=self._lazy)])
+            return 1
+
+        changed = False
+        if child.parent().type_tag == TYPE_LIST:
+            key = JsonParsing.get_name_from_dict(value)
+            if key != child.key:
+                child.key = key
+                changed = True
+        if is_container:
+            stack.append((child, value))
+        elif child.type_tag != type_tag or not self._same_value(child.value, value):
+            child.type_tag = type_tag
+            child.value = value
+            changed = True
+
+        if not changed:
+            return 0
+        # Layout change repaints all items anyway
+        if self._patch_persistent is None:
+            self.dataChanged.emit(
+                self.createIndex(row, 0, child), self.createIndex(row, 2, child))
+        return 1
 
     @classmethod
-    def data(cls, index: QModelIndex, role: Qt.ItemDataRole) -> str:
+    def _same_value(cls, old, new) -> bool:
+        """Return True if scalar value of an item is unchanged, NaN is equal to NaN."""
+        return (old is new or old == new or
+                (type(old) is float and type(new) is float and old != old and new != new))
+
+    def source_position(self, index: QModelIndex) -> tuple:
+        """Return position of the item in memory-mapped file.
+
+        Args:
+        -----
+            index: QModelIndex
+                Index of the item
+
+        Returns:
+        --------
+            (line, column) of the key of the item, or of its value in lists, starting
+            from 1. None if the document is not memory-mapped or the item was added
+            after loading
+        """
+        item = self.getItem(index)
+        if self._source_index is None or item.offset is None:
+            return None
+        return self._source_index.line_column(item.offset)
+
+    def index_from_source_position(self, line: int, column: int=1) -> QModelIndex:
+        """Return index of the innermost item at line and column of memory-mapped file.
+
+        Children of the items on the way are created if they were not created yet.
+
+        Args:
+        -----
+            line: int
+                Line starting from 1
+            column: int
+                Column starting from 1
+
+        Returns:
+        --------
+            Index of the item or invalid index if the document is not memory-mapped
+
+        Raises:
+        -------
+            ValueError:
+                There is no such line in the file
+        """
+        if self._source_index is None:
+            return QModelIndex()
+
+        offset = self._source_index.offset(line, column)
+        parent = QModelIndex()
+        while True:
+            self.fetch_all(parent)
+            parent_item = self.getItem(parent)
+            found = None
+            for child in parent_item._children:
+                if child.offset is not None and child.offset <= offset and (
+                        found is None or child.offset > found.offset):
+                    found = child
+            if found is None:
+                return parent
+
+            found_index = self.createIndex(found.row(), 0, found)
+            if found.type_tag != TYPE_DICT and found.type_tag != TYPE_LIST:
+                return found_index
+            start, end = self._source_index.next_container(found.offset)
+            if offset <= start or offset >= end:
+                return found_index
+            parent = found_index
+
+    def fetch_matching_records(self, pattern, limit: int=SEARCH_RECORD_LIMIT) -> int:
+        """Creates all items of records of JSON Lines document which match pattern.
+
+        Records are searched in the raw text of the file, only the matching ones
+        are parsed, so they could be found by the filter of the view.
+
+        Args:
+        -----
+            pattern: re.Pattern
+                Compiled bytes regular expression
+            limit: int
+                Maximal amount of records to parse
+
+        Returns:
+        --------
+            Amount of matching records, could be greater than limit
+
+        Raises:
+        -------
+            ValueError:
+                A matching record is not valid JSON or the file was changed
+        """
+        if not isinstance(self._source_index, JsonLinesIndex):
+            return 0
+
+        offsets = self._source_index.find(pattern)
+        found = len(offsets)
+        offsets = offsets[:limit]
+        if not offsets:
+            return found
+
+        root_item = self._root_item
+        pending_offsets = root_item.pending_offsets()
+        if pending_offsets:
+            self._fetch(QModelIndex(), bisect_right(pending_offsets, offsets[-1]))
+
+        offsets = set(offsets)
+        for child in root_item._children:
+            if child.offset not in offsets:
+                continue
+            stack = [child]
+            while stack:
+                item = stack.pop()
+                if item.can_fetch_more():
+                    self.fetch_all(self.createIndex(item.row(), 0, item))
+                stack.extend(item_child for item_child in item._children
+                             if item_child.type_tag == TYPE_DICT or
+                             item_child.type_tag == TYPE_LIST)
+        return found
+
+    def get_json_lines_from_tree(self):
+        """Return records of JSON Lines document for JsonParsing.write_json_lines_to_file.
+
+        Records which were not parsed or whose value did not change are returned as
+        their original text of the file, so only changed records are serialized again.
+
+        Returns:
+        --------
+            Generator of bytes of unchanged records and values of changed records
+
+        Raises:
+        -------
+            ValueError:
+                The document is not JSON Lines or the file was changed
+        """
+        source_index = self._source_index
+        if not isinstance(source_index, JsonLinesIndex):
+            raise ValueError("Document is not JSON Lines")
+
+        root_item = self._root_item
+        for child in list(root_item._children):
+            if child.offset is None:
+                yield self.generate_json_from_free(child)
+                continue
+
+            original = source_index.record(child.offset)
+            if child.is_unparsed():
+                yield original
+                continue
+            value = self.generate_json_from_free(child)
+            if (JSON_BACKEND.dumps(value, indent=None) ==
+                    JSON_BACKEND.dumps(JSON_BACKEND.loads(original), indent=None)):
+                yield original
+            else:
+                yield value
+
+        pending_offsets = root_item.pending_offsets()
+        for offset in pending_offsets:
+            yield source_index.record(offset)
+        # Records appended by append_records which were not created yet
+        for _key, value in root_item.pending_items()[len(pending_offsets):]:
+            yield value
+
+    def append_records(self, records: list, limit: int=0) -> None:
+        """Appends records to the end of the top-level list of followed document.
+
+        With a limit the oldest records are removed, so at most limit records are
+        kept in the tree. Records which were not created yet are dropped without
+        creating them. If some records were not created yet, appended records are
+        kept after them and created when they are fetched, otherwise rows are inserted.
+        Appended records are not marked as modification of the tree.
+
+        Args:
+        -----
+            records: list
+                Parsed records
+            limit: int
+                Maximal amount of top-level records. 0 for no limit
+        """
+        root_item = self._root_item
+        if root_item.type_tag != TYPE_LIST:
+            return
+
+        self.fragment_cache.invalidate(root_item)
+        root_index = QModelIndex()
+        if limit > 0:
+            records = records[-limit:]
+            excess = (root_item.childCount() + root_item.pending_count() +
+                      len(records) - limit)
+            created = min(excess, root_item.childCount())
+            if created > 0:
+                self.beginRemoveRows(root_index, 0, created - 1)
+                root_item.removeChildren(0, created)
+                self.endRemoveRows()
+            if excess > created:
+                root_item.drop_pending(excess - created)
+
+        if not records:
+            return
+        if root_item.pending_count() > 0:
+            root_item.append_pending_items([(None, record) for record in records])
+            return
+
+        items = [QJsonTreeItem.create_child(None, record, root_item, lazy=True)
+                 for record in records]
+        position = root_item.childCount()
+        self.beginInsertRows(root_index, position, position + len(items) - 1)
+        root_item.insert_items(position, items)
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: Qt.ItemDataRole) -> str:
         """Return data for specific index.
 
         Returns the data stored under the given role for the item referred to by the index.
+        Fonts, brushes and icons depend only on type, column and depth of the item,
+        so they are taken from the role cache instead of being created for every cell.
 
         Args:
         -----
@@ -162,24 +880,18 @@ class QJsonTreeModel(QAbstractItemModel):
             return None
 
         item = index.internalPointer()
+        column = index.column()
 
         if role == Qt.DisplayRole or role == Qt.EditRole:
-            if index.column() == 0:
-                return item.data(index.column())
-            if index.column() == 1:
-                if str(item.type) == "<class 'str'>":
-                    return TRANSLATE_QJSONTREEMODEL.gettext("str")
-                elif str(item.type) == "<class 'int'>":
-                    return TRANSLATE_QJSONTREEMODEL.gettext("int")
-                elif str(item.type) == "<class 'bool'>":
-                    return TRANSLATE_QJSONTREEMODEL.gettext("bool")
-                else:
-                    return
-            if index.column() == 2:
+            if column == 0:
+                return item.key
+            if column == 1:
+                return TYPE_NAMES.get(item.type_tag)
+            if column == 2:
                 return item.value
 
-        if role == Qt.CheckStateRole and item.type is bool:
-            if index.column() == 2:
+        if role == Qt.CheckStateRole and item.type_tag == TYPE_BOOL:
+            if column == 2:
                 return Qt.Checked if item.value is True else Qt.Unchecked
 
         # if role == Qt.ForegroundRole:
@@ -193,68 +905,122 @@ class QJsonTreeModel(QAbstractItemModel):
         # only one choose:
         # or Qt.ForegroundRole or in MainWindow in self.tree_view.setStyleSheet -> item
         if role == Qt.BackgroundRole:
-            if item.data(index.parent().column()) is None:
-                if item.type is dict:
-                    return QBrush(QColor(
-                        CONFIG_OBJECT.get("QTreeView-color", "color_dict")))
-                if item.type is list:
-                    return QBrush(QColor(
-                        CONFIG_OBJECT.get("QTreeView-color", "color_list")))
-                else:
-                    return QBrush(QColor(
-                        CONFIG_OBJECT.get("QTreeView-color", "color_else")))
+            if self._is_top_level(item):
+                return self._cached_role(role, item.type_tag, 0, True)
+
+        if self._is_plain and (role == Qt.FontRole or role == Qt.DecorationRole):
+            return None
+
+        if role == Qt.FontRole:
+            type_tag = item.type_tag
+            if column != 0 or (type_tag != TYPE_DICT and type_tag != TYPE_LIST):
+                type_tag = TYPE_UNKNOWN
+            return self._cached_role(role, type_tag, column, self._is_top_level(item))
+
+        if role == Qt.DecorationRole:
+            if column == 0:
+                type_tag = item.type_tag
+                if type_tag == TYPE_DICT or type_tag == TYPE_LIST:
+                    return self._cached_role(role, type_tag, column, False)
+                # if item.type is int:
+                #     return QIcon(QPixmap("utils/images/treeview/int.png"))
+                # if item.type is str and item.key != "file":
+                #     return QIcon(QPixmap("utils/images/treeview/str.png"))
+                # if item.type is bool:
+                #     return QIcon(QPixmap("utils/images/treeview/bool.png"))
+                if item.key == "file":
+                    return self._cached_role(role, TYPE_UNKNOWN, column, False)
+            elif column == 1 or column == 2:
+                pass
+
+        if role == Qt.TextAlignmentRole:
+            if column == 1:
+                return Qt.AlignCenter
+        return None
+
+    def _is_top_level(self, item: QJsonTreeItem) -> bool:
+        """Return True if item is painted as a root item of QTreeView.
+
+        Items of lists whose key is None are painted as root items too.
+        """
+        return item.parent() is self._root_item or item.key is None
+
+    def _cached_role(self, role: Qt.ItemDataRole, type_tag: int, column: int, top_level: bool):
+        """Return cached value of role for given type tag, column and depth."""
+        key = (role, type_tag, column, top_level)
+        try:
+            return self._role_cache[key]
+        except KeyError:
+            value = self._create_role(role, type_tag, column, top_level)
+            self._role_cache[key] = value
+            self.role_allocations += 1
+            return value
+
+    @classmethod
+    def _create_role(cls, role: Qt.ItemDataRole, type_tag: int, column: int, top_level: bool):
+        """Creates QBrush, QFont or QIcon for given role, type tag, column and depth."""
+        if role == Qt.BackgroundRole:
+            if type_tag == TYPE_DICT:
+                return QBrush(QColor(CONFIG_OBJECT.get("QTreeView-color", "color_dict")))
+            if type_tag == TYPE_LIST:
+                return QBrush(QColor(CONFIG_OBJECT.get("QTreeView-color", "color_list")))
+            return QBrush(QColor(CONFIG_OBJECT.get("QTreeView-color", "color_else")))
 
         if role == Qt.FontRole:
             font = QFont()
             font.setFamily("Segoe UI")
-            if item.data(index.parent().column()) is None:
-                if index.column() == 0:
+            if top_level:
+                if column == 0:
                     font.setPointSize(14)
-                elif index.column() == 1:
+                elif column == 1:
                     font.setPointSize(10)
-                elif index.column() == 2:
+                elif column == 2:
                     font.setItalic(True)
                     font.setPointSize(12)
             else:
-                if index.column() == 0:
-                    if item.type is dict or item.type is list:
+                if column == 0:
+                    if type_tag == TYPE_DICT or type_tag == TYPE_LIST:
                         font.setBold(True)
                     else:
                         font.setBold(False)
                     font.setPointSize(10)
-                elif index.column() == 1:
+                elif column == 1:
                     font.setPointSize(10)
-                elif index.column() == 2:
+                elif column == 2:
                     font.setBold(False)
                     font.setItalic(True)
                     font.setPointSize(10)
             return font
 
         if role == Qt.DecorationRole:
-            if index.column() == 0:
-                if item.type is dict:
-                    return QIcon(
-                        QPixmap(Utils().get_abs_file_path("utils/images/treeview/object.png")))
-                if item.type is list:
-                    return QIcon(
-                        QPixmap(Utils().get_abs_file_path("utils/images/treeview/array.png")))
-                # if item.type is int:
-                #     return QIcon(QPixmap("utils/images/treeview/int.png"))
-                # if item.type is str and item.key != "file":
-                #     return QIcon(QPixmap("utils/images/treeview/str.png"))
-                # if item.type is bool:
-                #     return QIcon(QPixmap("utils/images/treeview/bool.png"))
-                if item.key == "file":
-                    return QIcon(
-                        QPixmap(Utils().get_abs_file_path("utils/images/treeview/file.png")))
-            elif index.column() == 1 or index.column() == 2:
-                pass
-
-        if role == Qt.TextAlignmentRole:
-            if index.column() == 1:
-                return Qt.AlignCenter
+            if type_tag == TYPE_DICT:
+                image = "utils/images/treeview/object.png"
+            elif type_tag == TYPE_LIST:
+                image = "utils/images/treeview/array.png"
+            else:
+                image = "utils/images/treeview/file.png"
+            return QIcon(QPixmap(Utils().get_abs_file_path(image)))
         return None
 
+    def clear_role_cache(self) -> None:
+        """Clear cached fonts, brushes and icons.
+
+        Colors are read again from config.ini, so changed theme is applied on next paint.
+        """
+        CONFIG_OBJECT.read(Utils().get_abs_file_path("utils/config/config.ini"))
+        self._role_cache.clear()
+        if self.rowCount() > 0:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(self.rowCount() - 1, self.columnCount() - 1),
+                [Qt.BackgroundRole, Qt.FontRole, Qt.DecorationRole])
+
+    def reset_role_allocations(self) -> int:
+        """Return amount of created role values since the previous call and reset it."""
+        role_allocations = self.role_allocations
+        self.role_allocations = 0
+        return role_allocations
+
     def getItem(self, index: QModelIndex) -> QJsonTreeItem:
         """Return item for specific index.
 
@@ -304,11 +1070,23 @@ class QJsonTreeModel(QAbstractItemModel):
         --------
             True if data was successfully setted, False if not
         """
+        if self._is_frozen:
+            return False
         if role == Qt.EditRole:
             item = index.internalPointer()
+            # Editing a cell without changing it is not an edit of the document
+            old_value = item.data(index.column())
+            if type(old_value) is type(value) and old_value == value:
+                return True
+            if index.column() == 0:
+                self._keep_original_children(item.parent())
+            self._mark_modified(item)
             item.setData(index.column(), value)
             self.dataChanged.emit(index, index, [Qt.EditRole])
             return True
+        if role in _EDIT_ROLES:
+            self._keep_original_children(index.internalPointer().parent())
+            self._mark_modified(index.internalPointer())
         if role == Qt.DecorationRole:
             item = index.internalPointer()
             if self.getItem(index).parent().type is list:
@@ -472,6 +1250,101 @@ class QJsonTreeModel(QAbstractItemModel):
 
         return parent_item.childCount()
 
+    def hasChildren(self, parent: QModelIndex=QModelIndex()) -> bool:
+        """Return True if parent has any children.
+
+        Answers from the pending source of the item, so children are not created.
+
+        Args:
+        -----
+            parent: QModelIndex
+                Parent to check
+
+        Returns:
+        --------
+            True if parent has created or not yet created children
+        """
+        if parent.column() > 0:
+            return False
+
+        try:
+            return self.getItem(parent).has_children()
+        except ValueError as exception:
+            print("Could not read children of the item: %s" % exception)
+            return False
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        """Return True if parent has children which are not created yet.
+
+        Args:
+        -----
+            parent: QModelIndex
+                Parent to check
+
+        Returns:
+        --------
+            True if fetchMore would add rows to parent
+        """
+        if parent.column() > 0 or self._is_frozen:
+            return False
+
+        try:
+            return self.getItem(parent).can_fetch_more()
+        except ValueError as exception:
+            print("Could not read children of the item: %s" % exception)
+            return False
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        """Creates next FETCH_BATCH_SIZE children for parent.
+
+        Args:
+        -----
+            parent: QModelIndex
+                Parent to create children for
+        """
+        self._fetch(parent, FETCH_BATCH_SIZE)
+
+    def fetch_all(self, parent: QModelIndex) -> None:
+        """Creates all not yet created children for parent.
+
+        Args:
+        -----
+            parent: QModelIndex
+                Parent to create children for
+        """
+        self._fetch(parent, None)
+
+    def _fetch(self, parent: QModelIndex, count: int) -> None:
+        if self._is_frozen:
+            return
+        parent_item = self.getItem(parent)
+        pending = parent_item.pending_count()
+        if pending == 0:
+            return
+        if count is None or count > pending:
+            count = pending
+
+        if not self._can_fetch(parent_item, count):
+            return
+
+        position = parent_item.childCount()
+        self.beginInsertRows(parent, position, position + count - 1)
+        parent_item.fetch_children(count)
+        self.endInsertRows()
+
+    def _can_fetch(self, parent_item: QJsonTreeItem, count: int) -> bool:
+        # Records of JSON Lines documents are parsed when they are fetched, invalid
+        # ones must be found before rows are inserted
+        if parent_item is not self._root_item or not isinstance(
+                self._source_index, JsonLinesIndex):
+            return True
+        try:
+            parent_item.pending_items(count)
+            return True
+        except ValueError as exception:
+            print("Could not read children of the item: %s" % exception)
+            return False
+
     def columnCount(self, parent: QModelIndex=QModelIndex()) -> int:
         """Return amount of column.
 
@@ -499,13 +1372,15 @@ class QJsonTreeModel(QAbstractItemModel):
             Qt.ItemFlags
         """
         flags = super(QJsonTreeModel, self).flags(index)
-        if self.is_editable:
-            if index.column() == 0 or index.column() == 2:
-                if self.getItem(index).type == dict or self.getItem(index).type == list:
-                    if index.column() == 1 or index.column() == 2:
+        if self.is_editable and not self._is_frozen:
+            column = index.column()
+            if column == 0 or column == 2:
+                item = self.getItem(index)
+                if item.type_tag == TYPE_DICT or item.type_tag == TYPE_LIST:
+                    if column == 1 or column == 2:
                         return flags
-                if self.getItem(index).parent().type is list:
-                    if index.column() == 0:
+                if item.parent().type_tag == TYPE_LIST:
+                    if column == 0:
                         return flags
                 return Qt.ItemIsEditable | flags
             else:
@@ -537,11 +1412,17 @@ class QJsonTreeModel(QAbstractItemModel):
             Returns True if the rows were successfully inserted, otherwise returns False.
         """
         parent_item = self.getItem(parent)
+        if self._is_frozen or rows <= 0 or not 0 <= position <= parent_item.childCount():
+            return False
+        self.fetch_all(parent)
+        self._keep_original_children(parent_item)
 
         self.beginInsertRows(parent, position, position + rows - 1)
-        success = parent_item.insertChildren(position, rows, self._root_item.columnCount())
+        success = parent_item.insertChildren(position, rows)
         self.endInsertRows()
-
+        if success:
+            self._new_items.update(parent_item._children[position:position + rows])
+            self._mark_modified(parent_item)
         return success
 
     def removeRows(self, position: int, rows: int, parent: QModelIndex) -> bool:
@@ -565,11 +1446,17 @@ class QJsonTreeModel(QAbstractItemModel):
             Returns True if the rows were successfully removed, otherwise returns False.
         """
         parent_item = self.getItem(parent)
+        if (self._is_frozen or rows <= 0 or position < 0 or
+                position + rows > parent_item.childCount()):
+            return False
+        self._keep_original_children(parent_item)
 
         self.beginRemoveRows(parent, position, position + rows - 1)
         success = parent_item.removeChildren(position, rows)
         self.endRemoveRows()
 
+        if success:
+            self._mark_modified(parent_item)
         return success
 
     def get_json_from_tree(self, root: QJsonTreeItem=None) -> dict:
@@ -588,7 +1475,12 @@ class QJsonTreeModel(QAbstractItemModel):
         return self.generate_json_from_free(root)
 
     def generate_json_from_free(self, item) -> dict:
-        """Recursive function to generate JSON from tree.
+        """Generates JSON from tree.
+
+        Walks the tree with an explicit stack instead of recursion, so the nesting depth
+        of the tree is not limited by the Python recursion limit. Values of children
+        which were not created yet in lazy mode are copied with translated keys,
+        not parsed containers of memory-mapped document are parsed first.
 
         Args:
         -----
@@ -599,27 +1491,158 @@ class QJsonTreeModel(QAbstractItemModel):
         --------
             Generated JSON from tree to dictionary
         """
-
         if item is None:
-            item = self._rootItem
-
-        amount_of_child = item.childCount()
-
-        if item.type is dict:
-            document = {}
-            for i in range(amount_of_child):
-                child = item.child(i)
-                document[
-                    JsonParsing().translate(
-                        child.key,
-                        CONFIG_OBJECT.get("Language", "write_to_json_language"))] = \
-                    self.generate_json_from_free(child)
-            return document
-        elif item.type == list:
-            document = []
-            for i in range(amount_of_child):
-                child = item.child(i)
-                document.append(self.generate_json_from_free(child))
-            return document
-        else:
+            item = self._root_item
+
+        if item.type_tag != TYPE_DICT and item.type_tag != TYPE_LIST:
             return item.value
+
+        translate = KEY_TRANSLATOR.translate
+        tree_language = CONFIG_OBJECT.get("Language", "default_tree_language")
+        write_language = CONFIG_OBJECT.get("Language", "write_to_json_language")
+
+        document = {} if item.type_tag == TYPE_DICT else []
+
+        # Parallel stacks. A frame walks children of a tree item (_FRAME_ITEMS), then
+        # (key, value) pairs of its pending or raw source (_FRAME_PAIRS) or values of
+        # a raw list (_FRAME_VALUES), filling documents[-1].
+        sources = [item]
+        kinds = [_FRAME_ITEMS]
+        positions = [0]
+        documents = [document]
+        while sources:
+            source = sources[-1]
+            kind = kinds[-1]
+            position = positions[-1]
+            target = documents[-1]
+            is_dict = isinstance(target, dict)
+
+            if kind == _FRAME_ITEMS:
+                children = source._children
+                if position == len(children):
+                    pending = source.pending_items()
+                    if pending:
+                        sources[-1] = pending
+                        kinds[-1] = _FRAME_PAIRS
+                        positions[-1] = 0
+                    else:
+                        sources.pop()
+                        kinds.pop()
+                        positions.pop()
+                        documents.pop()
+                    continue
+
+                positions[-1] = position + 1
+                child = children[position]
+                if child._type_tag == TYPE_DICT:
+                    value = {}
+                    sources.append(child)
+                    kinds.append(_FRAME_ITEMS)
+                    positions.append(0)
+                    documents.append(value)
+                elif child._type_tag == TYPE_LIST:
+                    value = []
+                    sources.append(child)
+                    kinds.append(_FRAME_ITEMS)
+                    positions.append(0)
+                    documents.append(value)
+                else:
+                    value = child._value
+
+                if is_dict:
+                    target[translate(child._key, write_language)] = value
+                else:
+                    target.append(value)
+                continue
+
+            if position == len(source):
+                sources.pop()
+                kinds.pop()
+                positions.pop()
+                documents.pop()
+                continue
+
+            positions[-1] = position + 1
+            if kind == _FRAME_PAIRS:
+                key, raw_value = source[position]
+            else:
+                key, raw_value = None, source[position]
+
+            if isinstance(raw_value, JsonSpan):
+                raw_value = raw_value.value()
+            if isinstance(raw_value, dict):
+                value = {}
+                sources.append(list(raw_value.items()))
+                kinds.append(_FRAME_PAIRS)
+                positions.append(0)
+                documents.append(value)
+            elif isinstance(raw_value, (list, tuple)):
+                value = []
+                sources.append(raw_value)
+                kinds.append(_FRAME_VALUES)
+                positions.append(0)
+                documents.append(value)
+            else:
+                value = raw_value
+
+            if is_dict:
+                target[translate(translate(key, tree_language), write_language)] = value
+            else:
+                target.append(value)
+
+        return document
+
+    def write_json_to_file(self, file_name: str, root: QJsonTreeItem=None,
+                           compact: bool=False) -> None:
+        """Writes JSON of the tree straight to file without building the document.
+
+        The text is identical to JsonParsing.write_json_to_file of get_json_from_tree,
+        see JsonTreeWriter. The file is replaced atomically, files with .gz, .bz2 and .xz
+        extensions are compressed. Unlike JsonParsing.write_json_to_file exceptions
+        are not caught.
+
+        Args:
+        -----
+            file_name: str
+                File name of JSON file
+            root: QJsonTreeItem
+                Item whose value is written. Default is the root of the model
+            compact: bool
+                Write JSON without indents and spaces instead of indent of 2 spaces
+
+        Raises:
+        -------
+            OSError:
+                An error occured during writing the file
+            TypeError:
+                A value could not be serialized
+        """
+        if root is None or root is self._root_item:
+            write_tree_to_file(file_name, self._root_item, compact=compact,
+                               cache=self.fragment_cache)
+        else:
+            write_tree_to_file(file_name, root, compact=compact)
+
+    def create_patcher(self, file_name: str, state: tuple, compact: bool=False):
+        """Return JsonTreePatcher writing edits of the tree to the file it was loaded from.
+
+        Only the byte ranges of edited values are replaced, the layout of the file is
+        kept. The tree must not change until the patcher is done, see is_frozen.
+
+        Args:
+        -----
+            file_name: str
+                File name of JSON file the tree was loaded from or last saved to
+            state: tuple
+                State of the file after it was loaded or saved, see
+                JsonTreePatcher.file_state
+            compact: bool
+                Write new values without indents if the layout of the file is unknown
+        """
+        # JSON Lines documents are not patched, their index is not a JsonIndex
+        source_index = self._source_index
+        if not isinstance(source_index, JsonIndex):
+            source_index = None
+        return JsonTreePatcher(
+            file_name, self._root_item, self._dirty_items, self._new_items,
+            self._original_children, state, source_index=source_index, compact=compact)
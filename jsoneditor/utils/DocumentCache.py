@@ -0,0 +1,289 @@
+"""This module keeps parsed JSON documents in an on-disk cache.
+
+Parsed documents are stored with marshal, which loads several times faster than
+json.loads. An entry is used only if absolute path, size and mtime of the file are the
+same as when the entry was written, with verify_content the hash of the file content is
+compared too. Least recently used entries are removed when the cache directory grows over
+its size limit.
+
+    Typical usage example:
+    ----------------------
+
+    document = DOCUMENT_CACHE.get("example.json")
+    if document is None:
+        file_stat = os.stat("example.json")
+        document = json.load(open("example.json"))
+        DOCUMENT_CACHE.put("example.json", document, file_stat)
+"""
+import os
+import gc
+import sys
+import marshal
+import hashlib
+import tempfile
+from configparser import ConfigParser
+
+from utils.Utils import Utils
+
+
+CONFIG_OBJECT = ConfigParser()
+CONFIG_OBJECT.read(Utils().get_abs_file_path("utils/config/config.ini"))
+
+# Version of the entry layout, entries of other versions are ignored
+CACHE_FORMAT = 1
+
+# Suffix of the cache entries
+ENTRY_SUFFIX = ".marshal"
+
+
+class DocumentCache():
+    """Class for caching parsed JSON documents on disk.
+
+    Attributes:
+    -----------
+    directory:
+        Directory of the cache entries
+    max_bytes:
+        Size limit of the cache directory in bytes
+    enabled:
+        Use the cache or not
+    verify_content:
+        Compare hash of the file content on every get, which reads the whole file
+    hits:
+        Amount of documents loaded from the cache
+    misses:
+        Amount of documents which were not found in the cache
+    stores:
+        Amount of documents written to the cache
+
+    Methods:
+    --------
+    get(file_name: str):
+        Return cached document of the file or None
+    put(file_name: str, document, file_stat, file_hash: str) -> bool:
+        Writes document of the file to the cache
+    new_hash():
+        Return hash object for file_hash of put
+    accepts(file_stat) -> bool:
+        Return True if document of the file could be written to the cache
+    clear() -> int:
+        Removes all entries
+    size() -> int:
+        Return size of all entries in bytes
+    """
+    def __init__(self, directory: str, max_bytes: int, enabled: bool=True,
+                 verify_content: bool=False) -> None:
+        """Constructs all necessary attributes for the DocumentCache object.
+
+        Args:
+        -----
+            directory: str
+                Directory of the cache entries, created on the first write
+            max_bytes: int
+                Size limit of the cache directory in bytes
+            enabled: bool
+                Use the cache or not
+            verify_content: bool
+                Compare hash of the file content on every get
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.verify_content = verify_content
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def get(self, file_name: str):
+        """Return cached document of the file.
+
+        Args:
+        -----
+            file_name: str
+                File name of JSON file
+
+        Returns:
+        --------
+            Parsed document or None if the cache is disabled, there is no entry for
+            the file or size or mtime of the file (and content if verify_content is
+            set) were changed since the entry was written
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            file_stat = os.stat(file_name)
+            entry_name = self._entry_name(file_name)
+            with open(entry_name, mode="rb") as entry:
+                header = marshal.load(entry)
+                if header[:-1] != self._header(file_name, file_stat, None)[:-1]:
+                    self.misses += 1
+                    return None
+                if self.verify_content and (
+                        header[-1] is None or header[-1] != self._file_hash(file_name)):
+                    self.misses += 1
+                    return None
+
+                data = entry.read()
+
+            # Collections created by marshal can not form cycles
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                document = marshal.loads(data)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+            del data
+            os.utime(entry_name)
+        except (OSError, EOFError, ValueError, TypeError, IndexError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return document
+
+    def put(self, file_name: str, document, file_stat, file_hash: str=None) -> bool:
+        """Writes document of the file to the cache.
+
+        Args:
+        -----
+            file_name: str
+                File name of JSON file
+            document: dict or list
+                Document parsed from the file
+            file_stat: os.stat_result
+                Result of os.stat of the file taken before it was parsed. Document
+                is not written if the file was changed since then
+            file_hash: str
+                Hex digest of new_hash() updated with the bytes of the file read while
+                it was parsed. If it is None, the file is read again to hash it only
+                if verify_content is set
+
+        Returns:
+        --------
+            True if the document was written
+        """
+        if not self.accepts(file_stat):
+            return False
+
+        try:
+            if file_hash is None and self.verify_content:
+                file_hash = self._file_hash(file_name)
+            current_stat = os.stat(file_name)
+            if (current_stat.st_size != file_stat.st_size or
+                    current_stat.st_mtime_ns != file_stat.st_mtime_ns):
+                return False
+
+            os.makedirs(self.directory, exist_ok=True)
+            entry_name = self._entry_name(file_name)
+            descriptor, temporary_name = tempfile.mkstemp(
+                suffix=".tmp", dir=self.directory)
+            try:
+                with os.fdopen(descriptor, mode="wb") as entry:
+                    marshal.dump(self._header(file_name, file_stat, file_hash), entry)
+                    entry.write(marshal.dumps(document))
+                os.replace(temporary_name, entry_name)
+            except BaseException:
+                os.remove(temporary_name)
+                raise
+        except (OSError, ValueError) as exception:
+            print("Could not write cache entry for %s: %s" % (file_name, exception))
+            return False
+
+        self.stores += 1
+        self._evict(keep=entry_name)
+        return True
+
+    def accepts(self, file_stat) -> bool:
+        """Return True if the cache is enabled and the file is not over its size limit."""
+        return self.enabled and file_stat.st_size <= self.max_bytes
+
+    def clear(self) -> int:
+        """Removes all entries.
+
+        Returns:
+        --------
+            Amount of removed entries
+        """
+        removed = 0
+        for entry_name, _entry_stat in self._entries():
+            try:
+                os.remove(entry_name)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def size(self) -> int:
+        """Return size of all entries in bytes."""
+        return sum(entry_stat.st_size for _entry_name, entry_stat in self._entries())
+
+    def _entries(self) -> list:
+        """Return (entry name, os.stat_result) of all entries."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+
+        entries = []
+        for name in names:
+            if not name.endswith(ENTRY_SUFFIX):
+                continue
+            entry_name = os.path.join(self.directory, name)
+            try:
+                entries.append((entry_name, os.stat(entry_name)))
+            except OSError:
+                pass
+        return entries
+
+    def _evict(self, keep: str) -> None:
+        """Removes least recently used entries while the cache is over its size limit."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime_ns)
+        total = sum(entry_stat.st_size for _entry_name, entry_stat in entries)
+        for entry_name, entry_stat in entries:
+            if total <= self.max_bytes:
+                break
+            if entry_name == keep:
+                continue
+            try:
+                os.remove(entry_name)
+                total -= entry_stat.st_size
+            except OSError:
+                pass
+
+    def _entry_name(self, file_name: str) -> str:
+        """Return file name of the entry for the file."""
+        path_hash = hashlib.sha1(os.path.abspath(file_name).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, path_hash + ENTRY_SUFFIX)
+
+    @classmethod
+    def _header(cls, file_name: str, file_stat, file_hash: str) -> tuple:
+        """Return header of the entry which identifies the file and its content."""
+        return (CACHE_FORMAT, marshal.version, sys.version_info[:2],
+                os.path.abspath(file_name), file_stat.st_size, file_stat.st_mtime_ns,
+                file_hash)
+
+    @classmethod
+    def new_hash(cls):
+        """Return hash object for the content of files, the same as of Utils.file_hash."""
+        return hashlib.blake2b()
+
+    @classmethod
+    def _file_hash(cls, file_name: str) -> str:
+        """Return hash of the file content."""
+        return Utils().file_hash(file_name)
+
+
+def default_cache_directory() -> str:
+    """Return cache directory of the user."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "jsoneditor")
+
+
+DOCUMENT_CACHE = DocumentCache(
+    CONFIG_OBJECT.get("Cache", "directory", fallback="") or default_cache_directory(),
+    int(float(CONFIG_OBJECT.get("Cache", "max_size_mb", fallback="256")) * 1024 * 1024),
+    Utils().string_to_boolean(CONFIG_OBJECT.get("Cache", "enabled", fallback="True")),
+    Utils().string_to_boolean(CONFIG_OBJECT.get("Cache", "verify_content", fallback="False")))
@@ -0,0 +1,206 @@
+"""This module provides interchangeable JSON backends for parsing and serializing documents.
+
+The standard library json module is always available and is the reference: every other
+backend must parse to the same values and serialize to the same text as json.loads and
+json.dumps(value, indent=2, ensure_ascii=False, sort_keys=True). Where a backend can not
+guarantee that for some document it falls back to the standard library.
+
+    Typical usage example:
+    ----------------------
+
+    document = JSON_BACKEND.loads(b'{"key": "value"}')
+    text = JSON_BACKEND.dumps(document)
+    print(JSON_BACKEND.name, available_backends())
+"""
+import re
+import json
+from configparser import ConfigParser
+
+from utils.Utils import Utils
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+CONFIG_OBJECT = ConfigParser()
+CONFIG_OBJECT.read(Utils().get_abs_file_path("utils/config/config.ini"))
+
+# Integers of 19 or more digits could be out of 64-bit range of orjson, they are found
+# as runs of zeros after all digits are replaced by zero
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+_LONG_INTEGER = b"0" * 19
+
+# Ends of float tokens which orjson writes differently from repr(): exponents and
+# small fractions. Only a number could end a line of indented output, strings always
+# end with a quote
+_FLOAT_DIFFERENCE_RE = re.compile(r"(?m)(?:e[-+]?\d+|0\.0000\d*)(?=,?$)")
+_FLOAT_RE = re.compile(r"-?\d+(?:\.\d+)?(?:e[-+]?\d+)?")
+
+class StdlibBackend():
+    """Class for parsing and serializing JSON with the standard library json module.
+
+    Attributes:
+    -----------
+    name:
+        Name of the backend
+
+    Methods:
+    --------
+    is_available() -> bool:
+        Return True if the backend could be used
+    loads(data: bytes):
+        Return document parsed from data
+    dumps(value, indent: int, sort_keys: bool) -> str:
+        Return JSON text of value
+    """
+    name = "stdlib"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Return True if the backend could be used."""
+        return True
+
+    @classmethod
+    def loads(cls, data: bytes):
+        """Return document parsed from data.
+
+        Args:
+        -----
+            data: bytes
+                UTF-8 encoded JSON text
+
+        Raises:
+        -------
+            ValueError:
+                Data is not a valid JSON document
+        """
+        return json.loads(data)
+
+    @classmethod
+    def dumps(cls, value, indent: int=2, sort_keys: bool=True) -> str:
+        """Return JSON text of value.
+
+        Non-ASCII characters are written as they are (ensure_ascii=False).
+
+        Args:
+        -----
+            value: Any
+                Value to serialize
+            indent: int
+                Indent of nested values. None for compact text without whitespace
+            sort_keys: bool
+                Sort or not dictionary keys
+        """
+        if indent is None:
+            return json.dumps(value, ensure_ascii=False, sort_keys=sort_keys,
+                              separators=(",", ":"))
+        return json.dumps(value, indent=indent, ensure_ascii=False, sort_keys=sort_keys)
+
+
+class OrjsonBackend(StdlibBackend):
+    """Class for parsing and serializing JSON with orjson.
+
+    Documents which orjson parses or serializes differently from the standard library
+    are handled by StdlibBackend: integers out of 64-bit range, NaN and Infinity,
+    lone surrogates, nesting deeper than orjson limit and indents other than 2.
+    Floats are written in repr() format of Python.
+    """
+    name = "orjson"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Return True if orjson is installed."""
+        return orjson is not None
+
+    @classmethod
+    def loads(cls, data: bytes):
+        """Return document parsed from data, see StdlibBackend.loads."""
+        if _LONG_INTEGER not in data.translate(_DIGITS_TO_ZERO):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+        return json.loads(data)
+
+    @classmethod
+    def dumps(cls, value, indent: int=2, sort_keys: bool=True) -> str:
+        """Return JSON text of value, see StdlibBackend.dumps."""
+        if indent != 2:
+            return super().dumps(value, indent, sort_keys)
+
+        option = orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            data = orjson.dumps(value, option=option)
+        except TypeError:
+            return super().dumps(value, indent, sort_keys)
+
+        # NaN and Infinity are written by orjson as null
+        if b"null" in data and orjson.loads(data) != value:
+            return super().dumps(value, indent, sort_keys)
+
+        return cls._python_floats(data.decode("utf-8"))
+
+    @classmethod
+    def _python_floats(cls, text: str) -> str:
+        """Return indented text of orjson with floats written as repr() writes them."""
+        pieces = []
+        position = 0
+        for match in _FLOAT_DIFFERENCE_RE.finditer(text):
+            # Number token starts after the indent or after ": " of its key
+            start = text.rfind(" ", position, match.start()) + 1
+            start = max(start, position)
+            token = text[start:match.end()]
+            if _FLOAT_RE.fullmatch(token) is None:
+                continue
+            pieces.append(text[position:start])
+            pieces.append(repr(float(token)))
+            position = match.end()
+        if not pieces:
+            return text
+        pieces.append(text[position:])
+        return "".join(pieces)
+
+
+BACKENDS = {
+    StdlibBackend.name: StdlibBackend,
+    OrjsonBackend.name: OrjsonBackend
+}
+
+# Backends tried by "auto" in the order of preference
+PREFERRED_BACKENDS = (OrjsonBackend.name, StdlibBackend.name)
+
+
+def available_backends() -> list:
+    """Return names of backends which could be used."""
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def get_backend(name: str="auto"):
+    """Return backend class by its name.
+
+    Args:
+    -----
+        name: str
+            Name of the backend or "auto" for the fastest available one
+
+    Returns:
+    --------
+        Backend class. StdlibBackend if the backend is unknown or not available
+    """
+    if name == "auto":
+        for preferred_name in PREFERRED_BACKENDS:
+            if BACKENDS[preferred_name].is_available():
+                return BACKENDS[preferred_name]
+
+    backend = BACKENDS.get(name)
+    if backend is None or not backend.is_available():
+        print("JSON backend %s is not available, using %s" % (name, StdlibBackend.name))
+        return StdlibBackend
+    return backend
+
+
+JSON_BACKEND = get_backend(CONFIG_OBJECT.get("Other", "json_backend", fallback="auto"))
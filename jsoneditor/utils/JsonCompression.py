@@ -0,0 +1,100 @@
+"""This module reads and writes JSON files compressed with gzip, bz2 or xz.
+
+Compression is chosen by the extension of the file, like "example.json.gz". Files are
+decompressed while they are read and compressed while they are written, so no
+uncompressed copy is written to disk. Files with other extensions are read and written
+as they are.
+
+    Typical usage example:
+    ----------------------
+
+    with open("example.json.gz", mode="rb") as raw_file:
+        opened_file = decompressing_reader("example.json.gz", raw_file)
+        data = opened_file.read()
+        print(raw_file.tell())  # Amount of compressed bytes read
+
+    with open("example.json.xz", mode="wb") as raw_file:
+        opened_file = compressing_writer("example.json.xz", raw_file)
+        opened_file.write(b"{}")
+        opened_file.close()
+"""
+import bz2
+import gzip
+import lzma
+import zlib
+
+# Compression modules by file extension
+COMPRESSIONS = {".gz": gzip, ".bz2": bz2, ".xz": lzma}
+
+# Errors of corrupted or truncated compressed data besides OSError
+DECOMPRESSION_ERRORS = (EOFError, zlib.error, lzma.LZMAError)
+
+# Compression level of gzip, the default of gzip command. Level 9 is several times
+# slower and only a little smaller
+GZIP_COMPRESS_LEVEL = 6
+
+
+def compression_module(file_name: str):
+    """Return gzip, bz2 or lzma module by extension of file_name or None."""
+    for extension, module in COMPRESSIONS.items():
+        if file_name.lower().endswith(extension):
+            return module
+    return None
+
+
+def is_compressed_file(file_name: str) -> bool:
+    """Return True if file_name has an extension of compressed files."""
+    return compression_module(file_name) is not None
+
+
+def decompressing_reader(file_name: str, raw_file):
+    """Return binary file object reading decompressed content of raw_file.
+
+    Args:
+    -----
+        file_name: str
+            File name of the file, its extension chooses the compression
+        raw_file:
+            File object of the file opened in binary mode. Its position is the amount
+            of compressed bytes read so far
+
+    Returns:
+    --------
+        raw_file itself if the file is not compressed
+    """
+    module = compression_module(file_name)
+    if module is gzip:
+        return gzip.GzipFile(fileobj=raw_file, mode="rb")
+    if module is bz2:
+        return bz2.BZ2File(raw_file, mode="rb")
+    if module is lzma:
+        return lzma.LZMAFile(raw_file, mode="rb")
+    return raw_file
+
+
+def compressing_writer(file_name: str, raw_file):
+    """Return binary file object writing compressed content to raw_file.
+
+    The returned object has to be closed to write the end of the compressed stream,
+    raw_file stays open.
+
+    Args:
+    -----
+        file_name: str
+            File name of the file, its extension chooses the compression
+        raw_file:
+            File object of the file opened in binary mode for writing
+
+    Returns:
+    --------
+        raw_file itself if the file is not compressed
+    """
+    module = compression_module(file_name)
+    if module is gzip:
+        return gzip.GzipFile(
+            filename="", fileobj=raw_file, mode="wb", compresslevel=GZIP_COMPRESS_LEVEL)
+    if module is bz2:
+        return bz2.BZ2File(raw_file, mode="wb")
+    if module is lzma:
+        return lzma.LZMAFile(raw_file, mode="wb")
+    return raw_file
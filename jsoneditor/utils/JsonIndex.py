@@ -0,0 +1,477 @@
+"""This module indexes containers of a memory-mapped JSON file by their byte offsets.
+
+One structural scan of the mapped file records where every object and array starts
+and ends. Containers are then parsed only when they are needed, one level at a time,
+straight from the mapping: a JsonSpan is a container which was not parsed yet. The same
+index converts byte offsets to line and column of the file and back.
+
+    Typical usage example:
+    ----------------------
+
+    index = JsonIndex("example.json")
+    index.scan()
+    for key, value in index.root().items():
+        print(key, value)
+    line, column = index.line_column(index.root().start)
+"""
+import os
+import re
+import mmap
+from array import array
+from bisect import bisect_left
+
+from utils.JsonBackends import JSON_BACKEND
+from utils.JsonStream import JsonEventParser
+
+# Finds the next bracket outside of strings, skipping everything else
+_STRUCTURE_RE = re.compile(
+    rb'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*(?:([{\[])|[}\]])')
+
+_KEY_RE = re.compile(rb'[ \t\n\r]*("[^"\\]*(?:\\.[^"\\]*)*")[ \t\n\r]*:')
+_VALUE_RE = re.compile(rb"""[ \t\n\r]*(?:
+    ([{\[])
+  | ("[^"\\]*(?:\\.[^"\\]*)*")
+  | (-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)
+  | (true|false|null|NaN|Infinity|-Infinity)
+)""", re.VERBOSE)
+_SEPARATOR_RE = re.compile(rb"[ \t\n\r]*([,}\]])")
+_SPACE_RE = re.compile(rb"[ \t\n\r]*")
+
+# NaN and Infinity are accepted as json.load does
+_LITERALS = {b"true": True, b"false": False, b"null": None, b"NaN": float("nan"),
+             b"Infinity": float("inf"), b"-Infinity": float("-inf")}
+
+# Size of blocks in bytes whose line numbers are precomputed
+LINE_BLOCK_SIZE = 1024 * 1024
+
+# Amount of found brackets between two calls of scan progress callback
+SCAN_PROGRESS_INTERVAL = 65536
+
+
+class JsonIndex():
+    """Class for indexing containers of a memory-mapped JSON file.
+
+    Attributes:
+    -----------
+    file_name:
+        File name of JSON file
+    data:
+        Read-only mmap of the file
+    size:
+        Size of the file in bytes
+
+    Methods:
+    --------
+    scan(progress) -> bool:
+        Records start and end offsets of all containers
+    root() -> JsonSpan:
+        Return top-level container of the document
+    container_count() -> int:
+        Return amount of indexed containers
+    next_container(offset: int) -> tuple:
+        Return (start, end) of the first container which starts at or after offset
+    line_column(offset: int) -> tuple:
+        Return line and column of byte offset
+    offset(line: int, column: int) -> int:
+        Return byte offset of line and column
+    check() -> None:
+        Raises ValueError if the file was changed since it was mapped
+    close() -> None:
+        Unmaps the file
+    """
+    def __init__(self, file_name: str) -> None:
+        """Maps the file to memory.
+
+        Args:
+        -----
+            file_name: str
+                File name of JSON file
+
+        Raises:
+        -------
+            OSError:
+                File could not be opened or mapped
+            ValueError:
+                File is empty
+        """
+        self.file_name = file_name
+        self._file = open(file_name, mode="rb")
+        try:
+            self._stat = os.fstat(self._file.fileno())
+            self.size = self._stat.st_size
+            if self.size == 0:
+                raise ValueError("File %s is empty" % file_name)
+            self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+
+        self._starts = array("q")
+        self._ends = array("q")
+        self._block_lines = array("q")
+
+    def scan(self, progress=None) -> bool:
+        """Records start and end offsets of all containers of the document.
+
+        Strings are skipped, nothing else is validated, so the document could still
+        be invalid inside of a container. Such errors are raised when it is parsed.
+
+        Args:
+        -----
+            progress: callable
+                Called as progress(bytes_scanned, total_bytes) periodically.
+                If it returns False scanning is canceled
+
+        Returns:
+        --------
+            False if scanning was canceled
+
+        Raises:
+        -------
+            ValueError:
+                Document is not an object or an array or its brackets are not balanced
+        """
+        data = self.data
+        starts = array("q")
+        ends = array("q")
+        stack = []
+        found = 0
+        position = 0
+        for match in _STRUCTURE_RE.finditer(data):
+            position = match.end() - 1
+            if match.lastindex:
+                stack.append(len(starts))
+                starts.append(position)
+                ends.append(0)
+            elif stack:
+                ends[stack.pop()] = position + 1
+            else:
+                raise ValueError("Unexpected '%s' at byte %d" % (chr(data[position]), position))
+
+            found += 1
+            if progress is not None and found % SCAN_PROGRESS_INTERVAL == 0:
+                if progress(position, self.size) is False:
+                    return False
+
+        if stack:
+            raise ValueError("Unexpected end of document at byte %d" % self.size)
+        first = _SPACE_RE.match(data).end()
+        if not starts or starts[0] != first or data[ends[0]:].strip():
+            raise ValueError("Document must be an object or an array")
+
+        self._starts = starts
+        self._ends = ends
+        self._count_lines()
+        if progress is not None:
+            progress(self.size, self.size)
+        return True
+
+    def _count_lines(self) -> None:
+        """Records amount of lines before every block of LINE_BLOCK_SIZE bytes."""
+        data = self.data
+        block_lines = array("q")
+        lines = 0
+        for block in range(0, self.size, LINE_BLOCK_SIZE):
+            block_lines.append(lines)
+            lines += data[block:block + LINE_BLOCK_SIZE].count(b"\n")
+        self._block_lines = block_lines
+
+    def root(self):
+        """Return top-level container of the document as JsonSpan."""
+        return JsonSpan(self, self._starts[0], self._ends[0])
+
+    def container_count(self) -> int:
+        """Return amount of indexed containers."""
+        return len(self._starts)
+
+    def next_container(self, offset: int) -> tuple:
+        """Return (start, end) of the first container which starts at or after offset.
+
+        Raises:
+        -------
+            ValueError:
+                There is no container after offset
+        """
+        position = bisect_left(self._starts, offset)
+        if position == len(self._starts):
+            raise ValueError("No container after byte %d" % offset)
+        return self._starts[position], self._ends[position]
+
+    def line_column(self, offset: int) -> tuple:
+        """Return (line, column) of byte offset, both starting from 1.
+
+        Columns are counted in characters.
+        """
+        data = self.data
+        block = offset // LINE_BLOCK_SIZE
+        line = self._block_lines[block] + data[block * LINE_BLOCK_SIZE:offset].count(b"\n")
+        line_start = data.rfind(b"\n", 0, offset) + 1
+        column = len(data[line_start:offset].decode("utf-8", errors="replace"))
+        return line + 1, column + 1
+
+    def offset(self, line: int, column: int=1) -> int:
+        """Return byte offset of line and column, both starting from 1.
+
+        Raises:
+        -------
+            ValueError:
+                There is no such line in the file
+        """
+        data = self.data
+        if line < 1:
+            raise ValueError("Line %d is not in the file" % line)
+
+        # Last block which starts before the end of the previous line
+        block = max(bisect_left(self._block_lines, line - 1) - 1, 0)
+        line_start = block * LINE_BLOCK_SIZE
+        for _ in range(line - 1 - self._block_lines[block]):
+            line_start = data.find(b"\n", line_start) + 1
+            if line_start == 0:
+                raise ValueError("Line %d is not in the file" % line)
+
+        line_end = data.find(b"\n", line_start)
+        if line_end == -1:
+            line_end = self.size
+        text = data[line_start:line_end].decode("utf-8", errors="replace")
+        return line_start + len(text[:max(column - 1, 0)].encode("utf-8"))
+
+    def check(self) -> None:
+        """Raises ValueError if the file was changed since it was mapped.
+
+        Reading a mapping of a truncated file crashes the process, so it is checked
+        before every access to the data.
+        """
+        file_stat = os.fstat(self._file.fileno())
+        if (file_stat.st_size != self._stat.st_size or
+                file_stat.st_mtime_ns != self._stat.st_mtime_ns):
+            raise ValueError("File %s was changed since it was opened" % self.file_name)
+
+    def close(self) -> None:
+        """Unmaps the file. Spans of the index could not be used after that."""
+        self.data.close()
+        self._file.close()
+
+
+class JsonItems(list):
+    """List of (key, value) pairs of a container parsed by JsonSpan.items.
+
+    Attributes:
+    -----------
+    offsets:
+        Byte offsets of the pairs: of the key in objects, of the value in arrays
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.offsets = []
+
+
+class JsonSpan():
+    """Class for a container of a memory-mapped document which is not parsed yet.
+
+    Attributes:
+    -----------
+    index:
+        JsonIndex of the document
+    start:
+        Byte offset of the opening bracket
+    end:
+        Byte offset after the closing bracket
+    sort:
+        Sort or not keys of items()
+
+    Methods:
+    --------
+    is_dict() -> bool:
+        Return True if the container is an object
+    is_empty() -> bool:
+        Return True if the container has no children
+    items() -> JsonItems:
+        Return (key, value) pairs of the first level of the container
+    members() -> list:
+        Return byte ranges of keys and values of the first level of the container
+    labels():
+        Return "name" and "group" members of the container
+    value():
+        Return the whole container parsed to Python value
+    """
+    __slots__ = ("index", "start", "end", "sort")
+
+    def __init__(self, index: JsonIndex, start: int, end: int, sort: bool=True) -> None:
+        self.index = index
+        self.start = start
+        self.end = end
+        self.sort = sort
+
+    def is_dict(self) -> bool:
+        """Return True if the container is an object, False if it is an array."""
+        return self.index.data[self.start] == 123  # {
+
+    def is_empty(self) -> bool:
+        """Return True if the container has no children."""
+        self.index.check()
+        return _SPACE_RE.match(self.index.data, self.start + 1).end() == self.end - 1
+
+    def value(self):
+        """Return the whole container parsed to Python value with JSON_BACKEND."""
+        self.index.check()
+        return JSON_BACKEND.loads(self.index.data[self.start:self.end])
+
+    def labels(self):
+        """Return dict of "name" and "group" members of the object or empty list for arrays.
+
+        Result is passed to JsonParsing.get_name_from_dict instead of the whole value.
+        """
+        if not self.is_dict():
+            return []
+
+        labels = {}
+        for key, value in self.items(sort=False):
+            if key == "name" or key == "group":
+                labels[key] = value.value() if isinstance(value, JsonSpan) else value
+        return labels
+
+    def items(self, sort: bool=None) -> JsonItems:
+        """Return (key, value) pairs of the first level of the container.
+
+        Keys of arrays are None. Children containers are returned as JsonSpan.
+        Repeated keys of an object keep the position of the first one and the value
+        of the last one, as json.loads does.
+
+        Args:
+        -----
+            sort: bool
+                Sort or not keys of objects. None to use sort attribute
+
+        Raises:
+        -------
+            ValueError:
+                Container is not valid JSON or the file was changed
+        """
+        index = self.index
+        index.check()
+        data = index.data
+        is_dict = self.is_dict()
+        end = self.end - 1
+        closing = 125 if is_dict else 93  # } or ]
+        decode_string = JsonEventParser._decode_string
+
+        items = JsonItems()
+        offsets = items.offsets
+        positions = {}
+        if self.is_empty():
+            return items
+
+        key = None
+        position = self.start + 1
+        while True:
+            if is_dict:
+                match = _KEY_RE.match(data, position, end)
+                if match is None:
+                    raise ValueError("Expected key at byte %d" % position)
+                offset = match.start(1)
+                key = decode_string(match.group(1), offset)
+                position = match.end()
+
+            match = _VALUE_RE.match(data, position, end)
+            if match is None:
+                raise ValueError("Expected value at byte %d" % position)
+            group = match.lastindex
+            value_start = match.start(group)
+            if not is_dict:
+                offset = value_start
+
+            if group == 1:
+                value_start, position = index.next_container(value_start)
+                value = JsonSpan(index, value_start, position, self.sort)
+            else:
+                position = match.end()
+                token = match.group(group)
+                if group == 2:
+                    value = decode_string(token, value_start)
+                elif group == 3:
+                    if b"." in token or b"e" in token or b"E" in token:
+                        value = float(token)
+                    else:
+                        value = int(token)
+                else:
+                    value = _LITERALS[token]
+
+            if is_dict and key in positions:
+                items[positions[key]] = (key, value)
+            else:
+                if is_dict:
+                    positions[key] = len(items)
+                items.append((key, value))
+                offsets.append(offset)
+
+            match = _SEPARATOR_RE.match(data, position, end + 1)
+            if match is None:
+                raise ValueError("Expected ',' at byte %d" % position)
+            position = match.end()
+            if data[position - 1] != 44:  # ,
+                if data[position - 1] != closing or position != self.end:
+                    raise ValueError("Unexpected '%s' at byte %d" %
+                                     (chr(data[position - 1]), position - 1))
+                break
+
+        if is_dict and (self.sort if sort is None else sort):
+            order = sorted(range(len(items)), key=lambda row: items[row][0])
+            sorted_items = JsonItems()
+            sorted_items.extend(items[row] for row in order)
+            sorted_items.offsets = [offsets[row] for row in order]
+            items = sorted_items
+        return items
+
+    def members(self) -> list:
+        """Return byte ranges of keys and values of the first level of the container.
+
+        Members are (key, key_start, key_end, value_start, value_end) in the order of
+        the file, key and its offsets are None for arrays. Repeated keys are all returned.
+
+        Raises:
+        -------
+            ValueError:
+                Container is not valid JSON or the file was changed
+        """
+        index = self.index
+        index.check()
+        data = index.data
+        is_dict = self.is_dict()
+        end = self.end - 1
+        closing = 125 if is_dict else 93  # } or ]
+        decode_string = JsonEventParser._decode_string
+
+        members = []
+        if self.is_empty():
+            return members
+
+        key = key_start = key_end = None
+        position = self.start + 1
+        while True:
+            if is_dict:
+                match = _KEY_RE.match(data, position, end)
+                if match is None:
+                    raise ValueError("Expected key at byte %d" % position)
+                key_start, key_end = match.span(1)
+                key = decode_string(match.group(1), key_start)
+                position = match.end()
+
+            match = _VALUE_RE.match(data, position, end)
+            if match is None:
+                raise ValueError("Expected value at byte %d" % position)
+            value_start = match.start(match.lastindex)
+            if match.lastindex == 1:
+                value_start, position = index.next_container(value_start)
+            else:
+                position = match.end()
+            members.append((key, key_start, key_end, value_start, position))
+
+            match = _SEPARATOR_RE.match(data, position, end + 1)
+            if match is None:
+                raise ValueError("Expected ',' at byte %d" % position)
+            position = match.end()
+            if data[position - 1] != 44:  # ,
+                if data[position - 1] != closing or position != self.end:
+                    raise ValueError("Unexpected '%s' at byte %d" %
+                                     (chr(data[position - 1]), position - 1))
+                return members
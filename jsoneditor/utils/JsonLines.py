@@ -0,0 +1,353 @@
+"""This module indexes records of a memory-mapped JSON Lines (NDJSON) file.
+
+Every non-blank line of the file is one JSON value. One pass over the mapped file
+records where every record starts and ends, records are parsed only when they are
+expanded or searched. The document is shown as a list of its records.
+
+    Typical usage example:
+    ----------------------
+
+    index = JsonLinesIndex("example.jsonl")
+    index.scan()
+    for _key, record in index.root().items():
+        print(record.value() if isinstance(record, JsonLine) else record)
+    offsets = index.find(re.compile(rb"error"))
+    records, offset = read_appended_records("example.jsonl", index.size)
+"""
+import os
+import re
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+
+from utils.JsonBackends import JSON_BACKEND
+from utils.JsonIndex import JsonIndex, JsonSpan
+
+# Finds a line without its leading and trailing whitespace, skipping blank lines
+_RECORD_RE = re.compile(rb"\S(?:[^\n]*\S)?")
+
+# Extensions of JSON Lines files
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+
+# Amount of found records between two calls of scan progress callback
+SCAN_PROGRESS_INTERVAL = 65536
+
+# Maximal amount of bytes read by one call of read_appended_records
+TAIL_READ_LIMIT = 16 * 1024 * 1024
+
+
+def is_json_lines_file(file_name: str) -> bool:
+    """Return True if file_name has an extension of JSON Lines files."""
+    return file_name.lower().endswith(JSON_LINES_EXTENSIONS)
+
+
+def read_appended_records(file_name: str, offset: int, limit: int=TAIL_READ_LIMIT) -> tuple:
+    """Return records appended to JSON Lines file after offset.
+
+    Only complete lines are read, a line which is still being written is read by the
+    next call. Lines which are not valid JSON are skipped.
+
+    Args:
+    -----
+        file_name: str
+            File name of JSON Lines file
+        offset: int
+            Byte offset after the last read line
+        limit: int
+            Maximal amount of bytes to read. A line longer than limit is read whole
+
+    Returns:
+    --------
+        Tuple of the list of parsed records and the offset after the last read line
+
+    Raises:
+    -------
+        OSError:
+            File could not be read
+        ValueError:
+            File is shorter than offset, it was truncated or replaced
+    """
+    with open(file_name, mode="rb") as opened_file:
+        size = os.fstat(opened_file.fileno()).st_size
+        if size < offset:
+            raise ValueError("File %s was truncated" % file_name)
+        opened_file.seek(offset)
+        data = opened_file.read(min(size - offset, limit))
+        end = data.rfind(b"\n") + 1
+        while end == 0 and offset + len(data) < size:
+            chunk = opened_file.read(limit)
+            data += chunk
+            end = data.rfind(b"\n") + 1
+
+    records = []
+    for match in _RECORD_RE.finditer(data, 0, end):
+        try:
+            records.append(JSON_BACKEND.loads(match.group()))
+        except ValueError as exception:
+            print("Skipped invalid record at byte %d of %s: %s" %
+                  (offset + match.start(), file_name, exception))
+    return records, offset + end
+
+
+class JsonLinesIndex(JsonIndex):
+    """Class for indexing records of a memory-mapped JSON Lines file.
+
+    Offsets of records are kept as container offsets of JsonIndex, so line and column
+    conversion of JsonIndex works for records too.
+
+    Attributes:
+    -----------
+    follow:
+        File is followed, it could grow after it was mapped
+
+    Methods:
+    --------
+    scan(progress) -> bool:
+        Records start and end offsets of all records
+    root() -> JsonLines:
+        Return list of records of the document
+    record(offset: int) -> bytes:
+        Return text of the record which starts at offset
+    record_row(offset: int) -> int:
+        Return number of the record which contains offset
+    find(pattern) -> list:
+        Return offsets of records whose text matches pattern
+    """
+    def __init__(self, file_name: str) -> None:
+        """Maps the file to memory, see JsonIndex."""
+        super().__init__(file_name)
+        self.follow = False
+
+    def check(self) -> None:
+        """Raises ValueError if the file was changed since it was mapped.
+
+        Followed files could grow, they must not become shorter than the mapping.
+        """
+        if not self.follow:
+            super().check()
+            return
+        if os.fstat(self._file.fileno()).st_size < self.size:
+            raise ValueError("File %s was truncated" % self.file_name)
+
+    def scan(self, progress=None) -> bool:
+        """Records start and end offsets of all records of the document.
+
+        Records are not validated, errors are raised when they are parsed.
+
+        Args:
+        -----
+            progress: callable
+                Called as progress(bytes_scanned, total_bytes) periodically.
+                If it returns False scanning is canceled
+
+        Returns:
+        --------
+            False if scanning was canceled
+        """
+        starts = array("q")
+        ends = array("q")
+        found = 0
+        for match in _RECORD_RE.finditer(self.data):
+            starts.append(match.start())
+            ends.append(match.end())
+
+            found += 1
+            if progress is not None and found % SCAN_PROGRESS_INTERVAL == 0:
+                if progress(match.end(), self.size) is False:
+                    return False
+
+        self._starts = starts
+        self._ends = ends
+        self._count_lines()
+        if progress is not None:
+            progress(self.size, self.size)
+        return True
+
+    def root(self):
+        """Return list of records of the document as JsonLines."""
+        return JsonLines(self, 0, self.size)
+
+    def record(self, offset: int) -> bytes:
+        """Return text of the record which starts at offset.
+
+        Raises:
+        -------
+            ValueError:
+                No record starts at offset or the file was changed
+        """
+        self.check()
+        start, end = self.next_container(offset)
+        if start != offset:
+            raise ValueError("No record at byte %d" % offset)
+        return self.data[start:end]
+
+    def record_row(self, offset: int) -> int:
+        """Return number of the record which contains offset, starting from 0."""
+        return max(bisect_right(self._starts, offset) - 1, 0)
+
+    def find(self, pattern) -> list:
+        """Return offsets of records whose text matches pattern, in the file order.
+
+        Args:
+        -----
+            pattern: re.Pattern
+                Compiled bytes regular expression, it is searched in the raw text
+                of the records
+
+        Raises:
+        -------
+            ValueError:
+                The file was changed
+        """
+        self.check()
+        offsets = []
+        position = 0
+        data = self.data
+        while True:
+            match = pattern.search(data, position)
+            if match is None:
+                return offsets
+            row = self.record_row(match.start())
+            offsets.append(self._starts[row])
+            # Continue from the next record, one match is enough
+            if row + 1 >= len(self._starts):
+                return offsets
+            position = self._starts[row + 1]
+
+
+class JsonLines(JsonSpan):
+    """Class for the list of records of a JSON Lines document.
+
+    Records are returned by items() as JsonLineItems, see there how they are parsed.
+    """
+    __slots__ = ()
+
+    def is_dict(self) -> bool:
+        """Return False, the document is a list of records."""
+        return False
+
+    def is_empty(self) -> bool:
+        """Return True if the document has no records."""
+        return self.index.container_count() == 0
+
+    def value(self) -> list:
+        """Return all records parsed to Python values."""
+        return [value.value() if isinstance(value, JsonLine) else value
+                for _key, value in self.items()[:]]
+
+    def labels(self) -> list:
+        """Return empty list, the document is a list."""
+        return []
+
+    def items(self, sort: bool=None):
+        """Return (None, record) pairs of all records as JsonLineItems.
+
+        Pairs are created only when they are taken from the sequence, so records
+        are not parsed here.
+
+        Raises:
+        -------
+            ValueError:
+                The file was changed
+        """
+        self.index.check()
+        return JsonLineItems(self.index, self.sort if sort is None else sort)
+
+
+class JsonLineItems(Sequence):
+    """Lazy sequence of (None, record) pairs of a JSON Lines document.
+
+    Containers are returned as JsonLine and parsed when they are expanded, other
+    values are parsed when their pair is taken. Pairs added by extend are kept
+    after the records of the file.
+
+    Attributes:
+    -----------
+    offsets:
+        Byte offsets of the records of the file, the same as offsets of JsonItems
+    """
+    __slots__ = ("offsets", "_index", "_ends", "_sort", "_appended")
+
+    def __init__(self, index: JsonLinesIndex, sort: bool=True) -> None:
+        self.offsets = index._starts
+        self._index = index
+        self._ends = index._ends
+        self._sort = sort
+        self._appended = []
+
+    def __len__(self) -> int:
+        return len(self.offsets) + len(self._appended)
+
+    def __getitem__(self, position):
+        """Return pair of the record at position or list of pairs for a slice.
+
+        Raises:
+        -------
+            ValueError:
+                A record which is not an object or an array is not valid JSON
+                or the file was changed
+        """
+        self._index.check()
+        if isinstance(position, slice):
+            return [self._pair(row) for row in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("Record index out of range")
+        return self._pair(position)
+
+    def extend(self, pairs) -> None:
+        """Appends (key, value) pairs of records which are not in the mapped file."""
+        self._appended.extend(pairs)
+
+    def _pair(self, row: int) -> tuple:
+        if row >= len(self.offsets):
+            return self._appended[row - len(self.offsets)]
+        index = self._index
+        start = self.offsets[row]
+        end = self._ends[row]
+        first = index.data[start]
+        if first == 123 or first == 91:  # { or [
+            return None, JsonLine(index, start, end, self._sort)
+        try:
+            return None, JSON_BACKEND.loads(index.data[start:end])
+        except ValueError as exception:
+            line, _column = index.line_column(start)
+            raise ValueError("Line %d: %s" % (line, exception)) from exception
+
+
+class JsonLine(JsonSpan):
+    """Class for an object or an array record of a JSON Lines document.
+
+    The record is parsed as a whole with JSON_BACKEND when its children are needed.
+    """
+    __slots__ = ()
+
+    def labels(self):
+        """Return empty dict for objects and empty list for arrays.
+
+        Records are not parsed to find their "name" and "group" members.
+        """
+        return {} if self.is_dict() else []
+
+    def items(self, sort: bool=None) -> list:
+        """Return (key, value) pairs of the first level of the record.
+
+        Keys of arrays are None. Children are parsed values, not spans.
+
+        Raises:
+        -------
+            ValueError:
+                Record is not valid JSON or the file was changed
+        """
+        try:
+            value = self.value()
+        except ValueError as exception:
+            line, _column = self.index.line_column(self.start)
+            raise ValueError("Line %d: %s" % (line, exception)) from exception
+
+        if isinstance(value, dict):
+            if self.sort if sort is None else sort:
+                return sorted(value.items())
+            return list(value.items())
+        return [(None, child) for child in value]
@@ -6,15 +6,25 @@
     json_parsing = Utils()
     json_parsing.get_json_from_file("example.json")
     json_parsing.write_json_to_file("example.json")
+    json_parsing.write_json_lines_to_file("example.jsonl", [b'{"a": 1}', {"b": 2}])
     json_parsing.get_name_from_dict({"name": "username"})
+
+    with replacing_file("example.json") as opened_file:
+        opened_file.write(b"{}")
 """
 import os
-import json
+import stat
 import gettext
-from collections import OrderedDict
+import tempfile
+from contextlib import contextmanager
 from configparser import ConfigParser
 
 from utils.Utils import Utils
+from utils.KeyTranslator import KEY_TRANSLATOR
+from utils.DocumentCache import DOCUMENT_CACHE
+from utils.JsonBackends import JSON_BACKEND
+from utils.JsonShards import ShardError, load_json_sharded
+from utils.JsonCompression import decompressing_reader, is_compressed_file, compressing_writer
 
 
 CONFIG_OBJECT = ConfigParser()
@@ -26,6 +36,60 @@ TRANSLATE_JSONPARSING = gettext.translation(
     languages=[CONFIG_OBJECT.get("Language", "default_gui_language")])
 TRANSLATE_JSONPARSING.install()
 
+# Size of chunks in bytes for reading files
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+@contextmanager
+def replacing_file(file_name: str):
+    """Yields binary file object of a temporary file which replaces file_name at the end.
+
+    The temporary file is created in the directory of file_name, written to disk with
+    fsync and renamed to file_name, so an interrupted write never leaves a truncated
+    file and readers see either the old or the new content. The file keeps its
+    permissions. If the block raises, the temporary file is removed and file_name
+    is not changed. Symbolic links are followed, the file they point to is replaced.
+
+    Raises:
+    -------
+        OSError:
+            An error occured during writing the file
+    """
+    file_name = os.path.realpath(file_name)
+    directory = os.path.dirname(file_name)
+    descriptor, temporary_name = tempfile.mkstemp(
+        prefix=".%s." % os.path.basename(file_name), suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(descriptor, mode="wb") as opened_file:
+            yield opened_file
+            opened_file.flush()
+            os.fsync(opened_file.fileno())
+        # Temporary files are created private, the file keeps its permissions
+        if os.path.exists(file_name):
+            os.chmod(temporary_name, stat.S_IMODE(os.stat(file_name).st_mode))
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temporary_name, 0o666 & ~umask)
+        os.replace(temporary_name, file_name)
+    except BaseException:
+        os.remove(temporary_name)
+        raise
+
+    # The rename itself is written to disk with the directory
+    if hasattr(os, "O_DIRECTORY"):
+        try:
+            directory_descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(directory_descriptor)
+        except OSError:
+            pass
+        finally:
+            os.close(directory_descriptor)
+
+
 class JsonParsing():
     """Class parsing JSON-file for further analysis.
 
@@ -33,8 +97,12 @@ class JsonParsing():
     --------
     get_json_from_file() -> dict:
         Return JSON data from given file_name
-    write_json_to_file(json_data: str) -> None:
+    load_json_from_file(file_name: str, progress, workers: int) -> dict:
+        Return JSON data from given file_name reporting progress
+    write_json_to_file(file_name: str, json_data: dict, compact: bool) -> None:
         Write to given file_name given json_data
+    write_json_lines_to_file(file_name: str, records) -> None:
+        Write records to given file_name as JSON Lines
     get_name_from_dict(data: dict) -> str
         Return str with some parameters which was found from given data
     translate(input_string: str, language: str) -> str:
@@ -63,13 +131,10 @@ class JsonParsing():
                 Base exception if others could not catch the exception
         """
         try:
-            with open(file_name, mode='r', encoding="utf-8") as opened_file:
-                json_data = json.load(opened_file)
-
-                # In Json there is a property for sorting keys (sort_Keys=True (False by default)),
-                # so there is no need in this:
-                # return OrderedDict(sorted(json_data.items()))
-                return json_data
+            # In Json there is a property for sorting keys (sort_Keys=True (False by default)),
+            # so there is no need in this:
+            # return OrderedDict(sorted(json_data.items()))
+            return self.load_json_from_file(file_name)
         except FileNotFoundError:
             print("Could not found the file: %s" % file_name)
         except OSError:
@@ -78,15 +143,103 @@ class JsonParsing():
             print("BaseException occurred trying open the file: %s" % file_name)
             print(exception)
 
-    def write_json_to_file(self, file_name: str, json_data: dict) -> None:
+    def load_json_from_file(self, file_name: str, progress=None, workers: int=1) -> dict:
+        """Load JSON from file reading it by chunks.
+
+        Unlike get_json_from_file exceptions are not caught, so the caller can show them.
+        Parsed documents are taken from and written to DOCUMENT_CACHE,
+        see utils.DocumentCache. Content hash of the entry is computed from the chunks
+        read for parsing, the file is not read again. Files are parsed with JSON_BACKEND,
+        see utils.JsonBackends. With several workers the file is parsed in shards in
+        parallel, see utils.JsonShards, if it could not be split it is parsed at once.
+        Files compressed with gzip, bz2 or xz are decompressed while they are read,
+        see utils.JsonCompression, they are always parsed at once.
+
+        Args:
+        -----
+            file_name: str
+                File name of JSON file
+            progress: callable
+                Called as progress(bytes_read, total_bytes) after every chunk, bytes
+                of compressed files are compressed ones. If it returns False loading
+                is canceled
+            workers: int
+                Amount of processes parsing the file
+
+        Returns:
+        --------
+            Return JSON data from file_name or None if loading was canceled
+
+        Raises:
+        -------
+            FileNotFoundError:
+                An error occured when the file is not found
+            OSError:
+                An error occured during reading the file
+            ValueError:
+                File is not a valid JSON document
+        """
+        document = DOCUMENT_CACHE.get(file_name)
+        if document is not None:
+            return document
+
+        if workers > 1 and not is_compressed_file(file_name):
+            file_stat = os.stat(file_name)
+            canceled = []
+            def shard_progress(bytes_parsed, total_bytes):
+                if progress is not None and progress(bytes_parsed, total_bytes) is False:
+                    canceled.append(True)
+                    return False
+                return True
+            try:
+                document = load_json_sharded(file_name, workers, shard_progress)
+            except ShardError:
+                document = None
+            if canceled:
+                return None
+            if document is not None:
+                DOCUMENT_CACHE.put(file_name, document, file_stat)
+                return document
+
+        with open(file_name, mode="rb") as raw_file:
+            file_stat = os.fstat(raw_file.fileno())
+            total_bytes = file_stat.st_size
+            opened_file = decompressing_reader(file_name, raw_file)
+            # Hash of the entry is of the bytes of the file, not of decompressed ones
+            file_hash = None
+            if opened_file is raw_file and DOCUMENT_CACHE.accepts(file_stat):
+                file_hash = DOCUMENT_CACHE.new_hash()
+            chunks = []
+            while True:
+                chunk = opened_file.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                if file_hash is not None:
+                    file_hash.update(chunk)
+                if progress is not None and progress(raw_file.tell(), total_bytes) is False:
+                    return None
+
+        document = JSON_BACKEND.loads(b"".join(chunks))
+        DOCUMENT_CACHE.put(file_name, document, file_stat,
+                           None if file_hash is None else file_hash.hexdigest())
+        return document
+
+    def write_json_to_file(self, file_name: str, json_data: dict, compact: bool=False) -> None:
         """Write JSON to file.
 
-        Write json_data (dictionary) to file_name
+        Write json_data (dictionary) to file_name. The file is replaced atomically, see
+        replacing_file. Files with .gz, .bz2 and .xz extensions are compressed while they
+        are written, see utils.JsonCompression.
 
         Args:
         -----
+            file_name: str
+                File name of JSON file
             json_data: dict
                 Dictionary with JSON-data
+            compact: bool
+                Write JSON without indents and spaces instead of indent of 2 spaces
 
         Raises:
         -------
@@ -98,13 +251,13 @@ class JsonParsing():
                 Base exception if others could not the catch exception
         """
         try:
-            with open(file_name, mode="w", encoding="utf-8") as opened_file:
-                opened_file.write(
-                    json.dumps(
-                        json_data,
-                        indent=2,
-                        ensure_ascii=False,
-                        sort_keys=True))
+            data = JSON_BACKEND.dumps(
+                json_data, indent=None if compact else 2, sort_keys=True).encode("utf-8")
+            with replacing_file(file_name) as raw_file:
+                opened_file = compressing_writer(file_name, raw_file)
+                opened_file.write(data)
+                if opened_file is not raw_file:
+                    opened_file.close()
         except FileNotFoundError:
             print("Could not found the file: %s" % file_name)
         except OSError:
@@ -113,6 +266,37 @@ class JsonParsing():
             print("BaseException occurred trying write to the file: %s" % file_name)
             print(exception)
 
+    def write_json_lines_to_file(self, file_name: str, records) -> None:
+        """Write records to file as JSON Lines, one record per line.
+
+        Records are written to a temporary file which then replaces file_name, see
+        replacing_file, so records could be read from the memory-mapped original while
+        it is written.
+        Unlike write_json_to_file exceptions are not caught, so the caller can show them.
+
+        Args:
+        -----
+            file_name: str
+                File name of JSON Lines file
+            records: iterable
+                Records to write. Bytes are written as they are, other values
+                are serialized with JSON_BACKEND without indentation
+
+        Raises:
+        -------
+            OSError:
+                An error occured during writing the file
+            ValueError:
+                A record could not be read from the original file
+        """
+        with replacing_file(file_name) as opened_file:
+            for record in records:
+                if not isinstance(record, bytes):
+                    record = JSON_BACKEND.dumps(
+                        record, indent=None, sort_keys=True).encode("utf-8")
+                opened_file.write(record)
+                opened_file.write(b"\n")
+
     @classmethod
     def get_name_from_dict(cls, data: dict) -> str:
         """Gets predefined params from data.
@@ -132,22 +316,16 @@ class JsonParsing():
             which is "Object"
         """
         if isinstance(data, dict):
-            output_string = TRANSLATE_JSONPARSING.gettext("Object")
-
-            ordered_dict = OrderedDict()
-            ordered_dict[TRANSLATE_JSONPARSING.gettext("Name")] = data.get(
-                'name', None)
-            ordered_dict[TRANSLATE_JSONPARSING.gettext("Group")] = data.get(
-                'group', None)
-            filtered_dict = {key: value for key, value in ordered_dict.items() if value is not None}
-
-            ordered_dict.clear()
-            ordered_dict.update(filtered_dict)
-
-            if len(ordered_dict) > 0:
-                output_string = ";  ".join(["%s: %s" % (key, value)
-                                            for (key, value) in ordered_dict.items()])
-            return output_string
+            name = data.get('name', None)
+            group = data.get('group', None)
+            if name is None and group is None:
+                return TRANSLATE_JSONPARSING.gettext("Object")
+            if group is None:
+                return "%s: %s" % (TRANSLATE_JSONPARSING.gettext("Name"), name)
+            if name is None:
+                return "%s: %s" % (TRANSLATE_JSONPARSING.gettext("Group"), group)
+            return "%s: %s;  %s: %s" % (TRANSLATE_JSONPARSING.gettext("Name"), name,
+                                        TRANSLATE_JSONPARSING.gettext("Group"), group)
         if isinstance(data, list):
             pass
         if isinstance(data, tuple):
@@ -156,7 +334,8 @@ class JsonParsing():
     def translate(self, input_string: str, language: str) -> str:
         """Translates input string to another language.
 
-        Translated from utils.translate.json file
+        Translated from utils.translate.json file. The file is read once and kept in memory
+        by KEY_TRANSLATOR, see utils.KeyTranslator.
 
         Args:
         -----
@@ -165,26 +344,8 @@ class JsonParsing():
             language: str
                 Language to translate
 
-        Raises:
-        -------
-            KeyError:
-                If input_string is not in dictionary
-
         Returns:
         --------
-            Return translated string
+            Return translated string or input_string if it is not in dictionary
         """
-        try:
-            file_name = os.path.join(
-                os.path.split(
-                    os.path.abspath(__file__))[0], "locale/translate.json")
-            translate_dictionary = self.get_json_from_file(file_name)
-            if language == "en":
-                return next((key for key, value in translate_dictionary.items()
-                             if value == input_string), input_string)
-            elif language == "ru":
-                return translate_dictionary[input_string]
-            else:
-                return
-        except KeyError:
-            return input_string
+        return KEY_TRANSLATOR.translate(input_string, language)
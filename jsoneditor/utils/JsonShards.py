@@ -0,0 +1,190 @@
+"""This module parses large JSON documents in parallel, split into shards of top-level members.
+
+Members of the top-level object or array are split at commas followed by a line break
+and the indent of the first member. JSON strings can not contain raw line breaks, so such
+a comma is never inside a string. It could still be inside a nested container of a file
+with unusual indents, then the shards have unbalanced brackets and fail to parse, and the
+whole document is parsed in one process instead. Shards are parsed with JSON_BACKEND
+in a process pool and joined in the order of the file, so the result is identical
+to parsing the whole document at once.
+
+Documents without line breaks between top-level members are parsed in one process,
+files written by the editor are always indented.
+
+    Typical usage example:
+    ----------------------
+
+    document = load_json_sharded("example.json", workers=4)
+    if document is None:
+        document = JSON_BACKEND.loads(open("example.json", "rb").read())
+"""
+import gc
+import os
+import re
+import mmap
+import marshal
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.JsonBackends import JSON_BACKEND, get_backend
+
+_SPACE_RE = re.compile(rb"[ \t\n\r]*")
+
+# Shards per worker, more shards balance the work between workers better
+SHARDS_PER_WORKER = 4
+
+
+class ShardError(ValueError):
+    """Raised if a shard could not be parsed or worker processes failed."""
+
+
+def find_shards(data, shards: int) -> tuple:
+    """Return byte ranges of runs of top-level members of the document.
+
+    Args:
+    -----
+        data: bytes or mmap
+            JSON document
+        shards: int
+            Wanted amount of shards, fewer are returned if the document has fewer
+            line breaks between its members
+
+    Returns:
+    --------
+        Tuple of True if the top-level value is an object and list of (start, end)
+        byte ranges of the shards, without the brackets and separating commas
+
+    Raises:
+    -------
+        ShardError:
+            Document is not an object or an array
+    """
+    first = _SPACE_RE.match(data).end()
+    last = len(data) - 1
+    while last > first and data[last] in b" \t\n\r":
+        last -= 1
+    if first >= last or (data[first], data[last]) not in ((123, 125), (91, 93)):
+        raise ShardError("Document must be an object or an array")
+
+    # Comma followed by a line break and the indent of the first member
+    space = data[first + 1:_SPACE_RE.match(data, first + 1).end()]
+    indent = space[space.rfind(b"\n") + 1:]
+    split_re = re.compile(rb",[ \t\r]*\n" + re.escape(indent) + rb"(?=[^ \t\r\n])")
+
+    start = first + 1
+    end = last
+    target = max((end - start) // max(shards, 1), 1)
+    ranges = []
+    while len(ranges) < shards - 1:
+        match = split_re.search(data, start + target, end)
+        if match is None:
+            break
+        ranges.append((start, match.start()))
+        start = match.end()
+    ranges.append((start, end))
+    return data[first] == 123, ranges
+
+
+def parse_shard(file_name: str, start: int, end: int, is_dict: bool,
+                backend_name: str) -> bytes:
+    """Return marshal dump of top-level members of file_name between start and end.
+
+    Called in worker processes, so the members are returned as marshal which loads
+    faster than pickle.
+
+    Raises:
+    -------
+        ShardError:
+            Members could not be parsed
+    """
+    with open(file_name, mode="rb") as opened_file:
+        opened_file.seek(start)
+        data = opened_file.read(end - start)
+    opening, closing = (b"{", b"}") if is_dict else (b"[", b"]")
+    try:
+        value = get_backend(backend_name).loads(opening + data + closing)
+    except ValueError as exception:
+        raise ShardError(str(exception)) from exception
+    return marshal.dumps(value)
+
+
+def load_json_sharded(file_name: str, workers: int, progress=None):
+    """Return document of file_name parsed in shards by workers processes.
+
+    Args:
+    -----
+        file_name: str
+            File name of JSON file
+        workers: int
+            Amount of worker processes
+        progress: callable
+            Called as progress(bytes_parsed, total_bytes) after every shard.
+            If it returns False parsing is canceled
+
+    Returns:
+    --------
+        Parsed document, identical to JSON_BACKEND.loads of the whole file, or None
+        if the document could not be split into several shards or parsing was canceled
+
+    Raises:
+    -------
+        OSError:
+            File could not be read
+        ShardError:
+            A shard could not be parsed or worker processes failed. The document is
+            invalid or it was split inside a nested container, it has to be parsed at once
+    """
+    with open(file_name, mode="rb") as opened_file:
+        total_bytes = os.fstat(opened_file.fileno()).st_size
+        if total_bytes == 0:
+            return None
+        with mmap.mmap(opened_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            is_dict, ranges = find_shards(data, workers * SHARDS_PER_WORKER)
+    if len(ranges) < 2:
+        return None
+
+    # Worker processes are spawned, forking a process with running threads is not safe
+    context = multiprocessing.get_context("spawn")
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=context)
+    futures = []
+    try:
+        futures = [executor.submit(parse_shard, file_name, start, end, is_dict,
+                                   JSON_BACKEND.name)
+                   for start, end in ranges]
+        sizes = {future: end - start for future, (start, end) in zip(futures, ranges)}
+        pending = set(futures)
+        bytes_parsed = 0
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    future.result()
+                except BrokenProcessPool as exception:
+                    raise ShardError("Worker processes failed: %s" % exception) from exception
+                bytes_parsed += sizes[future]
+            if progress is not None and progress(bytes_parsed, total_bytes) is False:
+                return None
+
+        document = {} if is_dict else []
+        # Collections created by marshal can not form cycles
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for future in futures:
+                shard = marshal.loads(future.result())
+                # Repeated keys keep the first position and the last value, as in json.loads
+                if is_dict:
+                    document.update(shard)
+                else:
+                    document.extend(shard)
+                del shard
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return document
+    finally:
+        # Shards which are not started yet are not parsed after an error or cancel
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,333 @@
+"""This module parses JSON file incrementally into a stream of events.
+
+The file is read by chunks of fixed size, so neither the whole text of the file nor
+the whole Python object graph is kept in memory. Every event carries byte offsets
+of its token in the file.
+
+    Typical usage example:
+    ----------------------
+
+    with open("example.json", "rb") as opened_file:
+        for event, value, start, end in JsonEventParser(opened_file).events():
+            print(event, value, start, end)
+
+    builder = JsonValueBuilder()
+    with open("example.json", "rb") as opened_file:
+        for event, value, _start, _end in JsonEventParser(opened_file).events():
+            builder.feed(event, value)
+    print(builder.value)
+"""
+import os
+import re
+import codecs
+from json.decoder import JSONDecoder, JSONDecodeError, scanstring
+
+from utils.JsonParsing import READ_CHUNK_SIZE
+
+
+# Events of JsonEventParser
+START_OBJECT = "start_object"
+END_OBJECT = "end_object"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+KEY = "key"
+VALUE = "value"
+
+_WHITESPACE = " \t\n\r"
+_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+
+# Scalars are decoded by the C scanner of json module, NaN and Infinity are accepted
+# as json.load does
+_DECODER = JSONDecoder()
+
+# Longest scalar which could be cut by the end of a chunk is "-Infinity"
+_SCALAR_TAIL = 9
+
+# Parser states: what is expected as the next token
+_EXPECT_VALUE = 0
+_EXPECT_VALUE_OR_END = 1
+_EXPECT_KEY = 2
+_EXPECT_KEY_OR_END = 3
+_EXPECT_COLON = 4
+_EXPECT_COMMA_OR_END = 5
+_EXPECT_NOTHING = 6
+
+
+class JsonEventParser():
+    """Class for incremental event-based parsing of JSON file.
+
+    Attributes:
+    -----------
+    bytes_read:
+        Amount of bytes read from the file so far
+    total_bytes:
+        Size of the file in bytes, 0 if unknown
+
+    Methods:
+    --------
+    events(self):
+        Yields (event, value, start, end) tuples
+    """
+    def __init__(self, opened_file, chunk_size: int=READ_CHUNK_SIZE, progress=None) -> None:
+        """Constructs all necessary attributes for the JsonEventParser object.
+
+        Args:
+        -----
+            opened_file:
+                File object opened in binary mode
+            chunk_size: int
+                Amount of bytes read at once
+            progress: callable
+                Called as progress(bytes_read, total_bytes) after every chunk.
+                If it returns False parsing stops
+        """
+        self._file = opened_file
+        self._chunk_size = chunk_size
+        self._progress = progress
+        self.bytes_read = 0
+        try:
+            self.total_bytes = os.fstat(opened_file.fileno()).st_size
+        except (AttributeError, OSError, ValueError):
+            self.total_bytes = 0
+
+    def events(self):
+        """Yields events of the document.
+
+        Every event is a tuple (event, value, start, end), where event is one of
+        START_OBJECT, END_OBJECT, START_ARRAY, END_ARRAY, KEY or VALUE, value is
+        the key or scalar value (None for other events), start and end are byte
+        offsets of the token in the file.
+
+        Strings are decoded by json.decoder.scanstring and other scalars by
+        JSONDecoder.raw_decode, so values and errors are the same as of json.load,
+        including control characters rejected in strings.
+
+        Raises:
+        -------
+            ValueError:
+                File is not a valid JSON document
+        """
+        skip_whitespace = _WHITESPACE_RE.match
+        raw_decode = _DECODER.raw_decode
+        read = self._file.read
+        chunk_size = self._chunk_size
+        decoder = codecs.getincrementaldecoder("utf-8")()
+
+        text = ""
+        text_end = 0
+        # Byte offset of text[0], characters are bytes while text is ASCII
+        base = 0
+        is_ascii = True
+        # Character and byte offsets of the end of the previous token in text
+        # which is not ASCII
+        cursor = 0
+        cursor_offset = 0
+        position = 0
+        is_eof = False
+        need_more = False
+        stack = []
+        state = _EXPECT_VALUE
+
+        while True:
+            if position < text_end and text[position] in _WHITESPACE:
+                position = skip_whitespace(text, position).end()
+            if need_more or position == text_end:
+                if is_eof:
+                    if state != _EXPECT_NOTHING:
+                        raise ValueError("Unexpected end of document at byte %d" %
+                                         self._byte_offset(text, base, text_end))
+                    return
+
+                chunk = read(chunk_size)
+                if chunk:
+                    self.bytes_read += len(chunk)
+                    if (self._progress is not None and
+                            self._progress(self.bytes_read, self.total_bytes) is False):
+                        return
+                    decoded = decoder.decode(chunk)
+                else:
+                    is_eof = True
+                    decoded = decoder.decode(b"", True)
+
+                base = base + position if is_ascii else self._byte_offset(text, base, position)
+                text = text[position:] + decoded
+                text_end = len(text)
+                is_ascii = len(text.encode("utf-8")) == text_end
+                cursor = 0
+                cursor_offset = 0
+                position = 0
+                need_more = False
+                continue
+
+            if state == _EXPECT_NOTHING:
+                raise ValueError("Extra data at byte %d" %
+                                 self._byte_offset(text, base, position))
+
+            token_start = position
+            char = text[position]
+            if char == '"':
+                try:
+                    value, position = scanstring(text, position + 1, True)
+                except JSONDecodeError as exception:
+                    # String could continue in the next chunk
+                    if not is_eof and (exception.msg.startswith("Unterminated") or
+                                       exception.pos + 6 >= text_end):
+                        need_more = True
+                        continue
+                    raise ValueError("Invalid string at byte %d: %s" % (
+                        self._byte_offset(text, base, token_start), exception.msg))
+
+                if state == _EXPECT_KEY or state == _EXPECT_KEY_OR_END:
+                    state = _EXPECT_COLON
+                    event = KEY
+                elif state == _EXPECT_VALUE or state == _EXPECT_VALUE_OR_END:
+                    state = _EXPECT_COMMA_OR_END if stack else _EXPECT_NOTHING
+                    event = VALUE
+                else:
+                    raise ValueError("Unexpected value at byte %d" %
+                                     self._byte_offset(text, base, token_start))
+            elif char == ",":
+                if state != _EXPECT_COMMA_OR_END:
+                    raise ValueError("Unexpected ',' at byte %d" %
+                                     self._byte_offset(text, base, token_start))
+                state = _EXPECT_KEY if stack[-1] else _EXPECT_VALUE
+                position += 1
+                continue
+            elif char == ":":
+                if state != _EXPECT_COLON:
+                    raise ValueError("Unexpected ':' at byte %d" %
+                                     self._byte_offset(text, base, token_start))
+                state = _EXPECT_VALUE
+                position += 1
+                continue
+            elif char == "{":
+                if state != _EXPECT_VALUE and state != _EXPECT_VALUE_OR_END:
+                    raise ValueError("Unexpected '{' at byte %d" %
+                                     self._byte_offset(text, base, token_start))
+                stack.append(True)
+                state = _EXPECT_KEY_OR_END
+                event = START_OBJECT
+                value = None
+                position += 1
+            elif char == "[":
+                if state != _EXPECT_VALUE and state != _EXPECT_VALUE_OR_END:
+                    raise ValueError("Unexpected '[' at byte %d" %
+                                     self._byte_offset(text, base, token_start))
+                stack.append(False)
+                state = _EXPECT_VALUE_OR_END
+                event = START_ARRAY
+                value = None
+                position += 1
+            elif char == "}":
+                if ((state != _EXPECT_KEY_OR_END and state != _EXPECT_COMMA_OR_END) or
+                        not stack or not stack[-1]):
+                    raise ValueError("Unexpected '}' at byte %d" %
+                                     self._byte_offset(text, base, token_start))
+                stack.pop()
+                state = _EXPECT_COMMA_OR_END if stack else _EXPECT_NOTHING
+                event = END_OBJECT
+                value = None
+                position += 1
+            elif char == "]":
+                if ((state != _EXPECT_VALUE_OR_END and state != _EXPECT_COMMA_OR_END) or
+                        not stack or stack[-1]):
+                    raise ValueError("Unexpected ']' at byte %d" %
+                                     self._byte_offset(text, base, token_start))
+                stack.pop()
+                state = _EXPECT_COMMA_OR_END if stack else _EXPECT_NOTHING
+                event = END_ARRAY
+                value = None
+                position += 1
+            else:
+                try:
+                    value, position = raw_decode(text, position)
+                except ValueError:
+                    if not is_eof and position + _SCALAR_TAIL >= text_end:
+                        need_more = True
+                        continue
+                    raise ValueError("Unexpected data at byte %d" %
+                                     self._byte_offset(text, base, token_start))
+                # Number could continue in the next chunk, like "1.|5" or "1e|5"
+                if not is_eof and position + 2 >= text_end:
+                    position = token_start
+                    need_more = True
+                    continue
+
+                if state != _EXPECT_VALUE and state != _EXPECT_VALUE_OR_END:
+                    raise ValueError("Unexpected value at byte %d" %
+                                     self._byte_offset(text, base, token_start))
+                state = _EXPECT_COMMA_OR_END if stack else _EXPECT_NOTHING
+                event = VALUE
+
+            if is_ascii:
+                yield event, value, base + token_start, base + position
+            else:
+                cursor_offset += len(text[cursor:token_start].encode("utf-8"))
+                start = base + cursor_offset
+                cursor_offset += len(text[token_start:position].encode("utf-8"))
+                cursor = position
+                yield event, value, start, base + cursor_offset
+
+    @classmethod
+    def _byte_offset(cls, text: str, base: int, index: int) -> int:
+        """Return byte offset in the file of text[index], where text starts at byte base."""
+        return base + len(text[:index].encode("utf-8"))
+
+    @classmethod
+    def _decode_string(cls, token: bytes, start: int) -> str:
+        """Return str value of string token with quotes."""
+        try:
+            return scanstring(token.decode("utf-8"), 1, True)[0]
+        except ValueError as exception:
+            raise ValueError("Invalid string at byte %d: %s" % (start, exception))
+
+
+class JsonValueBuilder():
+    """Class for building Python value from events of JsonEventParser.
+
+    Attributes:
+    -----------
+    value:
+        Built value, complete after the last event of the document
+
+    Methods:
+    --------
+    feed(self, event: str, value) -> None:
+        Adds one event to the value
+    """
+    def __init__(self) -> None:
+        """Constructs all necessary attributes for the JsonValueBuilder object."""
+        self.value = None
+        self._stack = []
+        self._key = None
+
+    def feed(self, event: str, value) -> None:
+        """Adds one event to the value.
+
+        Args:
+        -----
+            event: str
+                One of START_OBJECT, END_OBJECT, START_ARRAY, END_ARRAY, KEY or VALUE
+            value:
+                Key or scalar value of the event
+        """
+        if event == KEY:
+            self._key = value
+            return
+        if event == START_OBJECT:
+            value = {}
+        elif event == START_ARRAY:
+            value = []
+        elif event != VALUE:
+            self.value = self._stack.pop()
+            return
+
+        stack = self._stack
+        if not stack:
+            self.value = value
+        elif type(stack[-1]) is dict:
+            stack[-1][self._key] = value
+        else:
+            stack[-1].append(value)
+        if event != VALUE:
+            stack.append(value)
@@ -0,0 +1,164 @@
+"""This module keeps translate.json in memory for translating JSON keys.
+
+The translation table is loaded once per process and kept as two prebuilt dictionaries
+(forward and reverse), so translating a key is a single dictionary lookup instead of
+opening and parsing translate.json again.
+
+    Typical usage example:
+    ----------------------
+
+    KEY_TRANSLATOR.translate("devices", "ru")
+    KEY_TRANSLATOR.translate("устройства", "en")
+    print(KEY_TRANSLATOR.statistics())
+"""
+import os
+import json
+import time
+import threading
+
+
+class KeyTranslator():
+    """Class for translating JSON keys with an in-memory two-way table.
+
+    Attributes:
+    -----------
+    file_name:
+        Path to the translate.json file
+    check_interval:
+        Minimum amount of seconds between two checks of the file mtime
+    hits:
+        Amount of keys which were found in the table
+    misses:
+        Amount of keys which were not found in the table
+    loads:
+        Amount of times translate.json was read from disk
+
+    Methods:
+    --------
+    translate(input_string: str, language: str) -> str:
+        Return translated input_string
+    reload_if_changed(force: bool) -> bool:
+        Reload table if mtime of the file was changed
+    statistics() -> dict:
+        Return hits, misses and loads counters
+    reset_statistics() -> None:
+        Reset hits and misses counters
+    """
+    def __init__(self, file_name: str, check_interval: float=1.0) -> None:
+        """Constructs all necessary attributes for the KeyTranslator object.
+
+        Args:
+        -----
+            file_name: str
+                Path to the translate.json file
+            check_interval: float
+                Minimum amount of seconds between two checks of the file mtime
+        """
+        self._file_name = file_name
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = None
+        self._forward = {}
+        self._reverse = {}
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    @property
+    def file_name(self):
+        """Get current file_name."""
+        return self._file_name
+
+    def reload_if_changed(self, force: bool=False) -> bool:
+        """Reloads the table if translate.json was changed on disk.
+
+        Args:
+        -----
+            force: bool
+                Check mtime even if check_interval has not passed yet
+
+        Returns:
+        --------
+            True if the table was reloaded, otherwise False
+        """
+        now = time.monotonic()
+        if (not force and self._checked_at is not None and
+                now - self._checked_at < self._check_interval):
+            return False
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self._file_name).st_mtime_ns
+            except OSError:
+                mtime = None
+
+            if mtime == self._mtime and self.loads > 0:
+                return False
+
+            forward = {}
+            if mtime is not None:
+                try:
+                    with open(self._file_name, mode="r", encoding="utf-8") as opened_file:
+                        forward = json.load(opened_file)
+                except (OSError, ValueError) as exception:
+                    print("Could not load translation table %s: %s" %
+                          (self._file_name, exception))
+                    forward = {}
+
+            reverse = {}
+            for key, value in forward.items():
+                reverse.setdefault(value, key)
+
+            self._forward = forward
+            self._reverse = reverse
+            self._mtime = mtime
+            self.loads += 1
+            return True
+
+    def translate(self, input_string: str, language: str) -> str:
+        """Translates input string to another language.
+
+        Args:
+        -----
+            input_string: str
+                Input string to translate
+            language: str
+                Language to translate: "en" or "ru"
+
+        Returns:
+        --------
+            Return translated string or input_string if it is not in the table.
+            Return None if language is unknown
+        """
+        self.reload_if_changed()
+
+        if language == "en":
+            table = self._reverse
+        elif language == "ru":
+            table = self._forward
+        else:
+            return None
+
+        try:
+            translated = table[input_string]
+        except (KeyError, TypeError):
+            self.misses += 1
+            return input_string
+
+        self.hits += 1
+        return translated
+
+    def statistics(self) -> dict:
+        """Return hits, misses and loads counters."""
+        return {"hits": self.hits, "misses": self.misses, "loads": self.loads}
+
+    def reset_statistics(self) -> None:
+        """Reset hits and misses counters."""
+        self.hits = 0
+        self.misses = 0
+
+
+KEY_TRANSLATOR = KeyTranslator(
+    os.path.join(os.path.split(os.path.abspath(__file__))[0], "locale/translate.json"))
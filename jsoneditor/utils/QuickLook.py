@@ -0,0 +1,302 @@
+"""This module summarizes the head of a JSON file within a fixed byte and time budget.
+
+The file is parsed by JsonEventParser only until the budget is spent, nothing is built
+in memory. The summary shows the file size, the type of the document, its top-level keys
+with the types and element counts of their values, the nesting depth reached and the
+amount of top-level elements, extrapolated to the whole file if it was not read to the end.
+Heads of JSON Lines files are summarized by records. Compressed files are decompressed
+while they are read.
+
+    Typical usage example:
+    ----------------------
+
+    quick_look = QuickLook("example.json")
+    quick_look.scan(max_bytes=4 * 1024 * 1024, max_seconds=0.5)
+    print(quick_look.summary())
+"""
+import os
+import time
+
+from utils.JsonParsing import READ_CHUNK_SIZE
+from utils.JsonBackends import JSON_BACKEND
+from utils.JsonLines import is_json_lines_file
+from utils.JsonCompression import DECOMPRESSION_ERRORS, decompressing_reader
+from utils.JsonStream import (
+    JsonEventParser, START_OBJECT, END_OBJECT, START_ARRAY, END_ARRAY, KEY, VALUE)
+
+# Default budget of one scan
+QUICK_LOOK_BYTES = 4 * 1024 * 1024
+QUICK_LOOK_SECONDS = 0.5
+
+# Maximal amount of top-level members whose keys and counts are kept
+QUICK_LOOK_MEMBER_LIMIT = 20
+
+# Amount of events between two checks of the time budget
+_TIME_CHECK_INTERVAL = 4096
+
+_TYPE_NAMES = {dict: "object", list: "array", str: "string", int: "number",
+               float: "number", bool: "boolean", type(None): "null"}
+
+
+class QuickLook():
+    """Class for summarizing the head of a JSON or JSON Lines file.
+
+    Attributes:
+    -----------
+    file_name:
+        File name of the summarized file
+    file_size:
+        Size of the file in bytes
+    content_size:
+        Size of the decompressed content of compressed files, estimated by the
+        compression ratio of the read part if the file was not read to the end.
+        Equals file_size for other files
+    bytes_scanned:
+        Amount of bytes of the content which were parsed
+    seconds:
+        Time spent scanning
+    is_complete:
+        The whole file was parsed
+    root_type:
+        "object", "array" or "JSON Lines", other types for scalar documents, None if
+        nothing was parsed
+    count:
+        Amount of top-level members or records found
+    members:
+        List of [key, type, count, is_complete] of the first top-level members. Key
+        is None for arrays, count is the amount of elements of containers and None
+        for scalars
+    max_depth:
+        Deepest nesting level reached
+    nodes:
+        Amount of values found, containers included
+    error:
+        Error message if the parsed part of the file is not valid JSON, else None
+
+    Methods:
+    --------
+    scan(self, max_bytes: int, max_seconds: float) -> bool:
+        Parses the head of the file within the budget
+    estimated_count(self) -> int:
+        Return amount of top-level members of the whole file
+    estimated_nodes(self) -> int:
+        Return amount of values of the whole file
+    summary(self, translate, max_members: int) -> str:
+        Return multi-line text of the summary
+    """
+    def __init__(self, file_name: str) -> None:
+        """Constructs all necessary attributes for the QuickLook object."""
+        self.file_name = file_name
+        self.file_size = 0
+        self.content_size = 0
+        self.bytes_scanned = 0
+        self.seconds = 0.0
+        self.is_complete = False
+        self.root_type = None
+        self.count = 0
+        self.members = []
+        self.max_depth = 0
+        self.nodes = 0
+        self.error = None
+        self._root_start = 0
+
+    def scan(self, max_bytes: int=QUICK_LOOK_BYTES,
+             max_seconds: float=QUICK_LOOK_SECONDS) -> bool:
+        """Parses the head of the file until max_bytes are read or max_seconds pass.
+
+        Invalid JSON stops the scan, its message is kept in error.
+
+        Returns:
+        --------
+            True if the whole file was parsed
+
+        Raises:
+        -------
+            OSError:
+                File could not be read
+        """
+        started = time.monotonic()
+        deadline = started + max_seconds
+        with open(self.file_name, mode="rb") as raw_file:
+            self.file_size = os.fstat(raw_file.fileno()).st_size
+            opened_file = decompressing_reader(self.file_name, raw_file)
+            try:
+                if is_json_lines_file(self.file_name):
+                    self._scan_lines(opened_file, max_bytes, deadline)
+                else:
+                    self._scan_events(opened_file, max_bytes, deadline)
+            except (ValueError,) + DECOMPRESSION_ERRORS as exception:
+                self.error = str(exception)
+
+            if opened_file is raw_file:
+                self.content_size = self.file_size
+            elif self.is_complete or raw_file.tell() == 0:
+                self.content_size = self.bytes_scanned
+            else:
+                self.content_size = max(
+                    int(self.bytes_scanned * self.file_size / raw_file.tell()),
+                    self.bytes_scanned)
+        if self.is_complete:
+            self.bytes_scanned = self.content_size
+        self.seconds = time.monotonic() - started
+        return self.is_complete
+
+    def estimated_count(self) -> int:
+        """Return amount of top-level members or records extrapolated to the whole file."""
+        scanned = self.bytes_scanned - self._root_start
+        if self.is_complete or self.count == 0 or scanned <= 0:
+            return self.count
+        return max(int(self.count * (self.content_size - self._root_start) / scanned),
+                   self.count)
+
+    def estimated_nodes(self) -> int:
+        """Return amount of values, containers included, extrapolated to the whole file."""
+        if self.is_complete or self.bytes_scanned <= 0:
+            return self.nodes
+        return max(int(self.nodes * self.content_size / self.bytes_scanned), self.nodes)
+
+    def summary(self, translate=None, max_members: int=QUICK_LOOK_MEMBER_LIMIT) -> str:
+        """Return multi-line text of the summary.
+
+        Args:
+        -----
+            translate: callable
+                Translates labels of the summary, for example gettext. Default is None
+            max_members: int
+                Maximal amount of listed top-level members
+        """
+        if translate is None:
+            translate = str
+        lines = [
+            translate("File size: %.1f MB (%d bytes)") % (
+                self.file_size / 2 ** 20, self.file_size),
+            translate("Scanned: %.1f MB in %.2f s") % (
+                self.bytes_scanned / 2 ** 20, self.seconds)]
+        if self.content_size != self.file_size:
+            lines.insert(1, translate("Uncompressed size: about %.1f MB") %
+                         (self.content_size / 2 ** 20))
+        if self.error is not None:
+            lines.append(translate("Invalid JSON: %s") % self.error)
+        if self.root_type is None:
+            return "\n".join(lines)
+
+        lines.append(translate("Type: %s") % self.root_type)
+        if self.is_complete:
+            lines.append(translate("Elements: %d") % self.count)
+        else:
+            lines.append(translate("Elements: about %d (%d read)") %
+                         (self.estimated_count(), self.count))
+        lines.append(translate("Depth reached: %d") % self.max_depth)
+        for key, type_name, count, is_complete in self.members[:max_members]:
+            label = "[%s]" % type_name if key is None else "%s: %s" % (key, type_name)
+            if count is not None:
+                label += " (%d%s)" % (count, "" if is_complete else "+")
+            lines.append("    " + label)
+        if self.count > min(len(self.members), max_members):
+            lines.append("    ...")
+        return "\n".join(lines)
+
+    def _scan_events(self, opened_file, max_bytes: int, deadline: float) -> None:
+        """Summarizes JSON document from events of JsonEventParser."""
+        # The chunk which reaches max_bytes is still parsed
+        def progress(bytes_read, _total_bytes):
+            return bytes_read <= max_bytes and time.monotonic() < deadline
+
+        events = JsonEventParser(
+            opened_file, chunk_size=min(READ_CHUNK_SIZE, max(max_bytes, 1)),
+            progress=progress).events()
+        members = self.members
+        member = None
+        key = None
+        depth = 0
+        checked = 0
+        for event, value, _start, end in events:
+            self.bytes_scanned = end
+            if event == KEY:
+                if depth == 1:
+                    key = value
+                continue
+
+            self.nodes += 1
+            if event == START_OBJECT or event == START_ARRAY:
+                depth += 1
+                if depth > self.max_depth:
+                    self.max_depth = depth
+                if depth == 1:
+                    self.root_type = "object" if event == START_OBJECT else "array"
+                    self._root_start = end
+                elif depth == 2:
+                    self.count += 1
+                    member = None
+                    if len(members) < QUICK_LOOK_MEMBER_LIMIT:
+                        member = [key, "object" if event == START_OBJECT else "array",
+                                  0, False]
+                        members.append(member)
+                elif depth == 3 and member is not None:
+                    member[2] += 1
+            elif event == END_OBJECT or event == END_ARRAY:
+                self.nodes -= 1
+                if depth == 2 and member is not None:
+                    member[3] = True
+                depth -= 1
+                if depth == 0:
+                    self.is_complete = True
+            elif event == VALUE:
+                if depth == 0:
+                    self.root_type = _TYPE_NAMES[type(value)]
+                    self.is_complete = True
+                elif depth == 1:
+                    self.count += 1
+                    if len(members) < QUICK_LOOK_MEMBER_LIMIT:
+                        members.append([key, _TYPE_NAMES[type(value)], None, True])
+                elif depth == 2 and member is not None:
+                    member[2] += 1
+
+            checked += 1
+            if checked % _TIME_CHECK_INTERVAL == 0 and time.monotonic() >= deadline:
+                return
+
+    def _scan_lines(self, opened_file, max_bytes: int, deadline: float) -> None:
+        """Summarizes complete records of the head of JSON Lines file."""
+        self.root_type = "JSON Lines"
+        data = opened_file.read(max_bytes)
+        is_eof = len(data) < max_bytes or opened_file.read(1) == b""
+        end = len(data) if is_eof else data.rfind(b"\n") + 1
+        position = 0
+        while position < end:
+            line_end = data.find(b"\n", position, end)
+            if line_end < 0:
+                line_end = end
+            line = data[position:line_end].strip()
+            position = line_end + 1
+            if not line:
+                continue
+
+            value = JSON_BACKEND.loads(line)
+            self.count += 1
+            depth, nodes = self._measure(value)
+            self.max_depth = max(self.max_depth, depth)
+            self.nodes += nodes
+            if len(self.members) < QUICK_LOOK_MEMBER_LIMIT:
+                self.members.append([
+                    None, _TYPE_NAMES[type(value)],
+                    len(value) if isinstance(value, (dict, list)) else None, True])
+            self.bytes_scanned = min(position, end)
+            if time.monotonic() >= deadline:
+                return
+        self.bytes_scanned = end
+        self.is_complete = is_eof
+
+    @classmethod
+    def _measure(cls, value) -> tuple:
+        """Return nesting depth of containers of value, 0 for scalars, and amount of values."""
+        depth = 0
+        nodes = 0
+        level = [value]
+        while level:
+            nodes += len(level)
+            level = [child for container in level if isinstance(container, (dict, list))
+                     for child in (container.values() if isinstance(container, dict)
+                                   else container)]
+            depth += 1
+        return depth - 1, nodes
@@ -7,11 +7,16 @@
     utils.get_abs_file_path("test.json")
     utils.file_name_match("test.json")
     utils.string_to_boolean("True.json")
+    utils.file_hash("test.json")
 
     print(Utils().get_abs_file_path("test.json"))
 """
 import os
 import re
+import hashlib
+
+# Size of chunks in bytes for hashing files
+HASH_CHUNK_SIZE = 1024 * 1024
 
 
 class Utils():
@@ -25,6 +30,8 @@ class Utils():
         Return True if given file_name match .json file extension
     string_to_boolean(input_string: str) -> bool
         Return True if input_string is "True" False if "False"
+    file_hash(file_name: str) -> str
+        Return hash of the file content
     """
     def __init__(self) -> None:
         """Constructs all necessary attributes for the Utils object."""
@@ -122,3 +129,32 @@ class Utils():
             return False
         else:
             return
+
+    @classmethod
+    def file_hash(cls, file_name: str) -> str:
+        """Return hash of the file content.
+
+        File is read by chunks, so it is never kept in memory as a whole.
+
+        Args:
+        -----
+            file_name: str
+                Input file_name
+
+        Returns:
+        --------
+            Hex digest of BLAKE2b hash of the file content
+
+        Raises:
+        -------
+            OSError:
+                An error occured during reading the file
+        """
+        file_hash = hashlib.blake2b()
+        with open(file_name, mode="rb") as opened_file:
+            while True:
+                chunk = opened_file.read(HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
@@ -6,7 +6,8 @@ CONFIG_OBJECT = ConfigParser()
 
 CONFIG_OBJECT["QTreeView"] = {
     "set_alternating_row_colors": "False",
-    "set_animated": "False"
+    "set_animated": "False",
+    "lazy_loading": "False" # Create tree items only when they are expanded
 }
 
 CONFIG_OBJECT["QTreeView-expand"] = {
@@ -20,8 +21,35 @@ CONFIG_OBJECT["QTreeView-color"] = {
     "color_else": "#E3F2FD"
 }
 
+CONFIG_OBJECT["Loading"] = {
+    "streaming": "False", # Show items while the file is read, loads about twice as long
+    "mapped_threshold_mb": "1024", # Open larger files memory-mapped, "0" to disable
+    "parallel_threshold_mb": "256", # Parse larger files in shards in parallel, "0" to disable
+    "parallel_workers": "0", # Processes parsing shards or files opened together, "0" for all CPUs
+    "quick_look_mb": "4", # Bytes parsed by quick look of a file in the open dialog or CLI
+    "quick_look_seconds": "0.5", # Time limit of quick look of a file
+    "load_profile": "auto", # "auto", "small" or "large" profile of loaded documents
+    "large_file_mb": "64", # Larger files use the large profile, "0" to disable
+    "large_node_count": "1000000" # Files with more estimated nodes use the large profile
+}
+
+CONFIG_OBJECT["Cache"] = {
+    "enabled": "True", # Keep parsed documents in cache directory
+    "directory": "", # default: "~/.cache/jsoneditor"
+    "max_size_mb": "256",
+    "verify_content": "False" # Hash the whole file on every open instead of trusting size and mtime
+}
+
 CONFIG_OBJECT["Other"] = {
-    "default_json_file_name": "test.json" # default: ""
+    "default_json_file_name": "test.json", # default: ""
+    "json_backend": "auto", # "auto", "stdlib" or "orjson"
+    "watch_file": "False", # Reload the file when it is changed by other programs
+    "watch_debounce_ms": "500", # Check the file after there were no writes for this time
+    "follow_debounce_ms": "200", # Read appended records of followed file after this time
+    "follow_max_records": "0", # Records kept in the tree of followed file, 0 for no limit
+    "compact_output": "False", # Save JSON files without indents and line breaks
+    "save_cache_mb": "256", # Text of unchanged parts kept for the next save, "0" to disable
+    "preserve_formatting": "False" # Save only edited values into the file, keeping its layout
 }
 
 CONFIG_OBJECT["Language"] = {